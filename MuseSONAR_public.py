@@ -1,68 +1,60 @@
 # MuseSONAR_public.py
 
+from __future__ import annotations # 타입 힌트 전용 무거운 모듈(torch, google-generativeai, konlpy)을 임포트 시점에 불러오지 않기 위함
+
 import config
-from pydantic_models import AnalysisResultModel, MetricModel, SimilarResultModel, LlmVerificationModel
+from resources import registry as resources, cache_tiers
+from pydantic_models import AnalysisResultModel, MetricModel, SimilarResultModel, LlmVerificationModel, DegradationModel, StageTimingModel
+from embedding_cache import encode_texts, get_model_name
+from embedding_backends import base_model_name
+from result_cache import result_cache, make_result_key, is_cacheable
+from idea_index import idea_index
+from patent_corpus import patent_corpus
+from hit_table import HitTable, cosine_scores, llm_first_order
+from near_duplicates import collapse_near_duplicates
+import kipris_client
+import cache_keys
+from llm_inputs import prepare_llm_inputs, verdict_key_for_hit
+from kipris_client import KiprisPage, KiprisPageConsumer, KiprisRecordType
+from query_expansion import SubQuery, expand_queries, run_sub_queries, merge_ranked_hits
+from keyword_extractors import KeywordExtractor, get_extractor, normalize_keyword_text
+from encoder_service import BatchingEncoder
+import http_client
+import rate_limiter
+from rate_limiter import RateLimitExceeded
+import circuit_breaker
+from circuit_breaker import CircuitOpenError
+import telemetry
+from logging_setup import setup_logging, SAMPLED
+import contextvars
+import functools
 import requests
-from sentence_transformers import SentenceTransformer, util
 import os
 import numpy as np
-import google.generativeai as genai
 import time
+import asyncio
 from dotenv import load_dotenv
-import xml.etree.ElementTree as ET 
+from lxml.etree import XMLSyntaxError
 import re
-import diskcache
-from concurrent.futures import ThreadPoolExecutor
+import json
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, TimeoutError as FuturesTimeoutError
 import logging
 import sys
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
 import traceback
 # --- 타입 힌트용 임포트 ---
-from typing import List, Dict, Tuple, Optional, Any, Literal, Union # 필요한 타입 임포트
-from google.generativeai.generative_models import GenerativeModel # Gemini 모델 타입
-from konlpy.tag import Okt as OktType # KoNLPy Okt 타입 (Optional 처리 위해 별도 임포트)
-
-# --- 로깅 설정 ---
-log_format = '%(asctime)s - %(levelname)s - [%(funcName)s:%(lineno)d] - %(message)s'
-logging.basicConfig(level=logging.INFO,
-                    format=log_format,
-                    handlers=[
-                        logging.FileHandler("musessonar_analysis.log", encoding='utf-8'),
-                        logging.StreamHandler()
-                    ])
+from typing import List, Dict, Tuple, Optional, Any, Literal, Union, Callable, TYPE_CHECKING # 필요한 타입 임포트
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer # SBERT 모델 타입
+    from google.generativeai.generative_models import GenerativeModel # Gemini 모델 타입
+
+# --- 로깅 설정 (app 등에서 이미 구성했으면 그대로 사용) ---
+setup_logging("musessonar_analysis.log")
 logging.info("==================== MuseSonar 스크립트 시작 ====================")
 logging.info("로깅 설정 완료.")
 
 
-# --- 캐시 설정 ---
-CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache_dir")
-cache: Optional[diskcache.Cache] = None
-try:
-    cache = diskcache.Cache(CACHE_DIR)
-    logging.info(f"DiskCache 초기화 완료. 캐시 디렉토리: {CACHE_DIR}")
-
-    # --- 임시 코드(디버깅용): 캐시 클리어 ---
-    # if cache:
-        # logging.warning("!!! 개발용 임시 코드: DiskCache 전체 초기화 수행 !!!")
-        # cache.clear()
-        # logging.warning("!!! 캐시 초기화 완료 !!!")
-    
-except Exception as e:
-    logging.critical(f"DiskCache 초기화 실패! 캐시 기능 비활성화. 오류: {e}")
-    cache = None
-
-# --- KoNLPy 임포트 ---
-okt: Optional[OktType] = None # Okt 객체 타입 힌트 (Optional)
-try:
-    from konlpy.tag import Okt
-    okt = Okt()
-    logging.info("KoNLPy Okt 형태소 분석기 로딩 완료.")
-except ImportError:
-    logging.warning("konlpy 라이브러리를 찾을 수 없습니다. 'pip install konlpy JPype1'으로 설치해주세요. 키워드 추출 기능이 비활성화됩니다.")
-    okt = None
-except Exception as e:
-    logging.warning(f"KoNLPy Okt 로딩 중 오류 발생: {e}. 키워드 추출 기능이 비활성화됩니다.", exc_info=True)
-    okt = None
+# --- 캐시 / KoNLPy Okt ---
+# diskcache와 Okt(JVM)는 resources 레지스트리에서 처음 사용할 때 초기화합니다.
 
 
 # --- 환경 변수 로드 ---
@@ -101,6 +93,10 @@ if not KIPRIS_API_KEY:
 else:
     logging.info("KIPRIS API 키 확인 완료.")
 
+# 외부 검색 API 주소 (벤치마크/오프라인 재생 시 환경 변수로 로컬 스텁 서버 주소로 교체)
+GOOGLE_SEARCH_URL: str = os.getenv('MUSESONAR_GOOGLE_SEARCH_URL', "https://www.googleapis.com/customsearch/v1")
+KIPRIS_API_BASE_URL: str = os.getenv('MUSESONAR_KIPRIS_API_BASE_URL', "https://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice")
+
 
 # 검색 결과 및 딕셔너리 타입 정의 (딕셔너리 리스트)
 GoogleResultType = List[Dict[str, str]]
@@ -109,6 +105,7 @@ LlmVerificationResultType = Tuple[str, str] # LLM 검증 결과 타입 (상태 
 ResultDictType = Dict[str, Any] # 필요시 더 상세하게 정의 가능
 SortedResultItemType = Dict[str, Any] # 'text', 'score', 'link', 'source' 등 포함
 LlmVerificationResultsMapType = Dict[str, LlmVerificationResultType] # text -> (status, reason)
+ProgressCallbackType = Callable[[str, Dict[str, Any]], None] # (이벤트 이름, 페이로드) - 스트리밍 응답용 진행 상황 콜백
 llm_verification_results: LlmVerificationResultsMapType = {}
 
 
@@ -116,24 +113,29 @@ llm_verification_results: LlmVerificationResultsMapType = {}
 
 # 키워드 추출 함수
 def extract_keywords(text: str, max_kw: int = config.MAX_KIPRIS_KEYWORDS) -> str:
-    """KoNLPy Okt와 정규식을 사용하여 입력 텍스트에서 명사 및 영문/숫자 키워드를 추출합니다."""
-    logging.info(f"키워드 추출 시작 (max_kw={max_kw}): '{text[:50]}...'")
+    """
+    키워드 추출 백엔드(config.KEYWORD_EXTRACTOR_BACKEND)와 정규식을 사용하여 입력 텍스트에서 명사 및 영문/숫자 키워드를 추출합니다.
+    결과는 정규화된 텍스트 기준 LRU 메모에 저장되어, 같은 아이디어의 하위 질의/KIPRIS 단계 구성 시 다시 계산하지 않습니다.
+    """
+    return _extract_keywords_memo(normalize_keyword_text(text), max_kw, config.KEYWORD_EXTRACTOR_BACKEND)
 
-    if okt is None:
-        logging.warning("KoNLPy Okt 객체가 없어 키워드 추출 불가. 원문 텍스트를 사용합니다.")
-        return text.strip()
+@functools.lru_cache(maxsize=config.KEYWORD_MEMO_SIZE)
+def _extract_keywords_memo(text: str, max_kw: int, backend_name: str) -> str:
+    logging.info(f"키워드 추출 시작 (max_kw={max_kw}, backend={backend_name}): '{text[:50]}...'")
+    extractor: KeywordExtractor = get_extractor(backend_name)
+    if extractor.name != backend_name:
+        logging.warning(f"키워드 추출 백엔드 '{backend_name}'를 사용할 수 없어 '{extractor.name}' 백엔드를 사용합니다.")
 
     keywords: List[str] = []
     try:
-        pos_tagged: List[Tuple[str, str]] = okt.pos(text, norm=True, stem=True)
-        nouns: List[str] = [n for n, t in pos_tagged if t == 'Noun']
-        logging.debug(f"형태소 분석 결과 (명사): {nouns}")
+        nouns: List[str] = extractor.extract_nouns(text)
+        logging.debug("형태소 분석 결과 (명사): %s", nouns)
 
         alphas_digits: List[str] = re.findall(r'\b[A-Za-z]{1,5}\d*\b|\b\d+[A-Za-z]+\b', text)
-        logging.debug(f"정규식 추출 결과 (영문/숫자): {alphas_digits}")
+        logging.debug("정규식 추출 결과 (영문/숫자): %s", alphas_digits)
 
         filtered_keywords: List[str] = [w for w in nouns if len(w) > 1] + alphas_digits
-        logging.debug(f"필터링된 키워드: {filtered_keywords}")
+        logging.debug("필터링된 키워드: %s", filtered_keywords)
 
         seen: set[str] = set()
         unique_keywords: List[str] = []
@@ -141,7 +143,7 @@ def extract_keywords(text: str, max_kw: int = config.MAX_KIPRIS_KEYWORDS) -> str
             if k not in seen:
                 unique_keywords.append(k)
                 seen.add(k)
-        logging.debug(f"중복 제거된 키워드: {unique_keywords}")
+        logging.debug("중복 제거된 키워드: %s", unique_keywords)
 
         final_keywords: str = ' '.join(unique_keywords[:max_kw]) if unique_keywords else text.strip()
 
@@ -154,10 +156,10 @@ def extract_keywords(text: str, max_kw: int = config.MAX_KIPRIS_KEYWORDS) -> str
 
 
 # =============== KIPRIS 특허 검색 함수  ===============
-# requests + tenacity + fallback + XML 파싱 조합 사용
+# http_client(aiohttp) + tenacity + fallback + XML 파싱 조합 사용
 
 # KIPRIS 특허 검색 함수
-@cache.memoize(expire=864000) if cache else lambda f: f # 캐시 비활성화 시 데코레이터 적용 안 함
+@resources.memoize('kipris_search') # 2단 캐시 (보관 시간: config.CACHE_NAMESPACE_TTLS)
 def search_kipris_patents(query: str) -> KiprisResultType:
     """
     KIPRIS 특허 검색 결과를 가져옵니다 (캐싱 적용).
@@ -172,147 +174,258 @@ def search_kipris_patents(query: str) -> KiprisResultType:
 
     try:
         logging.debug(f"캐시 미스 또는 만료. KIPRIS 내부 검색 함수 호출: query='{query}'")
-        results: KiprisResultType = _search_kipris_patents_internal(query, api_key)
+        with telemetry.span('search.kipris') as search_span:
+            results: KiprisResultType = _search_kipris_patents_internal(query, api_key)
+            search_span.set(results=len(results))
         logging.info(f"KIPRIS 검색 완료 (캐시 저장됨): query='{query}', 결과 {len(results)}개")
+    except (RateLimitExceeded, CircuitOpenError):
+        telemetry.record_search('kipris', 'skipped')
+        raise # 예산 부족/회로 차단 결과(빈 목록)가 캐시되지 않도록 그대로 전달
     except Exception as e:
         logging.error(f"KIPRIS 검색 중 예외 발생 (캐시 래퍼): query='{query}'", exc_info=True)
+        telemetry.record_search('kipris', 'error')
         results = []
 
     return results
 
-# KIPRIS API 응답 타입 정의 (XML 요소 리스트, None, 또는 False)
-KiprisApiResponseType = List[ET.Element] | None | Literal[False] # Python 3.10+ Union Syntax
-
-# 재시도 전 로그를 남기기 위한 설정 (logging 모듈과 연동)
-# tenacity가 재시도하기 전에 INFO 레벨로 로그를 남김
-tenacity_logger = logging.getLogger(__name__) # 현재 모듈의 로거 사용
-before_sleep = before_sleep_log(tenacity_logger, logging.INFO)
+# KIPRIS API 응답 타입 정의 (압축 레코드 리스트, None, 또는 False)
+KiprisApiResponseType = List[KiprisRecordType] | None | Literal[False] # Python 3.10+ Union Syntax
 
-# 재시도 데코레이터 설정
-@retry(
-    stop=stop_after_attempt(3),  # 최대 3번 시도 (최초 1번 + 재시도 2번)
-    wait=wait_exponential(multiplier=1, min=2, max=10), # 2초, 4초 간격으로 재시도 (최대 10초)
-    retry=retry_if_exception_type((requests.exceptions.Timeout, requests.exceptions.ConnectionError)), # Timeout 또는 ConnectionError 발생 시 재시도
-    before_sleep=before_sleep # 재시도 전에 위에서 설정한 로그 남기기
-)
-
-# KIPRIS 특허 검색 요청 함수(재시도 로직 추가됨)
+# KIPRIS 특허 검색 요청 함수(동기 래퍼)
 def request_kipris(url: str, params: Dict[str, Any], search_type: str) -> KiprisApiResponseType:
-    """KIPRIS API 요청 및 기본 처리 (tenacity 재시도 적용)"""
-    logging.debug(f"KIPRIS API 요청 시도: Type='{search_type}', URL='{url}'")
+    """KIPRIS API 요청 및 기본 처리 (request_kipris_async를 공용 이벤트 루프에서 실행)"""
+    return http_client.run_sync(request_kipris_async(url, params, search_type))
+
+# KIPRIS 결과 페이지 1개 요청 함수 (페이지 캐시 -> 스트리밍 요청/파싱)
+async def _request_kipris_page(url: str, params: Dict[str, Any], search_type: str, page_no: int) -> KiprisPage:
+    """페이지 캐시에 있으면 호출 예산을 쓰지 않고 반환하고, 없으면 응답을 스트리밍 파싱하여 압축 레코드로 캐시합니다."""
+    cached: Optional[KiprisPage] = await kipris_client.load_cached_page(url, params, page_no)
+    if cached is not None:
+        logging.debug("KIPRIS %s %d페이지 캐시 사용 (%d건)", search_type, page_no, len(cached.records))
+        return cached
+    circuit_breaker.check('kipris') # 차단 중이면 대기/재시도 없이 즉시 실패
+    await rate_limiter.acquire_async('kipris') # 스레드를 점유하지 않고 루프에서 토큰 대기
+    # Timeout/ConnectionError 시 최대 3회 시도 (2초, 4초 간격, 최대 10초)
+    response, page = await http_client.fetch_stream(url, KiprisPageConsumer, params={**params, 'pageNo': page_no},
+                                                    headers={'User-Agent': 'MuseSonar-prototype/1.0'}, timeout=30, retry=True)
+    if response.status_code >= 500:
+        circuit_breaker.record_failure('kipris', f"HTTP {response.status_code}")
+    else:
+        circuit_breaker.record_success('kipris')
+    response.raise_for_status() # HTTP 5xx 같은 오류 시 여기서 예외 발생 (재시도 안 함)
+    await kipris_client.store_page(url, params, page_no, page)
+    return page
+
+# KIPRIS 특허 검색 요청 함수(재시도 로직은 http_client 비동기 계층에서 처리)
+async def request_kipris_async(url: str, params: Dict[str, Any], search_type: str) -> KiprisApiResponseType:
+    """
+    KIPRIS API 비동기 요청 및 기본 처리 (http_client 공용 연결 풀 + tenacity 비동기 재시도 적용)
+    1페이지 결과의 전체 건수를 보고 config.KIPRIS_MAX_PAGES까지 나머지 페이지를 동시에 요청합니다.
+    """
+    logging.debug("KIPRIS API 요청 시도: Type='%s', URL='%s'", search_type, url)
     try:
-        logging.debug(f"  요청 Params (일부): word='{params.get('word', '')}', rows='{params.get('numOfRows')}', query(title/astrt)='{params.get('inventionTitle', 'N/A')}'")
-        response = requests.get(url, params=params, headers={'User-Agent': 'MuseSonar-prototype/1.0'}, timeout=30) # timeout은 그대로 유지
-        response.raise_for_status() # HTTP 5xx 같은 오류 시 여기서 예외 발생 (기본적으로 tenacity 재시도 안 함)
+        logging.debug("  요청 Params (일부): word='%s', rows='%s', query(title/astrt)='%s'", params.get('word', ''), params.get('numOfRows'), params.get('inventionTitle', 'N/A'))
+        first_page: KiprisPage = await _request_kipris_page(url, params, search_type, 1)
 
         # --- 성공적인 응답 수신 후 처리 ---
-        logging.debug(f"KIPRIS 응답 수신 완료 (Status: {response.status_code}). XML 파싱 시작...")
-        xml_root: ET.Element = ET.fromstring(response.content)
-        result_code: Optional[str] = xml_root.findtext('.//resultCode')
-        result_msg: Optional[str] = xml_root.findtext('.//resultMsg')
-
-        if result_code == '00':
-            items: List[ET.Element] = xml_root.findall('.//item')
-            if items:
-                logging.info(f"KIPRIS {search_type} 검색 성공: {len(items)}개 결과 확보.")
-                return items # 성공 시 결과 반환
-            else:
-                logging.warning(f"KIPRIS {search_type} 검색 성공했으나 결과 0건.")
-                return None # 성공했으나 결과 없음
-        else:
+        if not first_page.ok:
             # KIPRIS API 자체 오류 (e.g., 잘못된 요청, 키 오류 등)는 재시도 대상 아님
-            logging.error(f"KIPRIS {search_type} API 자체 오류 (재시도 대상 아님): {result_msg} (코드: {result_code})")
+            logging.error(f"KIPRIS {search_type} API 자체 오류 (재시도 대상 아님): {first_page.result_msg} (코드: {first_page.result_code})")
             return False # API 오류 시 False 반환
 
-    # --- 예외 처리: tenacity가 재시도할 예외 ---
+        records: List[KiprisRecordType] = list(first_page.records)
+        extra_pages: List[int] = kipris_client.pages_to_fetch(first_page, int(params.get('numOfRows') or 0))
+        if extra_pages:
+            # 추가 페이지는 있으면 좋은 결과: 실패/예산 부족 페이지는 건너뛰고 받은 페이지만 합침
+            outcomes: List[Any] = await asyncio.gather(
+                *(_request_kipris_page(url, params, search_type, page_no) for page_no in extra_pages), return_exceptions=True
+            )
+            failed_pages: List[int] = []
+            for page_no, outcome in zip(extra_pages, outcomes):
+                if isinstance(outcome, KiprisPage) and outcome.ok:
+                    records.extend(outcome.records)
+                else:
+                    failed_pages.append(page_no)
+                    if isinstance(outcome, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                        circuit_breaker.record_failure('kipris', outcome)
+                    logging.warning(f"KIPRIS {search_type} {page_no}페이지 건너뜀: {outcome.result_msg if isinstance(outcome, KiprisPage) else repr(outcome)}")
+            if failed_pages:
+                # 부분 결과: search_kipris_patents(memoize) 저장과 분석 결과 캐시(result_cache.is_cacheable) 모두에서 제외
+                # (예산 부족/회로 차단 페이지는 acquire_async/circuit_breaker.check가 사유를 이미 기록함)
+                rate_limiter.record_degradation('kipris', kipris_client.REASON_PARTIAL_PAGES)
+                resources.skip_memoize_store()
+        if records:
+            logging.info(f"KIPRIS {search_type} 검색 성공: {len(records)}개 결과 확보 (페이지 {1 + len(extra_pages)}개, 전체 {first_page.total_count}건).")
+            return records # 성공 시 결과 반환
+        else:
+            logging.warning(f"KIPRIS {search_type} 검색 성공했으나 결과 0건.")
+            return None # 성공했으나 결과 없음
+
+    # --- 예외 처리: 호출 예산 부족/회로 차단 (다음 Fallback 단계 없이 검색 중단) ---
+    except (RateLimitExceeded, CircuitOpenError):
+        raise
+
+    # --- 예외 처리: 재시도를 모두 소진한 예외 ---
     except requests.exceptions.Timeout as e:
-        logging.warning(f"KIPRIS {search_type} API 요청 시간 초과 (timeout=30s). Tenacity 재시도 예정...")
-        raise e # 예외를 다시 발생시켜 tenacity가 잡고 재시도하도록 함
+        logging.error(f"KIPRIS {search_type} API 요청 시간 초과 (timeout=30s, 재시도 소진).")
+        circuit_breaker.record_failure('kipris', e)
+        return False # 다음 Fallback 단계로 진행
     except requests.exceptions.ConnectionError as e:
-        logging.warning(f"KIPRIS {search_type} API 연결 오류 발생. Tenacity 재시도 예정...")
-        raise e # 예외를 다시 발생시켜 tenacity가 잡고 재시도하도록 함
+        logging.error(f"KIPRIS {search_type} API 연결 오류 발생 (재시도 소진).")
+        circuit_breaker.record_failure('kipris', e)
+        return False # 다음 Fallback 단계로 진행
 
     # --- 예외 처리: tenacity가 재시도하지 않을 예외 ---
     except requests.exceptions.RequestException as e: # Timeout, ConnectionError 외의 requests 예외
         logging.error(f"KIPRIS {search_type} API 요청 중 기타 오류 발생 (재시도 대상 아님): {e}", exc_info=True)
         return False # 재시도 안 할 오류 시 False 반환
-    except ET.ParseError as e: # XML 파싱 오류
+    except XMLSyntaxError as e: # XML 파싱 오류 (스트리밍 파서)
         logging.error(f"KIPRIS {search_type} API 응답 XML 파싱 오류 (재시도 대상 아님): {e}", exc_info=True)
-        try:
-            # 파싱 오류 시 응답 내용 일부 로깅 (디버깅 도움)
-            logging.debug(f"XML 파싱 오류 시 응답 내용 (일부): {response.text[:500]}...")
-        except NameError: pass # response 객체가 없을 수도 있음
         return False # 재시도 안 할 오류 시 False 반환
     except Exception as e: # 그 외 모든 예상치 못한 예외
         logging.error(f"KIPRIS {search_type} 검색 중 알 수 없는 오류 발생 (재시도 대상 아님)", exc_info=True)
         return False # 재시도 안 할 오류 시 False 반환
 
+# KIPRIS 검색 단계 타입 (단계 이름, URL, 요청 파라미터)
+KiprisStageType = Tuple[str, str, Dict[str, Any]]
+
+# KIPRIS 검색 단계 구성 함수
+def _build_kipris_stages(query: str, search_keywords: str, api_key: str) -> List[KiprisStageType]:
+    """우선순위 순서의 KIPRIS 검색 단계 목록을 만듭니다. 키워드가 원문과 같으면 3단계는 제외합니다."""
+    url_advanced: str = f"{KIPRIS_API_BASE_URL}/getAdvancedSearch"
+    url_word: str = f"{KIPRIS_API_BASE_URL}/getWordSearch"
+    stages: List[KiprisStageType] = [
+        # 1단계: 키워드 기반 Advanced Search
+        ("Advanced(Keyword)", url_advanced, {
+            'word': '', 'inventionTitle': search_keywords, 'astrtCont': search_keywords,
+            'patent': 'true', 'utility': 'true', 'numOfRows': config.KIPRIS_ADVANCED_SEARCH_ROWS,
+            'pageNo': 1, 'sortSpec': 'OPD', 'descSort': 'true', 'ServiceKey': api_key
+        }),
+        # 2단계: 원문 기반 Word Search
+        ("Word(Original)", url_word, { 'word': query, 'year': 0, 'patent': 'true', 'utility': 'true', 'numOfRows': config.KIPRIS_WORD_SEARCH_ROWS, 'pageNo': 1, 'ServiceKey': api_key }),
+    ]
+    # 3단계: 키워드 기반 Word Search
+    if search_keywords != query.strip():
+        stages.append(("Word(Keyword)", url_word, { 'word': search_keywords, 'year': 0, 'patent': 'true', 'utility': 'true', 'numOfRows': config.KIPRIS_WORD_SEARCH_ROWS, 'pageNo': 1, 'ServiceKey': api_key }))
+    else:
+        logging.info("KIPRIS 3단계 검색 건너뜀 (추출된 키워드가 원문과 동일).")
+    return stages
+
+# KIPRIS 순차 Fallback 실행 함수
+def _run_kipris_stages_sequential(stages: List[KiprisStageType]) -> Tuple[KiprisApiResponseType, Optional[str]]:
+    """단계를 하나씩 실행하고, 결과가 없거나 오류일 때만 다음 단계로 넘어갑니다. (결과, 채택 단계 이름) 반환"""
+    items: KiprisApiResponseType = None
+    for stage_index, (search_type, url, params) in enumerate(stages):
+        if stage_index > 0:
+            fallback_reason: str = "API 오류" if items is False else "결과 없음"
+            logging.info(f"KIPRIS {stage_index}단계 결과({fallback_reason}). {stage_index + 1}단계 시도: {search_type} (word='{str(params.get('word', ''))[:50]}', max_rows={params.get('numOfRows')})")
+        else:
+            logging.info(f"KIPRIS 1단계 시도: {search_type} (키워드='{params.get('inventionTitle', '')}', max_rows={params.get('numOfRows')})")
+        items = request_kipris(url, params, search_type)
+        if isinstance(items, list) and items:
+            return items, search_type
+    return items, None
+
+# KIPRIS 투기적(speculative) 실행 함수
+async def _run_kipris_stages_speculative(stages: List[KiprisStageType],
+                                         hedge_delay_s: float = config.KIPRIS_HEDGE_DELAY_S) -> Tuple[KiprisApiResponseType, Optional[str]]:
+    """
+    1단계를 먼저 시작하고, hedge_delay_s 안에 결과가 확정되지 않거나 먼저 끝난 단계가 실패/0건이면 나머지 단계를 동시에 시작합니다.
+    상위 단계가 모두 실패/0건으로 끝난 경우에만 하위 단계 결과를 채택하며, 결과가 확정되면 나머지 요청은 취소합니다.
+    """
+    tasks: Dict["asyncio.Task[KiprisApiResponseType]", int] = {}
+    outcomes: Dict[int, KiprisApiResponseType] = {}
+
+    def launch(stage_index: int) -> None:
+        search_type, url, params = stages[stage_index]
+        logging.info(f"KIPRIS {stage_index + 1}단계 시작 (speculative): {search_type}")
+        tasks[asyncio.create_task(request_kipris_async(url, params, search_type))] = stage_index
+
+    launch(0)
+    launched: int = 1
+    try:
+        while True:
+            # 우선순위 순서대로 확정 여부 확인: 앞 단계가 끝나지 않았으면 대기, 비어있지 않은 결과면 채택
+            for stage_index in range(len(stages)):
+                if stage_index not in outcomes:
+                    break
+                result: KiprisApiResponseType = outcomes[stage_index]
+                if isinstance(result, list) and result:
+                    return result, stages[stage_index][0]
+            else:
+                return outcomes.get(len(stages) - 1), None # 모든 단계가 실패/0건
+
+            pending = [task for task in tasks if not task.done()]
+            if not pending and launched < len(stages):
+                for stage_index in range(launched, len(stages)):
+                    launch(stage_index)
+                launched = len(stages)
+                continue
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay_s if launched < len(stages) else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    outcomes[tasks[task]] = task.result()
+                except (RateLimitExceeded, CircuitOpenError):
+                    raise
+                except Exception as e:
+                    logging.error(f"KIPRIS {stages[tasks[task]][0]} 단계 실행 중 예외 발생: {e}", exc_info=True)
+                    outcomes[tasks[task]] = False
+            # 헤지 지연 경과 또는 먼저 끝난 단계가 실패/0건이면 나머지 단계 동시 시작
+            if launched < len(stages) and (not done or any(not (isinstance(outcomes[tasks[t]], list) and outcomes[tasks[t]]) for t in done)):
+                for stage_index in range(launched, len(stages)):
+                    launch(stage_index)
+                launched = len(stages)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
 # KIPRIS 특허 검색 내부 함수 
 def _search_kipris_patents_internal(query: str, api_key: str) -> KiprisResultType:
     """
     KIPRIS Open API를 호출하여 특허 검색 결과를 반환합니다. (내부 함수)
-    3단계 Fallback 적용.
+    3단계 Fallback 적용 (config.KIPRIS_SEARCH_STRATEGY에 따라 순차 또는 투기적 실행).
     """
-    logging.info(f"KIPRIS 내부 검색 시작: query='{query}'")
+    logging.info(f"KIPRIS 내부 검색 시작: query='{query}', strategy='{config.KIPRIS_SEARCH_STRATEGY}'")
     if not api_key:
         logging.error("KIPRIS API 키가 없음 (내부 함수). 검색 불가.")
         return []
 
     patent_data: KiprisResultType = []
     search_keywords: str = extract_keywords(query)
+    stages: List[KiprisStageType] = _build_kipris_stages(query, search_keywords, api_key)
 
-    # --- 1단계: 키워드 기반 Advanced Search ---
-    logging.info(f"KIPRIS 1단계 시도: Advanced Search (키워드='{search_keywords}', max_rows={config.KIPRIS_ADVANCED_SEARCH_ROWS})")
-    url_advanced: str = "https://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getAdvancedSearch"
-    params_advanced: Dict[str, Any] = {
-        'word': '', 'inventionTitle': search_keywords, 'astrtCont': search_keywords,
-        'patent': 'true', 'utility': 'true', 'numOfRows': config.KIPRIS_ADVANCED_SEARCH_ROWS,
-        'pageNo': 1, 'sortSpec': 'OPD', 'descSort': 'true', 'ServiceKey': api_key
-    }
-    items: KiprisApiResponseType = request_kipris(url_advanced, params_advanced, "Advanced(Keyword)")
-
-    # --- 2단계: 원문 기반 Word Search ---
-    fallback_reason: str = ""
-    if items is None or items is False:
-        fallback_reason = "API 오류" if items is False else "결과 없음"
-        logging.info(f"KIPRIS 1단계 결과({fallback_reason}). 2단계 시도: Word Search (원문='{query[:50]}...', max_rows={config.KIPRIS_WORD_SEARCH_ROWS})")
-        url_word_orig: str = "https://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getWordSearch"
-        params_word_orig: Dict[str, Any] = { 'word': query, 'year': 0, 'patent': 'true', 'utility': 'true', 'numOfRows': config.KIPRIS_WORD_SEARCH_ROWS, 'pageNo': 1, 'ServiceKey': api_key }
-        items = request_kipris(url_word_orig, params_word_orig, "Word(Original)")
-
-    # --- 3단계: 키워드 기반 Word Search ---
-    if items is None or items is False:
-        fallback_reason = "API 오류" if items is False else "결과 없음"
-        if search_keywords != query.strip():
-            logging.info(f"KIPRIS 2단계 결과({fallback_reason}). 3단계 시도: Word Search (키워드='{search_keywords}', max_rows={config.KIPRIS_WORD_SEARCH_ROWS})")
-            url_word_kw: str = "https://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getWordSearch"
-            params_word_kw: Dict[str, Any] = { 'word': search_keywords, 'year': 0, 'patent': 'true', 'utility': 'true', 'numOfRows': config.KIPRIS_WORD_SEARCH_ROWS, 'pageNo': 1, 'ServiceKey': api_key }
-            items = request_kipris(url_word_kw, params_word_kw, "Word(Keyword)")
-        else:
-            logging.info("KIPRIS 3단계 검색 건너뜀 (추출된 키워드가 원문과 동일).")
+    items: KiprisApiResponseType
+    winning_stage: Optional[str]
+    if config.KIPRIS_SEARCH_STRATEGY == 'speculative':
+        items, winning_stage = http_client.run_sync(_run_kipris_stages_speculative(stages))
+    else:
+        items, winning_stage = _run_kipris_stages_sequential(stages)
 
     # --- 최종 결과 처리 ---
     if isinstance(items, list) and items: # items가 list이고 비어있지 않은 경우
-        logging.info(f"KIPRIS 최종 검색 성공. 파싱 시작 (items: {len(items)}개)")
+        logging.info(f"KIPRIS 최종 검색 성공 (채택 단계: {winning_stage}). 파싱 시작 (items: {len(items)}개)")
         patent_data = parse_kipris_items(items)
+        for record in patent_data:
+            record['kipris_stage'] = winning_stage # 결과를 제공한 검색 단계 기록
+        telemetry.record_search('kipris', 'ok')
     else:
         logging.warning(f"KIPRIS 최종 특허 검색 결과 없음: query='{query}'")
         patent_data = []
+        telemetry.record_search('kipris', 'error' if items is False else 'empty')
 
     logging.info(f"KIPRIS 내부 검색 완료: 최종 결과 {len(patent_data)}개")
     return patent_data
 
-# KIPRIS 특허 XML 파싱
-def parse_kipris_items(items: List[ET.Element]) -> KiprisResultType:
-    """KIPRIS API 응답의 <item> 리스트를 파싱하여 딕셔너리 리스트로 반환합니다."""
-    logging.debug(f"KIPRIS XML 아이템 파싱 시작 (입력 item 수: {len(items)})")
+# KIPRIS 특허 레코드 파싱
+def parse_kipris_items(items: List[KiprisRecordType]) -> KiprisResultType:
+    """KIPRIS 응답에서 뽑은 (출원번호, 제목, 초록) 압축 레코드 리스트를 딕셔너리 리스트로 변환합니다."""
+    logging.debug("KIPRIS 레코드 파싱 시작 (입력 item 수: %d)", len(items))
     parsed_data: KiprisResultType = []
     skipped_count: int = 0
-    for i, item in enumerate(items):
+    for i, (app_num, title, abstract) in enumerate(items):
         try:
-            title: str = item.findtext('inventionTitle', '').strip()
-            abstract: str = item.findtext('astrtCont', '').strip()
-            app_num: str = item.findtext('applicationNumber', '').strip()
             link: str = f"https://kpat.kipris.or.kr/kpat/searchLogina.do?next=MainSearch&target=pat_reg&Method=biblioTM&INPUT_TYPE=applno&query={app_num}" if app_num else ""
             clean_abstract: str = abstract if abstract and abstract != "내용 없음." else ""
 
@@ -324,20 +437,20 @@ def parse_kipris_items(items: List[ET.Element]) -> KiprisResultType:
                     })
             else:
                 skipped_count += 1
-                logging.debug(f"Item {i+1} 건너뜀: 제목과 유효한 초록 모두 없음 (app_num: {app_num})")
+                logging.debug("Item %d 건너뜀: 제목과 유효한 초록 모두 없음 (app_num: %s)", i + 1, app_num, extra=SAMPLED) # hit마다 발생하는 대량 로그
 
         except Exception as e:
             logging.error(f"KIPRIS 아이템 파싱 중 오류 발생 (Item index: {i}): {e}", exc_info=True)
             skipped_count += 1
 
-    logging.debug(f"KIPRIS XML 아이템 파싱 완료 (결과: {len(parsed_data)}개, 건너뜀: {skipped_count}개)")
+    logging.debug("KIPRIS 레코드 파싱 완료 (결과: %d개, 건너뜀: %d개)", len(parsed_data), skipped_count)
     return parsed_data
 
 # ============= KIPRIS 특허 검색함수 종료 ============= 
 
 
 # 구글 검색함수
-@cache.memoize(expire=864000) if cache else lambda f: f
+@resources.memoize('google_search')
 def google_search(query: str, num_results: int = 10) -> GoogleResultType:
     """
     Google 검색 결과를 가져옵니다 (캐싱 적용).
@@ -353,8 +466,12 @@ def google_search(query: str, num_results: int = 10) -> GoogleResultType:
 
     try:
         logging.debug(f"캐시 미스 또는 만료. Google 내부 검색 함수 호출: query='{query}', num={num_results}")
-        results: GoogleResultType = _google_search_internal(query, api_key, cx, num_results)
+        with telemetry.span('search.google') as search_span:
+            results: GoogleResultType = _google_search_internal(query, api_key, cx, num_results)
+            search_span.set(results=len(results))
         logging.info(f"Google 검색 완료 (캐시 저장됨): query='{query}', 결과 {len(results)}개")
+    except (RateLimitExceeded, CircuitOpenError):
+        raise # 예산 부족/회로 차단 결과(빈 목록)가 캐시되지 않도록 그대로 전달
     except Exception as e:
         logging.error(f"Google 검색 중 예외 발생 (캐시 래퍼): query='{query}'", exc_info=True)
         results = []
@@ -365,15 +482,21 @@ def google_search(query: str, num_results: int = 10) -> GoogleResultType:
 def _google_search_internal(query: str, api_key: str, cx: str, num_results: int = 10) -> GoogleResultType:
     """Google Custom Search API를 호출하여 검색 결과를 반환"""
     logging.info(f"Google 내부 검색 시작: query='{query}', num={num_results}")
-    search_url: str = "https://www.googleapis.com/customsearch/v1"
+    search_url: str = GOOGLE_SEARCH_URL
     headers: Dict[str, str] = {'User-Agent': 'MuseSONAR - prototype/1.0'}
     params: Dict[str, Any] = {'key': api_key, 'cx': cx, 'q': query, 'num': num_results}
 
     try:
+        circuit_breaker.check('google')
+        rate_limiter.acquire('google')
         logging.debug(f"Google API 요청 시작: URL='{search_url}'")
         logging.debug(f"  요청 Params (일부): q='{query}', num='{num_results}'")
 
-        response = requests.get(search_url, params=params, headers=headers, timeout=20)
+        response = http_client.get(search_url, params=params, headers=headers, timeout=20)
+        if response.status_code >= 500:
+            circuit_breaker.record_failure('google', f"HTTP {response.status_code}")
+        else:
+            circuit_breaker.record_success('google')
         response.raise_for_status()
         logging.debug(f"Google API 응답 수신 완료 (Status: {response.status_code}). JSON 파싱 시작...")
         search_results_json: Dict[str, Any] = response.json()
@@ -389,41 +512,33 @@ def _google_search_internal(query: str, api_key: str, cx: str, num_results: int
                     content: str = f"{title}: {snippet}" if title and snippet else title if title else snippet
                     result_data.append({'text': content, 'link': link, 'source': 'Google Search'})
             logging.info(f"Google 검색 파싱 완료: {len(result_data)}개의 유효 결과 확보.")
+            telemetry.record_search('google', 'ok' if result_data else 'empty')
             return result_data
         else:
             logging.warning("Google 검색 결과가 없습니다 ('items' 키 없음).")
+            telemetry.record_search('google', 'empty')
             return []
-    except requests.exceptions.Timeout:
+    except (RateLimitExceeded, CircuitOpenError):
+        telemetry.record_search('google', 'skipped')
+        raise
+    except requests.exceptions.Timeout as e:
         logging.error("Google Search API 요청 시간 초과 (timeout=20s).")
+        circuit_breaker.record_failure('google', e)
+        telemetry.record_search('google', 'error')
         return []
     except requests.exceptions.RequestException as e:
         logging.error(f"Google Search API 요청 중 오류 발생: {e}", exc_info=True)
+        if not isinstance(e, requests.exceptions.HTTPError): # 연결 오류 등 (HTTP 5xx는 응답 수신 시 기록)
+            circuit_breaker.record_failure('google', e)
+        telemetry.record_search('google', 'error')
         return []
     except Exception as e:
         logging.error(f"Google 검색 처리 중 알 수 없는 오류 발생", exc_info=True)
+        telemetry.record_search('google', 'error')
         return []
 
-# 구글 검색 발췌 함수
-def build_excerpt(full_text: str) -> str:
-    """입력 텍스트에서 LLM 검증에 사용할 스니펫을 생성합니다. 특정 키워드 포함 시 길이를 늘립니다."""
-    # 키워드가 텍스트 앞부분(예: 1200자)에 있는지 확인
-    # full_text가 1200자보다 짧을 수 있으므로 슬라이싱 주의
-    check_range = min(len(full_text), 1200)
-    if any(k in full_text[:check_range] for k in config.KW_HINTS):
-        # 힌트 키워드가 있으면 더 길게 자름 (예: 1000자)
-        # full_text가 1000자보다 짧을 수 있으므로 슬라이싱 주의
-        target_length = min(len(full_text), 1000)
-        logging.debug(f"힌트 키워드 발견! 스니펫 길이를 {target_length}자로 확장.")
-        return full_text[:target_length]
-    else:
-        # 힌트 키워드 없으면 기본 길이로 자름
-        target_length = min(len(full_text), config.MAX_EXCERPT)
-        # logging.debug(f"힌트 키워드 없음. 스니펫 기본 길이 {target_length}자 적용.") # 로그가 너무 많을 수 있어 주석 처리
-        return full_text[:target_length]
-
-
 # LLM 2차 검증 함수
-@cache.memoize(expire=86400) if cache else lambda f: f # 1일 캐싱
+@resources.memoize('llm_verdict', key=cache_keys.llm_verdict_key) # 모델 객체 대신 모델명으로 키 생성
 def verify_similarity_with_llm_cached(user_idea: str,
                                     search_text_excerpt: str,
                                     source_type_mapped: str,
@@ -446,12 +561,224 @@ def verify_similarity_with_llm(user_idea: str, hit: Dict[str, Any], model_llm: O
     LLM 검증을 수행합니다 (캐싱 적용).
     입력 데이터를 준비하고 캐시된 함수를 호출합니다.
     """
+    excerpt, source_type_mapped = prepare_llm_inputs(hit) # 일괄 검증 캐시 조회/저장과 같은 입력 (llm_inputs.verdict_key_for_hit)
     # 해당llm 2차검증 로직은 비공개 처리 영역입니다
 
+LLM_VALID_STATUSES: Tuple[str, ...] = ("Yes", "No", "Unclear")
+LLM_BUDGET_SKIP_REASON: str = "LLM 호출 예산(요청 속도/일일 할당량) 부족으로 검증을 건너뛰었습니다."
+LLM_CIRCUIT_SKIP_REASON: str = "Gemini 서비스 장애(회로 차단)로 검증을 건너뛰었습니다."
+
+# LLM 검증 캐시 조회/저장 함수 (verify_similarity_with_llm_cached와 같은 캐시 항목 사용)
+def _lookup_cached_llm_verdict(user_idea: str, hit: Dict[str, Any], model_llm: GenerativeModel) -> Optional[LlmVerificationResultType]:
+    """단건 검증 캐시에 저장된 결과가 있으면 반환합니다."""
+    return cache_tiers.get('llm_verdict', verdict_key_for_hit(user_idea, hit, model_llm))
+
+def _store_cached_llm_verdict(user_idea: str, hit: Dict[str, Any], model_llm: GenerativeModel, verdict: LlmVerificationResultType) -> None:
+    """일괄 검증 결과를 단건 검증 캐시 항목에 저장하여, 이후 단건 조회도 캐시 히트가 되도록 합니다."""
+    cache_tiers.set('llm_verdict', verdict_key_for_hit(user_idea, hit, model_llm), verdict) # 단건 검증 캐시와 같은 네임스페이스 TTL
+
+# LLM 일괄 검증 내부 함수
+def _verify_batch_with_llm_internal(user_idea: str, hits: List[Dict[str, Any]], model_llm: GenerativeModel) -> Dict[int, LlmVerificationResultType]:
+    """
+    [내부 함수] 여러 hit을 한 번의 Gemini 호출로 검증합니다.
+    반환값은 {hit 인덱스: (status, reason)}이며, 응답 JSON에서 유효하게 읽힌 항목만 포함합니다.
+    """
+    hit_blocks: List[str] = []
+    for i, hit in enumerate(hits):
+        excerpt, source_type_mapped = prepare_llm_inputs(hit)
+        hit_blocks.append(f"<hit id=\"{i + 1}\" source=\"{source_type_mapped}\">\n{excerpt}\n</hit>")
+    prompt: str = config.LLM_BATCH_VERIFICATION_PROMPT_TEMPLATE.format(
+        user_idea=user_idea, hits_block="\n".join(hit_blocks), num_hits=len(hits)
+    )
+
+    try:
+        response = model_llm.generate_content(
+            prompt, generation_config={'response_mime_type': 'application/json', 'temperature': 0.0}
+        )
+        raw_text: str = response.text.strip()
+        circuit_breaker.record_success('gemini')
+    except Exception as e:
+        logging.error(f"LLM 일괄 검증 호출 중 오류 발생 (hit {len(hits)}개): {e}", exc_info=True)
+        circuit_breaker.record_failure('gemini', e)
+        return {}
+
+    # 코드 블록으로 감싼 응답 처리
+    raw_text = re.sub(r'^```(?:json)?\s*|\s*```$', '', raw_text)
+    try:
+        parsed: Any = json.loads(raw_text)
+    except json.JSONDecodeError:
+        logging.warning(f"LLM 일괄 검증 응답 JSON 파싱 실패. 응답 (일부): {raw_text[:200]}")
+        return {}
+    if not isinstance(parsed, list):
+        logging.warning(f"LLM 일괄 검증 응답이 JSON 배열이 아닙니다: {type(parsed).__name__}")
+        return {}
+
+    verdicts: Dict[int, LlmVerificationResultType] = {}
+    for entry in parsed:
+        if not isinstance(entry, dict):
+            continue
+        hit_id: Any = entry.get('id')
+        status: Any = entry.get('status')
+        reason: Any = entry.get('reason', '')
+        if isinstance(hit_id, int) and 1 <= hit_id <= len(hits) and status in LLM_VALID_STATUSES:
+            verdicts[hit_id - 1] = (status, str(reason))
+    logging.debug(f"LLM 일괄 검증 응답 파싱 완료: 유효 {len(verdicts)}개 / 요청 {len(hits)}개")
+    return verdicts
+
+# LLM 일괄 검증 함수
+def verify_hits_batch(user_idea: str, hits: List[Dict[str, Any]], model_llm: GenerativeModel) -> LlmVerificationResultsMapType:
+    """
+    캐시에 없는 hit들을 한 번의 Gemini 호출로 검증하고 결과를 hit 단위 캐시에 저장합니다.
+    응답 JSON이 깨졌거나 누락된 hit은 단건 검증(verify_similarity_with_llm)으로 대체합니다.
+    """
+    results: LlmVerificationResultsMapType = {}
+    pending: List[Dict[str, Any]] = []
+    for hit in hits:
+        cached_verdict: Optional[LlmVerificationResultType] = _lookup_cached_llm_verdict(user_idea, hit, model_llm)
+        if cached_verdict is not None:
+            results[hit.get('text', '')] = cached_verdict
+        else:
+            pending.append(hit)
+    logging.debug(f"LLM 일괄 검증: 캐시 히트 {len(results)}개, 호출 대상 {len(pending)}개")
+
+    if pending:
+        try:
+            circuit_breaker.check('gemini')
+            rate_limiter.acquire('gemini')
+        except (RateLimitExceeded, CircuitOpenError) as e:
+            skip_reason: str = LLM_CIRCUIT_SKIP_REASON if isinstance(e, CircuitOpenError) else LLM_BUDGET_SKIP_REASON
+            for hit in pending:
+                results[hit.get('text', '')] = ("Skipped", skip_reason)
+                telemetry.record_llm_call('batch', 'Skipped')
+            return results
+        with telemetry.span('llm.call', mode='batch', hits=len(pending)) as call_span:
+            verdicts: Dict[int, LlmVerificationResultType] = _verify_batch_with_llm_internal(user_idea, pending, model_llm)
+            call_span.set(valid=len(verdicts))
+        for i, hit in enumerate(pending):
+            if i in verdicts:
+                telemetry.record_llm_call('batch', verdicts[i][0])
+                _store_cached_llm_verdict(user_idea, hit, model_llm, verdicts[i])
+                results[hit.get('text', '')] = verdicts[i]
+            else:
+                logging.info(f"LLM 일괄 검증 응답에 유효한 결과 없음. 단건 검증으로 대체: '{hit.get('text', '')[:30]}...'")
+                results[hit.get('text', '')] = verify_hit_within_budget(user_idea, hit, model_llm)
+    return results
+
+# 호출 예산 안에서 단건 LLM 검증 함수
+def verify_hit_within_budget(user_idea: str, hit: Dict[str, Any], model_llm: GenerativeModel) -> LlmVerificationResultType:
+    """캐시에 결과가 있으면 그대로 쓰고, 없으면 회로 상태와 Gemini 호출 예산을 확인한 뒤 단건 검증합니다. 차단/예산 부족이면 Skipped."""
+    cached_verdict: Optional[LlmVerificationResultType] = _lookup_cached_llm_verdict(user_idea, hit, model_llm)
+    if cached_verdict is not None:
+        return cached_verdict
+    try:
+        circuit_breaker.check('gemini')
+        rate_limiter.acquire('gemini')
+    except CircuitOpenError:
+        telemetry.record_llm_call('single', 'Skipped')
+        return ("Skipped", LLM_CIRCUIT_SKIP_REASON)
+    except RateLimitExceeded:
+        telemetry.record_llm_call('single', 'Skipped')
+        return ("Skipped", LLM_BUDGET_SKIP_REASON)
+    with telemetry.span('llm.call', mode='single') as call_span:
+        verdict: LlmVerificationResultType = verify_similarity_with_llm(user_idea, hit, model_llm)
+        call_span.set(verdict=verdict[0])
+    telemetry.record_llm_call('single', verdict[0])
+    if verdict[0] == "Error": # 단건 검증은 호출 오류를 "Error" 상태로 반환
+        circuit_breaker.record_failure('gemini', verdict[1])
+    else:
+        circuit_breaker.record_success('gemini')
+    return verdict
+
+# LLM 검증 전용 스레드 풀 (프로세스 전체 공유, max_workers가 곧 Gemini 동시 호출 상한)
+llm_verification_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=config.LLM_VERIFICATION_MAX_WORKERS, thread_name_prefix="llm-verify"
+)
+
+# LLM 병렬 검증 함수
+def verify_hits_concurrently(user_idea: str,
+                             hits: List[SortedResultItemType],
+                             model_llm: Optional[GenerativeModel],
+                             deadline_s: float = config.LLM_VERIFICATION_DEADLINE_S,
+                             on_result: Optional[Callable[[str, LlmVerificationResultType], None]] = None) -> LlmVerificationResultsMapType:
+    """
+    여러 검증 대상(hit)의 LLM 검증을 공유 스레드 풀에서 동시에 수행합니다.
+    deadline_s 안에 끝나지 않은 검증은 "Skipped"로 표시하고, 완료된 결과만 그대로 반환합니다.
+    on_result가 주어지면 검증 결과가 하나 확정될 때마다 (text, (status, reason))으로 호출합니다.
+    """
+    results: LlmVerificationResultsMapType = {}
+
+    def record(text_key: str, verdict: LlmVerificationResultType) -> None:
+        results[text_key] = verdict
+        if on_result is not None:
+            try:
+                on_result(text_key, verdict)
+            except Exception as e:
+                logging.warning(f"LLM 검증 결과 콜백 처리 중 오류 발생: {e}")
+
+    if not hits:
+        return results
+    if model_llm is None:
+        logging.warning(f"LLM 모델이 없어 검증 대상 {len(hits)}개를 모두 건너뜁니다.")
+        for hit in hits:
+            record(hit.get('text', ''), ("Skipped", "LLM 모델이 설정되지 않아 검증을 건너뛰었습니다."))
+        return results
+
+    if rate_limiter.is_exhausted('gemini'):
+        logging.warning(f"Gemini 일일 할당량 소진. 검증 대상 {len(hits)}개의 LLM 검증 단계를 건너뜁니다.")
+        rate_limiter.record_degradation('gemini', rate_limiter.REASON_QUOTA_EXHAUSTED)
+        for hit in hits:
+            record(hit.get('text', ''), ("Skipped", LLM_BUDGET_SKIP_REASON))
+        return results
+
+    logging.info(f"LLM 병렬 검증 시작: 대상 {len(hits)}개, 동시성 {config.LLM_VERIFICATION_MAX_WORKERS}, 제한 시간 {deadline_s:.1f}s, 일괄 모드={config.LLM_BATCH_VERIFICATION_ENABLED}")
+    started: float = time.monotonic()
+    # 작업 단위: 일괄 모드면 LLM_BATCH_SIZE개씩 묶은 hit 그룹, 아니면 hit 1개
+    # (작업마다 현재 컨텍스트를 복사해 실행: 호출 예산의 분석 요청 범위 유지)
+    futures: Dict[Future, List[str]] = {}
+    if config.LLM_BATCH_VERIFICATION_ENABLED:
+        for start in range(0, len(hits), config.LLM_BATCH_SIZE):
+            chunk: List[SortedResultItemType] = hits[start:start + config.LLM_BATCH_SIZE]
+            future = llm_verification_executor.submit(contextvars.copy_context().run, verify_hits_batch, user_idea, chunk, model_llm)
+            futures[future] = [hit.get('text', '') for hit in chunk]
+    else:
+        for hit in hits:
+            future = llm_verification_executor.submit(contextvars.copy_context().run, verify_hit_within_budget, user_idea, hit, model_llm)
+            futures[future] = [hit.get('text', '')]
+
+    # 완료되는 순서대로 결과 수집 (전체 제한 시간 deadline_s)
+    collected: set[Future] = set()
+    try:
+        for future in as_completed(futures, timeout=deadline_s):
+            collected.add(future)
+            text_keys: List[str] = futures[future]
+            try:
+                outcome: Union[LlmVerificationResultType, LlmVerificationResultsMapType] = future.result()
+                if isinstance(outcome, dict):
+                    for text_key, verdict in outcome.items():
+                        record(text_key, verdict)
+                else:
+                    record(text_keys[0], outcome)
+            except Exception as e:
+                logging.error(f"LLM 검증 작업 중 예외 발생: '{text_keys[0][:30]}...' 외 {len(text_keys) - 1}개", exc_info=True)
+                for text_key in text_keys:
+                    record(text_key, ("Error", f"LLM 검증 중 오류 발생: {e}"))
+    except FuturesTimeoutError:
+        logging.warning(f"LLM 검증 제한 시간({deadline_s:.1f}s) 초과. 미완료 작업은 Skipped 처리합니다.")
+
+    not_done: List[Future] = [future for future in futures if future not in collected]
+    for future in not_done:
+        future.cancel() # 아직 시작하지 않은 작업은 취소 (이미 실행 중인 호출은 백그라운드에서 마무리됨)
+        for text_key in futures[future]:
+            record(text_key, ("Skipped", f"LLM 검증 제한 시간({deadline_s:.0f}초) 초과로 건너뛰었습니다."))
+            telemetry.record_llm_call('batch' if config.LLM_BATCH_VERIFICATION_ENABLED else 'single', 'Timeout')
+
+    logging.info(f"LLM 병렬 검증 완료: 완료 {len(collected)}개, 시간 초과 {len(not_done)}개 ({time.monotonic() - started:.2f}s)")
+    return results
+
 # 점수 계산 함수
 def calculate_MuseSONAR_score(final_rating: str, jhgan_avg_score: float, llm_yes_ratio: float, num_to_verify: int) -> int:
     """최종 등급과 세부 지표를 바탕으로 고유성 점수(0-100) 계산"""
-    logging.debug(f"MuseSonar 점수 계산 시작: rating='{final_rating}', avg_score={jhgan_avg_score:.2f}, yes_ratio={llm_yes_ratio:.2f}, num_verify={num_to_verify}")
+    logging.debug("MuseSonar 점수 계산 시작: rating='%s', avg_score=%.2f, yes_ratio=%.2f, num_verify=%d", final_rating, jhgan_avg_score, llm_yes_ratio, num_to_verify)
     base_score: int = 0
     adjustment: int = 0 # 반올림 후 정수가 되므로 int
 
@@ -463,7 +790,7 @@ def determine_originality(average_score: float, verified_similar_count: int, llm
     평균 유사도, LLM 검증 결과, 최고 유사도 등을 종합하여
     세분화된 고유성 등급 및 해석 메시지를 결정합니다.
     """
-    logging.debug(f"고유성 등급 결정 시작: avg_score={average_score:.2f}, yes_cnt={verified_similar_count}, yes_ratio={llm_yes_ratio:.2f}, has_results={has_search_results_flag}, max_sim={max_similarity_score:.2f}")
+    logging.debug("고유성 등급 결정 시작: avg_score=%.2f, yes_cnt=%d, yes_ratio=%.2f, has_results=%s, max_sim=%.2f", average_score, verified_similar_count, llm_yes_ratio, has_search_results_flag, max_similarity_score)
 
     final_rating: str = "평가 불가"
     interpretation_message: str = "분석 결과를 바탕으로 고유성 등급을 평가하기 어렵습니다."
@@ -549,8 +876,6 @@ def display_results_dashboard(results: AnalysisResultModel) -> None: # 인자 
     else:
         logging.info("표시할 유사 결과가 없습니다.")
 
-logging.debug(f"create_results_dictionary 호출됨. llm_verification_results 내용 (일부): {list(llm_verification_results.items())[:2]}") 
-
 #결과 딕셔너리 생성 함수
 def create_results_dictionary(
     final_rating: str,
@@ -570,37 +895,21 @@ def create_results_dictionary(
     """
     모든 평가 결과를 분석하고 구조화된 Pydantic 모델(AnalysisResultModel) 객체로 생성
     """
-    logging.debug("결과 모델(AnalysisResultModel) 생성 시작.")
+    logging.debug("결과 모델(AnalysisResultModel) 생성 시작. llm_verification_results %d개", len(llm_verification_results))
 
     # --- 상위 5개 결과 추출 및 재정렬 (기존 로직 유지) ---
     top_5_raw: List[SortedResultItemType] = sorted_results[:5]
-    logging.debug(f"정렬 전 상위 결과 추출 (최대 5개): 원본 {len(top_5_raw)}개.")
-# 결과 정렬 함수
-    def sort_key_for_top5(item: SortedResultItemType) -> Tuple[int, float]:
-        llm_status: Optional[str] = None
-        text_key: Optional[str] = item.get('text') # Optional[str] 로 명시하는 것이 더 정확
-        logging.debug(f"sort_key: item text (first 30char): '{text_key[:30] if text_key else 'N/A'}'")
-
-        # if 블록 시작
-        if text_key and llm_verification_results and text_key in llm_verification_results:
-            llm_status = llm_verification_results[text_key][0]
-            # if 조건이 참일 때의 로그 (LLM 상태가 있을 때)
-            logging.debug(f"sort_key: LLM status FOUND for '{text_key[:30] if text_key else 'N/A'}': {llm_status}")
-        # else 블록 시작 (if 조건이 거짓일 때)
-        else:
-            # if 조건이 거짓일 때의 로그 (LLM 상태가 없을 때)
-            logging.debug(f"sort_key: No LLM status for '{text_key[:30] if text_key else 'N/A'}'. Reason - text_key: {bool(text_key)}, llm_results_exist: {bool(llm_verification_results)}, text_key_in_map: {text_key in llm_verification_results if text_key and llm_verification_results else 'N/A'}")
-        # if-else 블록 끝
-
-        similarity_score: float = item.get('score', 0.0)
-        llm_priority: int = 0 if llm_status == "Yes" else 1
-        similarity_priority: float = -similarity_score # 점수가 높을수록 작은 값이 되어 오름차순 정렬 시 앞에 옴
-        logging.debug(f"sort_key: Final priorities for '{text_key[:30] if text_key else 'N/A'}': llm_p={llm_priority}, sim_p={similarity_priority:.4f} (calculated_status: {llm_status})")
-        return (llm_priority, similarity_priority)
-
+    logging.debug("정렬 전 상위 결과 추출 (최대 5개): 원본 %d개.", len(top_5_raw))
+    # 상위 결과 재정렬: LLM 'Yes' 우선, 다음 유사도 내림차순 (벡터 정렬 한 번)
     logging.debug("상위 결과 재정렬 시작 (LLM 'Yes' 우선, 다음 유사도 내림차순)...")
-    top_5_sorted_for_display: List[SortedResultItemType] = sorted(top_5_raw, key=sort_key_for_top5)
-    logging.debug(f"상위 결과 재정렬 완료. 최종 표시될 결과 수: {len(top_5_sorted_for_display)}개. 정렬된 결과 (일부): {[{'text': r.get('text', '')[:20], 'score': r.get('score'), 'llm_status': llm_verification_results.get(r.get('text', ''), (None,))[0]} for r in top_5_sorted_for_display]}") # 정렬 결과 확인 로그 추가
+    top_5_scores: np.ndarray = np.array([r.get('score', 0.0) for r in top_5_raw], dtype=np.float32)
+    top_5_llm_yes: np.ndarray = np.array([llm_verification_results.get(r.get('text', ''), (None,))[0] == "Yes" for r in top_5_raw], dtype=bool)
+    top_5_sorted_for_display: List[SortedResultItemType] = [top_5_raw[i] for i in llm_first_order(top_5_scores, top_5_llm_yes)]
+    if logging.getLogger().isEnabledFor(logging.DEBUG): # 요약 목록은 DEBUG가 켜져 있을 때만 만듦
+        logging.debug("상위 결과 재정렬 완료. 최종 표시될 결과 수: %d개. 정렬된 결과 (일부): %s", len(top_5_sorted_for_display), [
+            {'text': r.get('text', '')[:20], 'score': r.get('score'), 'llm_status': llm_verification_results.get(r.get('text', ''), (None,))[0]}
+            for r in top_5_sorted_for_display
+        ])
 
     # --- Pydantic 모델 객체 생성 ---
     logging.debug("Pydantic 모델 데이터 구성 시작...")
@@ -631,7 +940,8 @@ def create_results_dictionary(
             content_preview=r.get('text', '')[:150] + "..." if len(r.get('text', '')) > 150 else r.get('text', ''),
             link=r.get('link'), # .get() 사용으로 None 가능성 처리
             source=r.get('source', 'Unknown'),
-            llm_verification=llm_ver_data
+            llm_verification=llm_ver_data,
+            cluster_size=r.get('cluster_size', 1)
         )
         top_results_models.append(similar_result)
 
@@ -649,13 +959,34 @@ def create_results_dictionary(
     return analysis_result_model # 딕셔너리 대신 Pydantic 모델 객체 반환
 
 # 아이디어 분석 함수
-def analyze_idea(user_text_original: str,
-                sbert_model: SentenceTransformer,
-                gemini_model: Optional[GenerativeModel]) -> AnalysisResultModel:
-    """
-    입력된 아이디어 텍스트의 고유성을 분석하고 결과를 AnalysisResultModel 객체로 반환합니다.
-    오류 발생 시 AnalysisResultModel의 'error' 필드에 메시지를 담아 반환합니다.
-    """
+# 진행 상황 이벤트 전송 함수
+def _emit_progress(progress_callback: Optional[ProgressCallbackType], event: str, payload: Dict[str, Any]) -> None:
+    """progress_callback이 있으면 이벤트를 전달합니다. 콜백 오류는 분석을 중단시키지 않습니다."""
+    if progress_callback is None:
+        return
+    try:
+        progress_callback(event, payload)
+    except Exception as e:
+        logging.warning(f"진행 상황 콜백 처리 중 오류 발생 (event='{event}'): {e}")
+
+# 결과 미리보기용 hit 직렬화 함수
+def _hit_preview(item: Dict[str, Any]) -> Dict[str, Any]:
+    """스트리밍 이벤트로 보낼 hit 요약 (내용 150자, 링크, 출처, 유사도)"""
+    text: str = item.get('text', '')
+    preview: Dict[str, Any] = {
+        'content_preview': text[:150] + "..." if len(text) > 150 else text,
+        'link': item.get('link'), 'source': item.get('source', 'Unknown'),
+        'cluster_size': item.get('cluster_size', 1)
+    }
+    if 'score' in item:
+        preview['similarity_percentage'] = item['score'] * 100
+    return preview
+
+def _analyze_idea_internal(user_text_original: str,
+                           sbert_model: Union[SentenceTransformer, BatchingEncoder],
+                           gemini_model: Optional[GenerativeModel],
+                           progress_callback: Optional[ProgressCallbackType] = None) -> AnalysisResultModel:
+    """[내부 함수] 아이디어 분석 본체. analyze_idea가 호출 예산 범위 안에서 실행합니다."""
     logging.info(f"===== MuseSonar 분석 시작 =====")
     logging.info(f"입력 아이디어: '{user_text_original}'")
     # --- 1. 기본 프롬프트 주입 방어: 입력 텍스트 필터링 (일부 공개) ---
@@ -699,41 +1030,83 @@ def analyze_idea(user_text_original: str,
     combined_data_raw: List[Dict[str, str]] = []
     combined_data: List[Dict[str, str]] = []
 
-    # --- 4. 동시 검색 실행 ---
-    try:
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            logging.info("--- Google 및 KIPRIS 검색 동시 요청 시작 ---")
-
-            # Google 검색 작업 제출 
-            future_google = executor.submit(google_search, user_text_to_analyze)
-            logging.info("Google 검색 작업 제출됨.")
-
-            # KIPRIS 검색 작업 제출 
-            future_kipris = None
-            if KIPRIS_API_KEY: 
-                future_kipris = executor.submit(search_kipris_patents, user_text_to_analyze)
-                logging.info("KIPRIS 검색 작업 제출됨.")
-            else:
-                logging.warning("KIPRIS API 키가 없어 특허 검색 작업을 건너뜁니다.")
-
-            # Google 결과 가져오기 (
-            logging.debug("Google 검색 결과 기다리는 중...")
-            search_results_data_raw = future_google.result() # 여기서 예외 발생 시 아래 except 블록으로 이동
-            logging.info(f"Google 검색 결과 수신 완료 ({len(search_results_data_raw)}개).")
-
-            # KIPRIS 결과 가져오기 
-            if future_kipris:
-                logging.debug("KIPRIS 검색 결과 기다리는 중...")
-                patent_data = future_kipris.result() # 여기서 예외 발생 시 아래 except 블록으로 이동
-                logging.info(f"KIPRIS 검색 결과 수신 완료 ({len(patent_data)}개).")
+    # --- 3-1. 유사 아이디어 재사용 확인 (과거 분석의 검색 후보 풀/LLM 판정) ---
+    reused_candidates: Optional[List[Dict[str, str]]] = None
+    reused_llm_verdicts: LlmVerificationResultsMapType = {}
+    user_embedding: Optional[np.ndarray] = None
+    if idea_index is not None:
+        try:
+            with telemetry.span('idea_index') as index_span:
+                user_embedding = encode_texts(sbert_model, [user_text_to_analyze])[0]
+                match = idea_index.find_similar(user_embedding)
+                index_span.set(reused=match is not None)
+            if match is not None:
+                match_similarity, match_entry = match
+                reused_candidates = match_entry['candidates']
+                reused_llm_verdicts = match_entry.get('llm_verdicts', {})
+                logging.info(f"유사 아이디어 재사용: 유사도 {match_similarity:.4f}, 과거 아이디어 '{match_entry['idea_text'][:50]}...' (후보 {len(reused_candidates)}개, LLM 판정 {len(reused_llm_verdicts)}개)")
+        except Exception as e:
+            logging.warning(f"유사 아이디어 인덱스 조회 중 오류 발생. 새로 검색합니다: {e}", exc_info=True)
+            reused_candidates = None
+            reused_llm_verdicts = {}
+
+    # --- 4. 동시 검색 실행 (http_client 공용 루프의 스레드 풀 사용) ---
+    if reused_candidates is not None:
+        logging.info("--- 유사 아이디어의 검색 후보 풀을 재사용하여 외부 검색 생략 ---")
+        search_results_data_raw = list(reused_candidates)
+    else:
+        try:
+            # 로컬 특허 코퍼스 후보 조회 (관련 후보가 충분하면 실시간 KIPRIS 호출 생략)
+            local_patents: KiprisResultType = []
+            num_local_relevant: int = 0
+            if patent_corpus is not None and patent_corpus.model_name == base_model_name(get_model_name(sbert_model)): # 양자화/ONNX 백엔드도 같은 모델의 float32 코퍼스 사용
+                try:
+                    if user_embedding is None:
+                        user_embedding = encode_texts(sbert_model, [user_text_to_analyze])[0]
+                    with telemetry.span('search.patent_corpus') as corpus_span:
+                        local_hits = patent_corpus.search(user_embedding, config.PATENT_CORPUS_TOP_K)
+                        corpus_span.set(results=len(local_hits))
+                    telemetry.record_search('patent_corpus', 'ok' if local_hits else 'empty')
+                    local_patents = [dict(record, origin='local_corpus') for _, record in local_hits]
+                    num_local_relevant = sum(1 for score, _ in local_hits if score >= config.RELEVANCE_THRESHOLD)
+                    logging.info(f"로컬 특허 코퍼스 후보 {len(local_patents)}개 (관련성 기준 이상 {num_local_relevant}개)")
+                except Exception as e:
+                    logging.warning(f"로컬 특허 코퍼스 조회 중 오류 발생. 실시간 KIPRIS만 사용합니다: {e}", exc_info=True)
+                    local_patents = []
+                    num_local_relevant = 0
+            use_live_kipris: bool = bool(KIPRIS_API_KEY) and num_local_relevant < config.PATENT_CORPUS_MIN_LOCAL_HITS
 
-        logging.info("--- 모든 검색 요청 처리 완료 ---")
+            logging.info("--- Google 및 KIPRIS 검색 동시 요청 시작 ---")
+            if not use_live_kipris:
+                if KIPRIS_API_KEY:
+                    logging.info("로컬 특허 코퍼스 후보가 충분하여 실시간 KIPRIS 검색을 건너뜁니다.")
+                else:
+                    logging.warning("KIPRIS API 키가 없어 특허 검색 작업을 건너뜁니다.")
+
+            # 하위 질의 생성 (확장 비활성화 시 원문 질의만)
+            with telemetry.span('keywords'):
+                expansion_keywords: str = extract_keywords(user_text_to_analyze) if config.QUERY_EXPANSION_ENABLED else ""
+            sub_queries: List[SubQuery] = expand_queries(user_text_to_analyze, expansion_keywords, include_kipris=use_live_kipris)
+
+            logging.debug("검색 결과 기다리는 중...")
+            with telemetry.span('search', sub_queries=len(sub_queries)):
+                search_outputs: List[Any] = run_sub_queries(sub_queries, {'google': google_search, 'kipris': search_kipris_patents}) # 여기서 예외 발생 시 아래 except 블록으로 이동
+            google_outputs: List[Any] = [out for query, out in zip(sub_queries, search_outputs) if query.engine == 'google']
+            kipris_outputs: List[Any] = [out for query, out in zip(sub_queries, search_outputs) if query.engine == 'kipris']
+            search_results_data_raw = merge_ranked_hits(google_outputs)
+            logging.info(f"Google 검색 결과 수신 완료 (하위 질의 {len(google_outputs)}개, 병합 후 {len(search_results_data_raw)}개).")
+            patent_data = local_patents
+            if use_live_kipris:
+                patent_data = merge_ranked_hits([local_patents] + kipris_outputs)
+                logging.info(f"KIPRIS 검색 결과 수신 완료 (하위 질의 {len(kipris_outputs)}개, 로컬 포함 병합 후 {len(patent_data)}개).")
+
+            logging.info("--- 모든 검색 요청 처리 완료 ---")
 
-    except Exception as e:
-        # 동시 검색 중 어떤 이유로든 예외 발생 시
-        error_msg = f"외부 데이터 검색 중 오류 발생: {e}"
-        logging.error(error_msg, exc_info=True)
-        return AnalysisResultModel(error=error_msg) # 오류 모델 반환
+        except Exception as e:
+            # 동시 검색 중 어떤 이유로든 예외 발생 시
+            error_msg = f"외부 데이터 검색 중 오류 발생: {e}"
+            logging.error(error_msg, exc_info=True)
+            return AnalysisResultModel(error=error_msg) # 오류 모델 반환
 
     # --- 4. 결과 통합 및 중복 제거 ---
     logging.debug("웹/특허 검색 결과 통합 시작...")
@@ -757,6 +1130,18 @@ def analyze_idea(user_text_original: str,
             skipped_non_dict += 1
     logging.info(f"중복 제거 후 분석 대상 데이터: {len(combined_data)}개 (원래 {len(combined_data_raw)}개, 형식 오류 {skipped_non_dict}개 제외)")
 
+    # 유사 중복(미러 페이지, 특허 패밀리 출원 등) 묶기: 묶음별 대표 1개만 인코딩/LLM 검증 대상으로 남김
+    if config.NEAR_DUPLICATE_ENABLED and len(combined_data) > 1:
+        with telemetry.span('dedupe', hits=len(combined_data)) as dedupe_span:
+            num_before_collapse: int = len(combined_data)
+            combined_data = collapse_near_duplicates(combined_data, config.NEAR_DUPLICATE_MAX_HAMMING, config.NEAR_DUPLICATE_SHINGLE_SIZE)
+            dedupe_span.set(representatives=len(combined_data))
+        if len(combined_data) < num_before_collapse:
+            logging.info(f"유사 중복 묶기 완료: {num_before_collapse}개 -> 대표 {len(combined_data)}개")
+    _emit_progress(progress_callback, 'search', {
+        'count': len(combined_data), 'hits': [_hit_preview(item) for item in combined_data]
+    })
+
     # --- 5. 분석 가능 데이터 없음 ("정보 부족") 처리 ---
     if not combined_data:
         # 검색은 시도했으나 유효한 분석 대상 데이터가 없는 경우
@@ -785,7 +1170,6 @@ def analyze_idea(user_text_original: str,
     num_to_verify: int = 0
     verified_similar_count: int = 0
     llm_verification_results: LlmVerificationResultsMapType = {}
-    all_results_with_scores: List[SortedResultItemType] = []
     max_similarity_score: float = 0.0
     sorted_results: List[SortedResultItemType] = []
 
@@ -796,30 +1180,32 @@ def analyze_idea(user_text_original: str,
             raise ValueError("분석할 텍스트 데이터가 없습니다 (combined_texts 비어있음).")
 
         logging.info("--- SBERT 유사도 계산 및 분석 시작 ---")
-        # 임베딩 계산
+        # 임베딩 계산 (임베딩 캐시 미스 텍스트만 인코딩)
         logging.debug("SBERT 모델 임베딩 계산 시작...")
-        embeddings = sbert_model.encode([user_text_to_analyze] + combined_texts, convert_to_tensor=True)
+        with telemetry.span('encode', texts=len(combined_texts) + 1):
+            embeddings: np.ndarray = encode_texts(sbert_model, [user_text_to_analyze] + combined_texts)
         user_vec = embeddings[0]
         result_vecs = embeddings[1:]
         logging.debug(f"임베딩 계산 완료. 코사인 유사도 계산 시작...")
-        cos_scores: List[float] = util.cos_sim(user_vec, result_vecs)[0].cpu().tolist()
-        logging.debug(f"코사인 유사도 계산 완료.")
-
-        # 모든 결과에 점수 등 매핑
-        all_results_with_scores = []
-        for i, score in enumerate(cos_scores):
-            if i < len(combined_data) and isinstance(combined_data[i], dict):
-                all_results_with_scores.append({
-                    'text': combined_data[i].get('text', ''), 'score': score,
-                    'link': combined_data[i].get('link', ''), 'source': combined_data[i].get('source', 'Unknown')
-                })
-            else:
-                logging.error(f"결과 매핑 오류: 인덱스 {i} 또는 combined_data[{i}] 형식 오류")
-
-        # 관련성 필터링
-        filtered_results_list = [r for r in all_results_with_scores if r.get('score', 0.0) >= config.RELEVANCE_THRESHOLD]
-        num_filtered_results = len(filtered_results_list)
+        with telemetry.span('similarity', hits=len(combined_texts)) as similarity_span:
+            cos_scores: np.ndarray = cosine_scores(user_vec, result_vecs)
+            logging.debug(f"코사인 유사도 계산 완료.")
+
+            # 열 단위 hit 표 구성 (점수/출처 코드는 NumPy 배열, 딕셔너리는 선택된 행만 생성)
+            hit_table: HitTable = HitTable.from_items(combined_data, cos_scores)
+
+            # 관련성 필터링 (임계값 마스크 + 유사도 내림차순 정렬 한 번)
+            relevant_mask: np.ndarray = hit_table.mask_at_least(config.RELEVANCE_THRESHOLD)
+            num_filtered_results = int(relevant_mask.sum())
+            filtered_results_list: List[SortedResultItemType] = hit_table.to_items(hit_table.top_k(num_filtered_results, relevant_mask))
+            similarity_span.set(relevant=num_filtered_results)
+        sorted_results = filtered_results_list # 유사도 내림차순
         logging.info(f"유사도 필터링 완료: {num_filtered_results}개 결과 >= {config.RELEVANCE_THRESHOLD*100:.0f}%")
+        if progress_callback is not None:
+            _emit_progress(progress_callback, 'similarity', {
+                'relevant_count': num_filtered_results,
+                'hits': [_hit_preview(r) for r in hit_table.to_items(hit_table.top_k())]
+            })
 
         # --- 7. 필터링 결과 0개 ("관련성 높은 정보 부족") 처리 ---
         if num_filtered_results == 0:
@@ -827,7 +1213,7 @@ def analyze_idea(user_text_original: str,
             final_rating = "정보 부족"
             interpretation_message = f"아이디어와 관련성이 높은(유사도 {config.RELEVANCE_THRESHOLD*100:.0f}% 이상) 웹 또는 특허 정보를 찾을 수 없습니다. 아이디어를 더 구체화하거나 다른 키워드로 시도해 보세요."
             # 유사도 높은 결과는 없지만, 전체 결과는 정렬해서 참고용으로 제공 가능
-            sorted_results = sorted(all_results_with_scores, key=lambda x: x.get('score', 0.0), reverse=True)
+            sorted_results = hit_table.to_items(hit_table.top_k(5))
             # MetricModel 생성
             metrics = MetricModel(
                 evidence_count=0, verification_attempts=0,
@@ -843,7 +1229,8 @@ def analyze_idea(user_text_original: str,
                 top_similar_results=[ # 상위 5개 정보는 모델에 맞게 변환하여 전달
                     SimilarResultModel(
                         rank=i+1, similarity_percentage=r.get('score', 0.0)*100,
-                        content_preview=r.get('text', '')[:150] + "...", link=r.get('link'), source=r.get('source', 'Unknown')
+                        content_preview=r.get('text', '')[:150] + "...", link=r.get('link'), source=r.get('source', 'Unknown'),
+                        cluster_size=r.get('cluster_size', 1)
                     ) for i, r in enumerate(sorted_results[:5]) # LLM 검증은 없으므로 None
                 ]
             )
@@ -853,6 +1240,44 @@ def analyze_idea(user_text_original: str,
         # --- 8. 관련성 높은 결과 기반 통계 계산 및 LLM 검증(비공개) ---
         ...
 
+        # LLM 검증 대상 선정 후 병렬 검증 (동시성 제한 + 요청 단위 제한 시간)
+        hits_to_verify: List[SortedResultItemType] = hit_table.to_items(
+            hit_table.top_k(config.MAX_LLM_VERIFICATION_TARGETS, hit_table.mask_at_least(config.HIGH_SIMILARITY_THRESHOLD))
+        )
+        num_to_verify = len(hits_to_verify)
+        def on_llm_verdict(text_key: str, verdict: LlmVerificationResultType) -> None:
+            _emit_progress(progress_callback, 'llm_verdict', {
+                'content_preview': text_key[:150] + "..." if len(text_key) > 150 else text_key,
+                'status': verdict[0], 'reason': verdict[1]
+            })
+
+        # 유사 아이디어에서 재사용한 LLM 판정이 있는 hit은 호출 생략
+        llm_verification_results = {}
+        pending_hits: List[SortedResultItemType] = []
+        for hit in hits_to_verify:
+            text_key: str = hit.get('text', '')
+            if text_key in reused_llm_verdicts:
+                llm_verification_results[text_key] = reused_llm_verdicts[text_key]
+                on_llm_verdict(text_key, reused_llm_verdicts[text_key])
+            else:
+                pending_hits.append(hit)
+        if reused_llm_verdicts:
+            logging.info(f"재사용한 LLM 판정 {len(llm_verification_results)}개, 새로 검증할 대상 {len(pending_hits)}개")
+        with telemetry.span('llm', targets=len(pending_hits), reused=len(llm_verification_results)):
+            llm_verification_results.update(
+                verify_hits_concurrently(user_text_to_analyze, pending_hits, gemini_model, on_result=on_llm_verdict)
+            )
+
+        # 새로 검색한 분석은 유사 아이디어 인덱스에 등록 (확정된 LLM 판정만 저장, 예산 부족으로 줄인 분석은 제외)
+        if idea_index is not None and reused_candidates is None and user_embedding is not None and not rate_limiter.current_degradations():
+            try:
+                final_verdicts: LlmVerificationResultsMapType = {
+                    text_key: verdict for text_key, verdict in llm_verification_results.items() if verdict[0] in LLM_VALID_STATUSES
+                }
+                idea_index.add(user_text_to_analyze, user_embedding, combined_data, final_verdicts)
+            except Exception as e:
+                logging.warning(f"유사 아이디어 인덱스 등록 중 오류 발생: {e}", exc_info=True)
+
     except Exception as e:
         # SBERT 분석, LLM 검증 등 이 블록 내에서 발생하는 모든 예외 처리
         error_msg = f"아이디어 분석 처리 중 오류 발생: {e}"
@@ -864,15 +1289,16 @@ def analyze_idea(user_text_original: str,
 
     try:
         #--- 10. 등급 및 해석 결정 ---
-        final_rating, interpretation_message, conditional_warning = determine_originality(
-            average_score, verified_similar_count, llm_yes_ratio, has_combined_results_flag, max_similarity_score
-        )
-        # 점수 계산
-        if final_rating not in ["평가 불가 (오류)", "정보 부족"]: # 오류/정보부족 아닐 때만 점수 계산
-            score_int = calculate_MuseSONAR_score(final_rating, average_score, llm_yes_ratio, num_to_verify)
-            MuseSONAR_score = score_int if score_int != -1 else None
-        else:
-            MuseSONAR_score = None # 점수 계산 불가
+        with telemetry.span('scoring'):
+            final_rating, interpretation_message, conditional_warning = determine_originality(
+                average_score, verified_similar_count, llm_yes_ratio, has_combined_results_flag, max_similarity_score
+            )
+            # 점수 계산
+            if final_rating not in ["평가 불가 (오류)", "정보 부족"]: # 오류/정보부족 아닐 때만 점수 계산
+                score_int = calculate_MuseSONAR_score(final_rating, average_score, llm_yes_ratio, num_to_verify)
+                MuseSONAR_score = score_int if score_int != -1 else None
+            else:
+                MuseSONAR_score = None # 점수 계산 불가
 
     except Exception as e:
         # 최종 평가/점수 계산 중 예외 발생 시
@@ -884,11 +1310,12 @@ def analyze_idea(user_text_original: str,
 
     # --- 11. 최종 결과 모델 생성 (create_results_dictionary 호출) ---
     try:
-        results_model = create_results_dictionary(
-            final_rating, MuseSONAR_score, interpretation_message, conditional_warning,
-            average_score, num_filtered_results, llm_yes_ratio, verified_similar_count, num_to_verify,
-            sorted_results, llm_verification_results, has_combined_results_flag, config.HIGH_SIMILARITY_THRESHOLD
-        )
+        with telemetry.span('model_build'):
+            results_model = create_results_dictionary(
+                final_rating, MuseSONAR_score, interpretation_message, conditional_warning,
+                average_score, num_filtered_results, llm_yes_ratio, verified_similar_count, num_to_verify,
+                sorted_results, llm_verification_results, has_combined_results_flag, config.HIGH_SIMILARITY_THRESHOLD
+            )
         logging.info("===== MuseSonar 분석 완료 =====")
         return results_model # 최종 성공 시 결과 모델 반환
 
@@ -898,30 +1325,79 @@ def analyze_idea(user_text_original: str,
         logging.error(error_msg, exc_info=True)
         return AnalysisResultModel(error=error_msg) # 오류 모델 반환
 
-# --- 메인 실행 로직 (테스트용) ---
-if __name__ == "__main__":
-    logging.info("--- __main__ 블록 실행: 테스트용 모델 로딩 시작 ---")
-    sbert_model_test: Optional[SentenceTransformer] = None # 타입 힌트 추가
+# 아이디어 분석 함수
+def analyze_idea(user_text_original: str,
+                sbert_model: Union[SentenceTransformer, BatchingEncoder],
+                gemini_model: Optional[GenerativeModel],
+                progress_callback: Optional[ProgressCallbackType] = None,
+                include_timings: Optional[bool] = None) -> AnalysisResultModel:
+    """
+    입력된 아이디어 텍스트의 고유성을 분석하고 결과를 AnalysisResultModel 객체로 반환합니다.
+    오류 발생 시 AnalysisResultModel의 'error' 필드에 메시지를 담아 반환합니다.
+    progress_callback이 주어지면 단계별 중간 결과를 ('search', 'similarity', 'llm_verdict') 이벤트로 전달합니다.
+    API 호출 예산 부족으로 내려진 성능 저하 결정은 metrics.degradations에 기록됩니다.
+    include_timings가 True이면(None이면 config.METRICS_ATTACH_TIMINGS) 단계별 소요 시간 목록을 timings에 담습니다.
+    """
+    with rate_limiter.analysis_scope() as scope, telemetry.request_timings() as timings:
+        with telemetry.span('analysis'):
+            result: AnalysisResultModel = _analyze_idea_internal(user_text_original, sbert_model, gemini_model, progress_callback)
+    telemetry.record_analysis('error' if result.error else 'ok')
+    if config.METRICS_ATTACH_TIMINGS if include_timings is None else include_timings:
+        result.timings = [StageTimingModel(**record) for record in timings.snapshot()]
+    if scope.degradations:
+        logging.warning(f"성능 저하 결정 적용된 분석: {scope.degradations}")
+        if result.metrics is not None:
+            result.metrics.degradations = [
+                DegradationModel(api=api, decision=decision, reason=reason) for api, decision, reason in scope.degradations
+            ]
+    return result
+
+# 아이디어 분석 함수 (전체 결과 캐시 적용)
+def analyze_idea_cached(user_text_original: str,
+                        sbert_model: Union[SentenceTransformer, BatchingEncoder],
+                        gemini_model: Optional[GenerativeModel],
+                        progress_callback: Optional[ProgressCallbackType] = None,
+                        include_timings: Optional[bool] = None) -> AnalysisResultModel:
+    """
+    [캐시 래퍼] 정규화된 아이디어 텍스트 + 설정 지문 기준으로 저장된 분석 결과가 있으면 반환하고,
+    없으면 analyze_idea를 실행한 뒤 결과를 저장합니다. (오류/부분 결과는 저장하지 않음)
+    요청별 단계 시간(timings)은 캐시에 저장하지 않으므로 캐시 히트 결과에는 포함되지 않습니다.
+    """
+    if result_cache is None:
+        return analyze_idea(user_text_original, sbert_model, gemini_model, progress_callback, include_timings)
+
+    key: str = make_result_key(user_text_original, get_model_name(sbert_model), getattr(gemini_model, 'model_name', None))
     try:
-        sbert_model_test = SentenceTransformer('jhgan/ko-sroberta-multitask')
-        logging.info("테스트용 Sentence Transformer 모델 로딩 완료 (jhgan/ko-sroberta-multitask).")
+        cached_result: Optional[AnalysisResultModel] = result_cache.get(key)
     except Exception as e:
-        logging.critical(f"테스트용 SBERT 모델 로딩 실패! 분석 불가.", exc_info=True)
-
-    gemini_model_test: Optional[GenerativeModel] = None # 타입 힌트 추가
-    if GOOGLE_API_KEY_GEMINI:
+        logging.warning(f"분석 결과 캐시 조회 중 오류 발생. 캐시 없이 분석합니다: {e}")
+        cached_result = None
+    telemetry.record_cache('analysis_result', hit=cached_result is not None)
+    if cached_result is not None:
+        logging.info(f"분석 결과 캐시 히트: key='{key}'")
+        return cached_result
+
+    logging.info(f"분석 결과 캐시 미스: key='{key}'")
+    result: AnalysisResultModel = analyze_idea(user_text_original, sbert_model, gemini_model, progress_callback, include_timings)
+    if is_cacheable(result):
         try:
-            genai.configure(api_key=GOOGLE_API_KEY_GEMINI)
-            default_model = 'models/gemini-2.0-flash' 
-            model_name: str = os.getenv('GEMINI_MODEL_NAME', default_model)
-            logging.info(f"사용할 Gemini 모델: {model_name} (환경 변수 'GEMINI_MODEL_NAME' 또는 기본값)")
-            gemini_model_test = genai.GenerativeModel(model_name) # 수정된 model_name 사용
-            logging.info(f"테스트용 Gemini API 설정 완료 ({model_name} 모델 사용).")
+            result_cache.set(key, user_text_original, result.model_copy(update={'timings': None}) if result.timings else result)
         except Exception as e:
-            logging.warning(f"테스트용 Gemini API 설정 중 오류 발생. LLM 검증 기능 비활성화됨.", exc_info=True)
-            gemini_model_test = None
+            logging.warning(f"분석 결과 캐시 저장 중 오류 발생: {e}")
     else:
-        logging.warning("테스트용 Gemini API 키가 없어 LLM 검증이 비활성화됩니다.")
+        logging.info("오류 또는 부분 결과(LLM 검증 오류/제한 시간 초과, 호출 예산 부족)이므로 분석 결과를 캐시하지 않습니다.")
+    return result
+
+# --- 메인 실행 로직 (테스트용) ---
+if __name__ == "__main__":
+    logging.info("--- __main__ 블록 실행: 테스트용 모델 로딩 시작 ---")
+    resources.warm_up(('cache', 'okt', 'sbert', 'gemini')) # 구성 요소별 초기화 시간 로그
+    sbert_model_test: Optional[SentenceTransformer] = resources.get('sbert')
+    if sbert_model_test is None:
+        logging.critical(f"테스트용 SBERT 모델 로딩 실패! 분석 불가.")
+    gemini_model_test: Optional[GenerativeModel] = resources.get('gemini')
+    if gemini_model_test is None:
+        logging.warning("테스트용 Gemini 모델이 없어 LLM 검증이 비활성화됩니다.")
 
     logging.info("--- 테스트용 모델 로딩 완료 ---")
 
@@ -1,14 +1,26 @@
 # app.py (수정된 부분)
 
 import markdown
-from flask import Flask, render_template, request, redirect, url_for
+from flask import Flask, render_template, request, redirect, url_for, Response, jsonify
 import os
+import argparse
+import json
+import queue
+import threading
 import logging
 
 # --- MuseSonar 관련 모듈 임포트 ---
 try:
-    from MuseSONAR_public import analyze_idea
+    # 로깅은 MuseSonar 모듈 임포트 전에 구성 (모든 로그를 앱 로그 파일 하나에 큐 기반으로 기록)
+    from logging_setup import setup_logging
+    setup_logging("musessonar_flask_app.log")
+    from MuseSONAR_public import analyze_idea_cached as analyze_idea
     from pydantic_models import AnalysisResultModel
+    import job_queue
+    import circuit_breaker
+    import config
+    import telemetry
+    from resources import registry as resources, cache_tiers
     muse_sonar_imported = True
 except ImportError as e:
     logging.error(f"MuseSonar 모듈 임포트 실패: {e}. 분석 기능을 사용할 수 없습니다.")
@@ -25,52 +37,31 @@ except ImportError as e:
     def analyze_idea(*args, **kwargs):
         return AnalysisResultModel()
 
-# --- 모델 로딩 ---
-sbert_model = None
-gemini_model = None
+# --- 모델 (지연 로딩) ---
+# SBERT/Gemini 모델은 resources 레지스트리에서 첫 분석 요청 시(또는 사전 로딩 시) 초기화합니다.
+def get_sbert_model():
+    """분석에 사용할 SBERT 인코더 (배칭 활성화 시 요청 간 마이크로 배칭 인코더). 로딩 실패 시 None"""
+    return resources.get('encoder') if muse_sonar_imported else None
 
-if muse_sonar_imported:
-    logging.info("--- 앱 시작: 모델 로딩 시도 ---")
-    try:
-        from sentence_transformers import SentenceTransformer
-        sbert_model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-        logging.info("SBERT 모델(jhgan/ko-sroberta-multitask) 로딩 완료.")
-    except Exception as e:
-        logging.critical(f"SBERT 모델 로딩 실패! 분석 기능 비활성화.", exc_info=True)
-        sbert_model = None
+def get_gemini_model():
+    return resources.get('gemini') if muse_sonar_imported else None
 
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-        google_api_key_gemini = os.getenv('GOOGLE_API_KEY_GEMINI')
-        if google_api_key_gemini:
-            import google.generativeai as genai
-            genai.configure(api_key=google_api_key_gemini)
-            default_model = 'models/gemini-2.0-flash'
-            model_name = os.getenv('GEMINI_MODEL_NAME', default_model)
-            logging.info(f"사용할 Gemini 모델: {model_name}")
-            gemini_model = genai.GenerativeModel(model_name)
-            logging.info(f"Gemini 모델({model_name}) 로딩 및 설정 완료.")
-        else:
-            logging.warning("환경 변수 'GOOGLE_API_KEY_GEMINI' 없음. LLM 검증 비활성화.")
-            gemini_model = None
-    except Exception as e:
-        logging.warning(f"Gemini 모델 설정 중 오류 발생. LLM 검증 비활성화.", exc_info=True)
-        gemini_model = None
-    logging.info("--- 모델 로딩 완료 ---")
-else:
-    logging.error("MuseSonar 모듈 로딩 실패로 모델 로딩 건너뜀.")
+def preload_resources():
+    """fork 기반 서버의 마스터 프로세스에서 호출: 설정된 구성 요소를 미리 로딩하여 워커가 copy-on-write로 공유"""
+    if muse_sonar_imported:
+        resources.warm_up(config.RESOURCE_PRELOAD_COMPONENTS)
+    else:
+        logging.error("MuseSonar 모듈 로딩 실패로 자원 사전 로딩 건너뜀.")
 
 
 app = Flask(__name__)
 
-log_format = '%(asctime)s - %(levelname)s - [%(funcName)s:%(lineno)d] - %(message)s'
-logging.basicConfig(level=logging.INFO, format=log_format, handlers=[
-    logging.FileHandler("musessonar_flask_app.log", encoding='utf-8'),
-    logging.StreamHandler()
-])
 app.logger.info("Flask 애플리케이션 시작 및 로깅 설정 완료.")
 
+# gunicorn --preload 등 앱 모듈을 마스터 프로세스에서 임포트하는 서버용 (MUSESONAR_PRELOAD=1)
+if os.getenv('MUSESONAR_PRELOAD') == '1':
+    preload_resources()
+
 
 
 @app.route('/')
@@ -90,6 +81,11 @@ def analyze():
         app.logger.warning("입력된 아이디어가 없습니다.")
         return redirect(url_for('index'))
 
+    if request.form.get('async') == '1' and muse_sonar_imported:
+        # 작업 큐에 등록하고 job id를 즉시 반환 (결과는 /jobs/<job_id>로 조회)
+        return _enqueue_job_response(idea_text)
+
+    sbert_model = get_sbert_model()
     if not muse_sonar_imported or not sbert_model:
         app.logger.error("분석 수행 불가: MuseSonar 모듈 또는 SBERT 모델 로드 실패.")
         error_result = AnalysisResultModel(
@@ -104,7 +100,7 @@ def analyze():
 
     try:
         app.logger.info("MuseSonar.analyze_idea 함수 호출 시작...")
-        analysis_result = analyze_idea(idea_text, sbert_model, gemini_model)
+        analysis_result = analyze_idea(idea_text, sbert_model, get_gemini_model())
         app.logger.info("MuseSonar.analyze_idea 함수 호출 완료.")
 
         if hasattr(analysis_result, 'interpretation') and analysis_result.interpretation:
@@ -133,5 +129,154 @@ def analyze():
                             interpretation_html=None, # 명시적으로 None 전달
                             warning_html=None)      # 명시적으로 None 전달
 
+# --- 스트리밍 분석 (Server-Sent Events) ---
+def _sse_event(event: str, payload: dict) -> str:
+    """SSE 형식의 이벤트 문자열을 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.route('/analyze/stream', methods=['GET', 'POST'])
+def analyze_stream():
+    """
+    분석 진행 상황을 SSE로 전송합니다.
+    이벤트 순서: search(검색 결과) → similarity(유사도 점수) → llm_verdict(검증 결과, 도착 순) → result(최종 결과) 또는 error
+    """
+    idea_text = (request.values.get('idea_text') or '').strip()
+    include_timings = True if request.values.get('timings') == '1' else None # 요청별 단계 시간 포함 (없으면 설정값)
+    app.logger.info(f"스트리밍 분석 요청 수신: '{idea_text[:50]}...'")
+
+    if not idea_text:
+        app.logger.warning("입력된 아이디어가 없습니다.")
+        return Response(_sse_event('error', {'error': "입력된 아이디어가 없습니다."}), mimetype='text/event-stream')
+
+    sbert_model = get_sbert_model()
+    gemini_model = get_gemini_model()
+    if not muse_sonar_imported or not sbert_model:
+        app.logger.error("분석 수행 불가: MuseSonar 모듈 또는 SBERT 모델 로드 실패.")
+        return Response(_sse_event('error', {'error': "핵심 분석 모듈 또는 SBERT 모델 로딩에 실패하여 분석을 수행할 수 없습니다. 서버 로그를 확인해주세요."}),
+                        mimetype='text/event-stream')
+
+    events: queue.Queue = queue.Queue()
+
+    def run_analysis():
+        try:
+            analysis_result = analyze_idea(idea_text, sbert_model, gemini_model,
+                                           progress_callback=lambda event, payload: events.put((event, payload)),
+                                           include_timings=include_timings)
+            payload = analysis_result.model_dump()
+            payload['interpretation_html'] = markdown.markdown(analysis_result.interpretation, extensions=['nl2br']) if analysis_result.interpretation else None
+            payload['warning_html'] = markdown.markdown(analysis_result.warning, extensions=['nl2br']) if analysis_result.warning else None
+            app.logger.info(f"스트리밍 분석 결과: Rating={analysis_result.rating}, Score={analysis_result.score}, Error='{analysis_result.error}'")
+            events.put(('result', payload))
+        except Exception as e:
+            app.logger.critical("Flask /analyze/stream 처리 중 심각한 오류 발생.", exc_info=True)
+            events.put(('error', {'error': f"분석 요청 처리 중 예상치 못한 오류가 발생했습니다: {e}"}))
+        finally:
+            events.put(None) # 스트림 종료 신호
+
+    threading.Thread(target=run_analysis, name="analyze-stream", daemon=True).start()
+
+    def generate():
+        while True:
+            item = events.get()
+            if item is None:
+                break
+            yield _sse_event(*item)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- 헬스 체크 ---
+@app.route('/health', methods=['GET'])
+def health():
+    """
+    자원 초기화 상태(구성 요소별 초기화 시간 포함), 외부 백엔드 회로 차단기 상태,
+    2단 캐시 네임스페이스별 히트율(이 프로세스 기준)을 반환합니다.
+    자원 초기화를 유발하지 않으며, 차단된 백엔드가 있으면 status='degraded'
+    """
+    breakers = circuit_breaker.health() if muse_sonar_imported else {}
+    resource_status = resources.status() if muse_sonar_imported else {}
+    degraded = any(state.get('state') != circuit_breaker.STATE_CLOSED for state in breakers.values())
+    sbert_failed = resource_status.get('encoder', {}).get('loaded') and not resource_status['encoder'].get('available')
+    status = 'unavailable' if not muse_sonar_imported or sbert_failed else ('degraded' if degraded else 'ok')
+    return jsonify(status=status,
+                   resources=resource_status,
+                   circuit_breakers=breakers,
+                   cache=cache_tiers.stats() if muse_sonar_imported else {}), (503 if status == 'unavailable' else 200)
+
+# --- 지표 (Prometheus 텍스트 형식) ---
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """단계별 소요 시간 히스토그램, 검색/캐시/LLM 호출 카운터 (모든 웹/작업 큐 워커 프로세스 지표 합산)"""
+    if not muse_sonar_imported:
+        return Response("# MuseSonar 모듈 로딩 실패\n", status=503, mimetype='text/plain')
+    return Response(telemetry.render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+# --- 비동기 분석 작업 (job queue) ---
+def _enqueue_job_response(idea_text: str):
+    """분석 작업을 등록하고 202 응답(job id, 상태/결과 URL)을 반환합니다."""
+    try:
+        job_id = job_queue.submit_job(idea_text)
+    except job_queue.JobSubmissionError as e:
+        app.logger.error(f"분석 작업 등록 실패: job_id={e.job_id}, 오류: {e}")
+        return jsonify(job_id=e.job_id, status=job_queue.JOB_STATUS_ERROR,
+                       error="분석 작업을 등록하지 못했습니다. 잠시 후 다시 시도해주세요."), 503
+    app.logger.info(f"분석 작업 등록 완료: job_id={job_id}")
+    return jsonify(job_id=job_id,
+                   status=job_queue.JOB_STATUS_QUEUED,
+                   status_url=url_for('job_status', job_id=job_id),
+                   result_url=url_for('job_result', job_id=job_id)), 202
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    payload = request.get_json(silent=True) or {}
+    idea_text = (request.form.get('idea_text') or payload.get('idea_text') or '').strip()
+    app.logger.info(f"분석 작업 요청 수신: '{idea_text[:50]}...'")
+    if not idea_text:
+        return jsonify(error="입력된 아이디어가 없습니다."), 400
+    if not muse_sonar_imported:
+        return jsonify(error="핵심 분석 모듈 로딩에 실패하여 분석을 수행할 수 없습니다. 서버 로그를 확인해주세요."), 503
+    return _enqueue_job_response(idea_text)
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    if not muse_sonar_imported:
+        return jsonify(error="핵심 분석 모듈 로딩에 실패했습니다."), 503
+    record = job_queue.get_job(job_id)
+    if record is None:
+        return jsonify(error="작업을 찾을 수 없습니다 (만료되었거나 존재하지 않음)."), 404
+    response = {key: record.get(key) for key in ('status', 'created_at', 'started_at', 'finished_at', 'error')}
+    response['job_id'] = job_id
+    if record.get('status') == job_queue.JOB_STATUS_DONE and record.get('result'):
+        response['result'] = json.loads(record['result'])
+    return jsonify(response)
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """완료된 작업 결과를 results.html로 표시합니다. 아직 진행 중이면 202와 상태를 반환합니다."""
+    if not muse_sonar_imported:
+        return jsonify(error="핵심 분석 모듈 로딩에 실패했습니다."), 503
+    record = job_queue.get_job(job_id)
+    if record is None:
+        return jsonify(error="작업을 찾을 수 없습니다 (만료되었거나 존재하지 않음)."), 404
+    analysis_result = job_queue.get_job_result(job_id)
+    if analysis_result is None:
+        if record.get('status') == job_queue.JOB_STATUS_ERROR:
+            analysis_result = AnalysisResultModel(error=f"분석 작업 처리 중 오류가 발생했습니다: {record.get('error')}")
+        else:
+            return jsonify(job_id=job_id, status=record.get('status')), 202
+
+    interpretation_html = markdown.markdown(analysis_result.interpretation, extensions=['nl2br']) if analysis_result.interpretation else None
+    warning_html = markdown.markdown(analysis_result.warning, extensions=['nl2br']) if analysis_result.warning else None
+    return render_template('results.html',
+                        result=analysis_result,
+                        user_idea=record.get('idea_text'),
+                        interpretation_html=interpretation_html,
+                        warning_html=warning_html)
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MuseSonar Flask 앱")
+    parser.add_argument('--preload', action='store_true', help="요청 전에 자원(RESOURCE_PRELOAD_COMPONENTS)을 미리 로딩")
+    args = parser.parse_args()
+    if args.preload and os.getenv('MUSESONAR_PRELOAD') != '1':
+        preload_resources()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
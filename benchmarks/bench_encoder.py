@@ -0,0 +1,134 @@
+# benchmarks/bench_encoder.py
+
+"""
+SBERT 추론 백엔드 벤치마크 및 일치도 검사입니다.
+백엔드마다 새 프로세스(spawn)에서 모델을 로딩하여 워커 하나 기준의 로딩 시간, 상주 메모리(RSS),
+인코딩 지연 시간/처리량을 측정하고, float32 torch 기준 임베딩 대비 코사인 드리프트를 보고합니다.
+참조 세트: korean_ideas.txt 아이디어 + 픽스처의 검색 결과 제목/스니펫, 특허 제목/초록
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_encoder [--backends torch torch_int8 onnx onnx_int8] [--threads 0] [--repeat 3]
+일치도 기준(config.SBERT_PARITY_MIN_COSINE) 미달 백엔드가 있으면 종료 코드 1을 반환합니다. (배포 전 검사용)
+"""
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import xml.etree.ElementTree as ET
+from benchmarks.bench_keywords import load_ideas
+from typing import Any, Dict, List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_reference_texts() -> List[str]:
+    """아이디어와 기록된 Google/KIPRIS 응답 텍스트로 참조 세트를 만듭니다. (중복 제거, 순서 유지)"""
+    texts: List[str] = load_ideas()
+    google_dir: str = os.path.join(FIXTURES_DIR, "google")
+    for name in sorted(os.listdir(google_dir)):
+        with open(os.path.join(google_dir, name), encoding='utf-8') as f:
+            for item in json.load(f).get('items', []):
+                texts.extend(value for value in (item.get('title'), item.get('snippet')) if value)
+    kipris_dir: str = os.path.join(FIXTURES_DIR, "kipris")
+    for name in sorted(os.listdir(kipris_dir)):
+        for item in ET.parse(os.path.join(kipris_dir, name)).getroot().iter('item'):
+            texts.extend(value.strip() for value in (item.findtext('inventionTitle'), item.findtext('astrtCont')) if value and value.strip())
+    return list(dict.fromkeys(texts))
+
+def current_rss_mb() -> float:
+    """현재 상주 메모리 (Linux /proc 기준, 그 외 플랫폼은 최대 RSS로 대체)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        import resource
+        peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def measure_backend(backend: str, num_threads: int, texts: List[str], repeat: int, batch_size: int) -> Dict[str, Any]:
+    """[워커 프로세스] 백엔드 하나를 로딩하고 측정합니다. 참조 세트 임베딩도 함께 반환합니다."""
+    import numpy as np
+    from embedding_backends import load_sbert, resolve_num_threads
+    rss_before: float = current_rss_mb()
+    started: float = time.perf_counter()
+    model: Any = load_sbert(backend, num_threads)
+    load_s: float = time.perf_counter() - started
+    rss_loaded: float = current_rss_mb()
+
+    model.encode(texts[:1], convert_to_numpy=True) # 첫 호출(그래프 초기화 등) 비용은 측정에서 제외
+    single_ms: List[float] = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            model.encode([text], convert_to_numpy=True)
+            single_ms.append((time.perf_counter() - started) * 1000)
+    batch_s: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        batch_s.append(time.perf_counter() - started)
+    return {
+        'backend': backend, 'model_name': model.model_name, 'threads': resolve_num_threads(num_threads),
+        'load_s': load_s, 'rss_model_mb': rss_loaded - rss_before, 'rss_total_mb': current_rss_mb(),
+        'single_p50_ms': statistics.median(single_ms),
+        'single_p95_ms': statistics.quantiles(single_ms, n=20)[18] if len(single_ms) >= 20 else max(single_ms),
+        'batch_texts_per_s': len(texts) / statistics.median(batch_s),
+        'embeddings': np.asarray(embeddings, dtype=np.float32),
+    }
+
+
+if __name__ == "__main__":
+    import config
+    from embedding_backends import BACKENDS, parity_report
+    parser = argparse.ArgumentParser(description="SBERT 추론 백엔드 지연 시간/메모리/일치도 벤치마크")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS, help="측정할 백엔드 ('torch'는 기준으로 항상 포함)")
+    parser.add_argument('--threads', type=int, default=config.SBERT_NUM_THREADS, help="워커당 추론 스레드 수 (0이면 자동)")
+    parser.add_argument('--repeat', type=int, default=3, help="참조 세트 반복 횟수")
+    parser.add_argument('--batch-size', type=int, default=config.ENCODER_MODEL_BATCH_SIZE, help="일괄 인코딩 배치 크기")
+    parser.add_argument('--min-cosine', type=float, default=config.SBERT_PARITY_MIN_COSINE, help="텍스트별 최소 코사인 유사도 기준")
+    parser.add_argument('--json-out', help="결과(임베딩 제외)를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    texts: List[str] = load_reference_texts()
+    backends: List[str] = ['torch'] + [b for b in args.backends if b != 'torch']
+    print(f"참조 텍스트 {len(texts)}개, 백엔드 {backends}, 반복 {args.repeat}회")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    spawn = multiprocessing.get_context('spawn')
+    for backend in backends:
+        # 백엔드마다 새 프로세스: 다른 모델의 메모리/스레드 설정이 측정에 섞이지 않도록
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            try:
+                results[backend] = executor.submit(measure_backend, backend, args.threads, texts, args.repeat, args.batch_size).result()
+            except Exception as e:
+                print(f"[{backend}] 측정 실패: {e}")
+
+    if 'torch' not in results:
+        sys.exit("기준(float32 torch) 모델 측정에 실패하여 일치도를 계산할 수 없습니다.")
+    reference = results['torch']['embeddings']
+    print(f"\n  {'백엔드':<12}{'모델 ID':<40}{'스레드':>6}{'로딩(s)':>9}{'모델 RSS(MB)':>14}{'단건 p50/p95(ms)':>20}{'일괄(텍스트/s)':>16}")
+    failed: List[str] = []
+    for backend, result in results.items():
+        result['parity'] = parity_report(result['embeddings'], reference)
+        print(f"  {backend:<12}{result['model_name']:<40}{result['threads']:>6}{result['load_s']:>9.1f}{result['rss_model_mb']:>14.0f}"
+              f"{result['single_p50_ms']:>11.1f} / {result['single_p95_ms']:<6.1f}{result['batch_texts_per_s']:>16.1f}")
+        if result['parity']['min_cosine'] < args.min_cosine:
+            failed.append(backend)
+    print(f"\n  {'백엔드':<12}{'평균 cos':>10}{'최소 cos':>10}{'p5 cos':>10}{'최대 드리프트':>14}{'쌍 순위 상관':>14}")
+    for backend, result in results.items():
+        parity: Dict[str, float] = result['parity']
+        print(f"  {backend:<12}{parity['mean_cosine']:>10.5f}{parity['min_cosine']:>10.5f}{parity['p5_cosine']:>10.5f}{parity['max_drift']:>14.5f}{parity['pair_rank_corr']:>14.4f}")
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({backend: {k: v for k, v in result.items() if k != 'embeddings'} for backend, result in results.items()}, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json_out}")
+    if failed:
+        print(f"\n일치도 기준(최소 코사인 {args.min_cosine}) 미달: {failed}")
+        sys.exit(1)
+    print(f"\n모든 백엔드가 일치도 기준(최소 코사인 {args.min_cosine})을 만족합니다.")
@@ -0,0 +1,81 @@
+# benchmarks/bench_keywords.py
+
+"""
+키워드 추출 백엔드 벤치마크: 고정된 한국어 아이디어 세트(korean_ideas.txt)로
+백엔드별 지연 시간(메모 미적용)과 Okt 대비 키워드 품질(정밀도/재현율/F1)을 비교합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_keywords [--repeat 5] [--backends okt regex]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from keyword_extractors import EXTRACTORS, KeywordExtractor
+from typing import Dict, List, Set
+
+IDEAS_FILE = os.path.join(os.path.dirname(__file__), "korean_ideas.txt")
+
+
+def load_ideas(path: str = IDEAS_FILE) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def keyword_set(extractor: KeywordExtractor, text: str) -> Set[str]:
+    """extract_keywords와 같은 길이 필터(2글자 이상)를 적용한 명사 집합"""
+    return {noun for noun in extractor.extract_nouns(text) if len(noun) > 1}
+
+def measure_latency_ms(extractor: KeywordExtractor, ideas: List[str], repeat: int) -> List[float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        for idea in ideas:
+            started: float = time.perf_counter()
+            extractor.extract_nouns(idea)
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def compare_quality(candidate: KeywordExtractor, reference: KeywordExtractor, ideas: List[str]) -> Dict[str, float]:
+    """reference(Okt) 명사 집합을 정답으로 보고 아이디어별 정밀도/재현율을 평균합니다."""
+    precisions: List[float] = []
+    recalls: List[float] = []
+    for idea in ideas:
+        predicted: Set[str] = keyword_set(candidate, idea)
+        expected: Set[str] = keyword_set(reference, idea)
+        overlap: int = len(predicted & expected)
+        precisions.append(overlap / len(predicted) if predicted else 0.0)
+        recalls.append(overlap / len(expected) if expected else 1.0)
+    precision: float = statistics.mean(precisions)
+    recall: float = statistics.mean(recalls)
+    f1: float = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="키워드 추출 백엔드 지연 시간/품질 벤치마크")
+    parser.add_argument('--repeat', type=int, default=5, help="아이디어 세트 반복 횟수 (지연 시간 측정)")
+    parser.add_argument('--backends', nargs='+', default=list(EXTRACTORS), help="비교할 백엔드 이름")
+    args = parser.parse_args()
+
+    ideas: List[str] = load_ideas()
+    reference: KeywordExtractor = EXTRACTORS['okt']
+    has_reference: bool = reference.available()
+    print(f"아이디어 {len(ideas)}개, 반복 {args.repeat}회, 기준(Okt) 사용 가능: {has_reference}")
+
+    for name in args.backends:
+        extractor: KeywordExtractor = EXTRACTORS[name]
+        if not extractor.available():
+            print(f"[{name}] 사용 불가 (건너뜀)")
+            continue
+        extractor.extract_nouns(ideas[0]) # 첫 호출(JVM 기동 등) 비용은 측정에서 제외
+        samples: List[float] = measure_latency_ms(extractor, ideas, args.repeat)
+        p95: float = statistics.quantiles(samples, n=20)[18] if len(samples) >= 20 else max(samples)
+        line: str = f"[{name}] 평균 {statistics.mean(samples):.3f}ms, p95 {p95:.3f}ms"
+        if has_reference and name != reference.name:
+            quality: Dict[str, float] = compare_quality(extractor, reference, ideas)
+            line += f", Okt 대비 정밀도 {quality['precision']:.2f} / 재현율 {quality['recall']:.2f} / F1 {quality['f1']:.2f}"
+        print(line)
+    if has_reference:
+        print("\n아이디어별 키워드 (Okt | regex):")
+        for idea in ideas:
+            print(f"- {idea}\n    okt  : {sorted(keyword_set(reference, idea))}\n    regex: {sorted(keyword_set(EXTRACTORS['regex'], idea))}")
@@ -0,0 +1,218 @@
+# benchmarks/bench_pipeline.py
+
+"""
+analyze_idea 전체 파이프라인 벤치마크입니다. (기본: 오프라인 재생 모드, 네트워크 사용 없음)
+- Google CSE / KIPRIS는 로컬 스텁 서버(stub_server)가 기록된 픽스처를 지연 시간을 주입해 재생
+- Gemini는 ReplayGeminiModel이 프롬프트별 기록 응답을 재생
+- 단계별 지연 시간(keywords, search, dedupe, encode, similarity, llm, scoring, model_build),
+  동시 요청 수별 처리량/지연 분포, 최대 RSS를 보고합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_pipeline [--concurrency 1 4 8] [--latency-google-ms 300] [--fake-encoder]
+    python -m benchmarks.bench_pipeline --mode record   # 실제 API를 호출하여 픽스처 기록 (API 키 필요)
+"""
+
+import argparse
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.bench_keywords import load_ideas
+from benchmarks.recording import FixtureStore, RecordingGeminiModel, ReplayGeminiModel, install_http_recorder
+from benchmarks.stub_server import StubServer
+from typing import Any, Callable, Dict, List, Optional
+
+# 보고 순서 = 파이프라인 순서
+STAGES = ('keywords', 'search', 'dedupe', 'encode', 'similarity', 'llm', 'scoring', 'model_build')
+
+# 단계별 계측 대상 (MuseSONAR_public 모듈 전역 이름 -> 단계)
+STAGE_FUNCTIONS: Dict[str, str] = {
+    'extract_keywords': 'keywords',
+    'run_sub_queries': 'search',
+    'collapse_near_duplicates': 'dedupe',
+    'encode_texts': 'encode',
+    'cosine_scores': 'similarity',
+    'verify_hits_concurrently': 'llm',
+    'determine_originality': 'scoring',
+    'calculate_MuseSONAR_score': 'scoring',
+    'create_results_dictionary': 'model_build',
+}
+
+
+class StageTimer:
+    """요청별 단계 소요 시간 누적기. 다른 단계 안에서 호출된 함수(검색 중 키워드 추출 등)는 바깥 단계에만 합산합니다."""
+
+    def __init__(self):
+        self._active: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('bench_active_stage', default=None)
+        self._samples: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar('bench_stage_samples', default=None)
+
+    def wrap(self, stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            samples: Optional[Dict[str, float]] = self._samples.get()
+            if samples is None or self._active.get() is not None:
+                return func(*args, **kwargs)
+            token = self._active.set(stage)
+            started: float = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples[stage] = samples.get(stage, 0.0) + (time.perf_counter() - started) * 1000
+                self._active.reset(token)
+        return timed
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Dict[str, float]:
+        """func를 실행하고 단계별 소요 시간(ms)과 전체 시간('total')을 반환합니다."""
+        samples: Dict[str, float] = {}
+        token = self._samples.set(samples)
+        started: float = time.perf_counter()
+        try:
+            func(*args)
+        finally:
+            self._samples.reset(token)
+        samples['total'] = (time.perf_counter() - started) * 1000
+        return samples
+
+
+class HashingEncoder:
+    """모델 로딩 없이 결정적인 벡터를 만드는 대역 인코더 (--fake-encoder, 모델 외 구간 측정용)"""
+
+    model_name: str = 'bench-hashing-encoder'
+
+    def __init__(self, dim: int = 256):
+        self.dim: int = dim
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, **kwargs: Any) -> Any:
+        import numpy as np
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.split():
+                digest: bytes = hashlib.md5(token.encode('utf-8')).digest()
+                vectors[row, int.from_bytes(digest[:4], 'little') % self.dim] += 1.0
+        return vectors
+
+
+def configure_offline(args: argparse.Namespace, server: Optional[StubServer]) -> str:
+    """MuseSONAR_public 임포트 전에 환경 변수/설정을 벤치마크용으로 바꿉니다. 사용한 캐시 디렉토리를 반환합니다."""
+    import config
+    import resources
+    if server is not None:
+        # 재생 모드: 필수 키 검증을 통과할 더미 값 + 스텁 서버 주소
+        for name in ('GOOGLE_SEARCH_API_KEY', 'SEARCH_ENGINE_ID', 'GOOGLE_API_KEY_GEMINI', 'KIPRIS_API_KEY'):
+            os.environ.setdefault(name, 'bench-replay')
+        os.environ['MUSESONAR_GOOGLE_SEARCH_URL'] = f"{server.base_url}/google/customsearch/v1"
+        os.environ['MUSESONAR_KIPRIS_API_BASE_URL'] = f"{server.base_url}/kipris"
+    # 요청 간 재사용/보호 장치는 끄고 파이프라인 자체를 측정
+    config.RESULT_CACHE_ENABLED = False
+    config.IDEA_INDEX_ENABLED = False
+    config.PATENT_CORPUS_ENABLED = False
+    config.RATE_LIMIT_ENABLED = False
+    config.CIRCUIT_BREAKER_ENABLED = False
+    config.EMBEDDING_CACHE_ENABLED = args.warm_cache
+    if not args.warm_cache:
+        resources.CACHE_DIR = tempfile.mkdtemp(prefix="musesonar-bench-") # 검색/LLM 메모이즈 캐시를 비운 상태(cold)로 측정
+    return resources.CACHE_DIR
+
+def install_stage_timers(module: Any, timer: StageTimer) -> None:
+    for name, stage in STAGE_FUNCTIONS.items():
+        setattr(module, name, timer.wrap(stage, getattr(module, name)))
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def peak_rss_mb() -> float:
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024 # macOS는 바이트, Linux는 KB 단위
+
+def run_level(timer: StageTimer, analyze: Callable[[str], Any], ideas: List[str], concurrency: int) -> Dict[str, Any]:
+    """동시 요청 수 concurrency로 아이디어 세트를 한 번 처리하고 처리량과 단계별 지연 통계를 계산합니다."""
+    started: float = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        runs: List[Dict[str, float]] = list(executor.map(lambda idea: timer.run(analyze, idea), ideas))
+    wall_s: float = time.perf_counter() - started
+    report: Dict[str, Any] = {
+        'concurrency': concurrency, 'requests': len(runs), 'wall_s': wall_s,
+        'throughput_rps': len(runs) / wall_s if wall_s > 0 else 0.0, 'stages': {}
+    }
+    for stage in STAGES + ('total',):
+        values: List[float] = [run.get(stage, 0.0) for run in runs]
+        report['stages'][stage] = {'mean_ms': statistics.mean(values), 'p50_ms': percentile(values, 50), 'p95_ms': percentile(values, 95)}
+    return report
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n[동시 요청 {report['concurrency']}] 요청 {report['requests']}개, {report['wall_s']:.2f}s, 처리량 {report['throughput_rps']:.2f} req/s")
+    print(f"  {'단계':<12}{'평균(ms)':>12}{'p50(ms)':>12}{'p95(ms)':>12}")
+    for stage, stats in report['stages'].items():
+        print(f"  {stage:<12}{stats['mean_ms']:>12.1f}{stats['p50_ms']:>12.1f}{stats['p95_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="analyze_idea 파이프라인 벤치마크 (픽스처 기록/재생)")
+    parser.add_argument('--mode', choices=('replay', 'record'), default='replay', help="replay: 오프라인 재생, record: 실제 API 호출 후 픽스처 저장")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help="측정할 동시 요청 수 목록")
+    parser.add_argument('--limit', type=int, default=0, help="사용할 아이디어 수 (0이면 전체)")
+    parser.add_argument('--latency-google-ms', type=float, default=300.0, help="[replay] Google 스텁 응답 지연")
+    parser.add_argument('--latency-kipris-ms', type=float, default=800.0, help="[replay] KIPRIS 스텁 응답 지연")
+    parser.add_argument('--latency-gemini-ms', type=float, default=1200.0, help="[replay] Gemini 재생 응답 지연")
+    parser.add_argument('--jitter', type=float, default=0.2, help="[replay] 지연 시간 지터 비율")
+    parser.add_argument('--fake-encoder', action='store_true', help="SBERT 대신 결정적 해싱 인코더 사용 (모델 로딩 없이 측정)")
+    parser.add_argument('--warm-cache', action='store_true', help="기본 캐시 디렉토리/임베딩 캐시를 그대로 사용 (기본은 빈 캐시)")
+    parser.add_argument('--json-out', help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    store = FixtureStore()
+    server: Optional[StubServer] = None
+    if args.mode == 'replay':
+        server = StubServer(store, {'google': args.latency_google_ms, 'kipris': args.latency_kipris_ms}, args.jitter).start()
+    cache_dir: str = configure_offline(args, server)
+
+    import MuseSONAR_public
+    from resources import registry
+    logging.getLogger().setLevel(logging.WARNING) # 분석 로그가 측정/출력을 방해하지 않도록
+    if args.mode == 'record':
+        install_http_recorder(store)
+
+    encoder_started: float = time.perf_counter()
+    sbert_model: Any = HashingEncoder() if args.fake_encoder else registry.get('encoder')
+    if sbert_model is None:
+        sys.exit("SBERT 모델 로딩 실패. --fake-encoder로 모델 없이 측정할 수 있습니다.")
+    model_load_s: float = time.perf_counter() - encoder_started
+    gemini_model: Any = ReplayGeminiModel(store, args.latency_gemini_ms)
+    if args.mode == 'record':
+        real_gemini: Any = registry.get('gemini')
+        gemini_model = RecordingGeminiModel(real_gemini, store) if real_gemini is not None else None
+
+    timer = StageTimer()
+    install_stage_timers(MuseSONAR_public, timer)
+    analyze: Callable[[str], Any] = lambda idea: MuseSONAR_public.analyze_idea(idea, sbert_model, gemini_model)
+
+    ideas: List[str] = load_ideas()
+    if args.limit > 0:
+        ideas = ideas[:args.limit]
+    print(f"모드={args.mode}, 아이디어 {len(ideas)}개, 인코더={getattr(sbert_model, 'model_name', type(sbert_model).__name__)} (로딩 {model_load_s:.2f}s), 캐시={cache_dir}")
+
+    reports: List[Dict[str, Any]] = []
+    for level in args.concurrency:
+        report: Dict[str, Any] = run_level(timer, analyze, ideas, level)
+        print_report(report)
+        reports.append(report)
+
+    rss_mb: float = peak_rss_mb()
+    print(f"\n최대 RSS: {rss_mb:.1f} MB, 활성 스레드 {threading.active_count()}개")
+    print(f"픽스처 재생 히트 {store.hits}, 미기록(default 응답) {store.misses}")
+    if server is not None:
+        print(f"스텁 서버 요청 수: {server.request_counts}")
+        server.stop()
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({'mode': args.mode, 'model_load_s': model_load_s, 'peak_rss_mb': rss_mb, 'levels': reports,
+                       'fixture_hits': store.hits, 'fixture_misses': store.misses}, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json_out}")
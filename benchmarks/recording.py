@@ -0,0 +1,160 @@
+# benchmarks/recording.py
+
+"""
+벤치마크용 외부 응답 기록/재생(record/replay) 픽스처입니다.
+- Google CSE JSON, KIPRIS XML: 요청 파라미터(키/비밀 값 제외) 해시를 키로 fixtures/<backend>/<key>.<ext>에 저장
+- Gemini: 프롬프트 해시를 키로 fixtures/gemini/<key>.txt에 응답 텍스트 저장
+기록에 없는 요청은 backend별 default 픽스처로 응답합니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from typing import Any, Dict, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# 백엔드별 파일 확장자/Content-Type
+BACKEND_FORMATS: Dict[str, tuple] = {
+    'google': ('json', 'application/json; charset=utf-8'),
+    'kipris': ('xml', 'application/xml; charset=utf-8'),
+    'gemini': ('txt', 'text/plain; charset=utf-8'),
+}
+# 키 계산에서 제외할 파라미터 (API 키 등 환경마다 다른 값)
+SECRET_PARAMS = frozenset(('key', 'cx', 'ServiceKey'))
+
+
+def backend_for_url(url: str) -> Optional[str]:
+    if 'customsearch' in url:
+        return 'google'
+    if 'kipris' in url.lower() or 'getAdvancedSearch' in url or 'getWordSearch' in url:
+        return 'kipris'
+    return None
+
+def normalize_query(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    URL에 붙은 쿼리 문자열 + params를 실제 요청에 실리는 형태(urlencode 후 다시 파싱, 빈 값 유지)로 맞추고 비밀 값을 뺍니다.
+    기록(params 딕셔너리)과 재생(스텁 서버가 받은 쿼리 문자열)이 모두 이 함수를 거쳐야 같은 키가 나옵니다.
+    """
+    query: str = urlsplit(url).query
+    if params:
+        query = "&".join(filter(None, (query, urlencode(list(params.items())))))
+    return {k: v for k, v in parse_qsl(query, keep_blank_values=True) if k not in SECRET_PARAMS}
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """요청 경로의 마지막 부분 + normalize_query 결과(정렬)로 픽스처 키를 만듭니다."""
+    endpoint: str = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+    raw: str = endpoint + "?" + json.dumps(normalize_query(url, params), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:20]
+
+
+class FixtureStore:
+    """fixtures/<backend>/ 디렉토리의 응답 파일 읽기/쓰기"""
+
+    def __init__(self, directory: str = FIXTURES_DIR):
+        self.directory: str = directory
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def _path(self, backend: str, key: str) -> str:
+        return os.path.join(self.directory, backend, f"{key}.{BACKEND_FORMATS[backend][0]}")
+
+    def save(self, backend: str, key: str, body: bytes) -> None:
+        os.makedirs(os.path.join(self.directory, backend), exist_ok=True)
+        with open(self._path(backend, key), 'wb') as f:
+            f.write(body)
+
+    def load(self, backend: str, key: str) -> bytes:
+        """기록된 응답을 반환합니다. 없으면 default 픽스처를 반환합니다."""
+        path: str = self._path(backend, key)
+        if os.path.exists(path):
+            self.hits[backend] = self.hits.get(backend, 0) + 1
+        else:
+            self.misses[backend] = self.misses.get(backend, 0) + 1
+            path = self._path(backend, 'default')
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+# =============== HTTP 기록 (http_client.fetch/fetch_stream 감싸기) ===============
+
+def install_http_recorder(store: FixtureStore) -> None:
+    """http_client.fetch/fetch_stream을 감싸 Google/KIPRIS 응답을 픽스처로 저장합니다. (record 모드, 실제 네트워크 사용)"""
+    import http_client
+    original_fetch = http_client.fetch
+
+    async def recording_fetch(url: str, params: Optional[Dict[str, Any]] = None, *args: Any, **kwargs: Any):
+        response = await original_fetch(url, params, *args, **kwargs)
+        backend: Optional[str] = backend_for_url(url)
+        if backend is not None and response.status_code == 200:
+            store.save(backend, request_key(url, params), response.content)
+        return response
+
+    original_fetch_stream = http_client.fetch_stream
+
+    async def recording_fetch_stream(url: str, consumer_factory: Any, params: Optional[Dict[str, Any]] = None, *args: Any, **kwargs: Any):
+        chunks: list = []
+
+        class TeeConsumer:
+            """본문 조각을 원래 소비자에게 넘기면서 픽스처 저장용으로 모아 둡니다."""
+            def __init__(self):
+                chunks.clear() # 재시도 시 이전 시도의 조각 버림
+                self._consumer = consumer_factory()
+
+            def feed(self, chunk: bytes) -> None:
+                chunks.append(chunk)
+                self._consumer.feed(chunk)
+
+            def close(self) -> Any:
+                return self._consumer.close()
+
+        response, result = await original_fetch_stream(url, TeeConsumer, params, *args, **kwargs)
+        backend: Optional[str] = backend_for_url(url)
+        if backend is not None and response.status_code == 200:
+            store.save(backend, request_key(url, params), b''.join(chunks))
+        return response, result
+
+    http_client.fetch = recording_fetch
+    http_client.fetch_stream = recording_fetch_stream
+    logging.info(f"HTTP 응답 기록 활성화: {store.directory}")
+
+
+# =============== Gemini 기록/재생 ===============
+
+class _ReplayResponse:
+    def __init__(self, text: str):
+        self.text: str = text
+
+
+class RecordingGeminiModel:
+    """실제 Gemini 모델 호출 결과를 프롬프트 해시별로 저장하는 래퍼 (record 모드)"""
+
+    def __init__(self, model: Any, store: FixtureStore):
+        self._model: Any = model
+        self._store: FixtureStore = store
+        self.model_name: str = getattr(model, 'model_name', 'recording')
+
+    def generate_content(self, prompt: str, *args: Any, **kwargs: Any) -> Any:
+        response = self._model.generate_content(prompt, *args, **kwargs)
+        self._store.save('gemini', prompt_key(prompt), response.text.encode('utf-8'))
+        return response
+
+
+class ReplayGeminiModel:
+    """저장된 Gemini 응답을 지연 시간을 주입해 돌려주는 대역 모델 (replay 모드)"""
+
+    def __init__(self, store: FixtureStore, latency_ms: float = 0.0):
+        self._store: FixtureStore = store
+        self.latency_ms: float = latency_ms
+        self.model_name: str = 'replay'
+
+    def generate_content(self, prompt: str, *args: Any, **kwargs: Any) -> _ReplayResponse:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        return _ReplayResponse(self._store.load('gemini', prompt_key(prompt)).decode('utf-8'))
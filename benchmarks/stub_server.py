@@ -0,0 +1,99 @@
+# benchmarks/stub_server.py
+
+"""
+Google CSE / KIPRIS API를 대신하는 로컬 스텁 HTTP 서버입니다.
+기록된 픽스처를 재생하며, 백엔드별 고정 지연 + 지터를 주입할 수 있습니다.
+
+경로:
+    /google/customsearch/v1                  -> fixtures/google
+    /kipris/getAdvancedSearch, /kipris/getWordSearch -> fixtures/kipris
+
+단독 실행:
+    python -m benchmarks.stub_server --port 8765 --latency-google-ms 300 --latency-kipris-ms 800
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from benchmarks.recording import BACKEND_FORMATS, FixtureStore, request_key
+from typing import Dict, Optional
+
+
+class StubServer:
+    """백그라운드 스레드에서 도는 ThreadingHTTPServer 래퍼"""
+
+    def __init__(self, store: FixtureStore, latency_ms: Optional[Dict[str, float]] = None, jitter_ratio: float = 0.2,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.store: FixtureStore = store
+        self.latency_ms: Dict[str, float] = latency_ms or {}
+        self.jitter_ratio: float = jitter_ratio
+        self.request_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                parts = urlsplit(self.path)
+                backend: str = parts.path.strip('/').split('/', 1)[0]
+                if backend not in ('google', 'kipris'):
+                    self.send_error(404)
+                    return
+                with stub._lock:
+                    stub.request_counts[backend] = stub.request_counts.get(backend, 0) + 1
+                delay_ms: float = stub.latency_ms.get(backend, 0.0)
+                if delay_ms > 0:
+                    time.sleep(delay_ms * random.uniform(1 - stub.jitter_ratio, 1 + stub.jitter_ratio) / 1000)
+                body: bytes = stub.store.load(backend, request_key(self.path))
+                self.send_response(200)
+                self.send_header('Content-Type', BACKEND_FORMATS[backend][1])
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logging.debug("stub: " + format % args)
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-stub-server", daemon=True)
+        self._thread.start()
+        logging.info(f"스텁 서버 시작: {self.base_url} (지연 {self.latency_ms})")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Google CSE / KIPRIS 로컬 스텁 서버")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-google-ms', type=float, default=0.0)
+    parser.add_argument('--latency-kipris-ms', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.2, help="지연 시간 지터 비율 (0.2 = ±20%%)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    server = StubServer(FixtureStore(), {'google': args.latency_google_ms, 'kipris': args.latency_kipris_ms}, args.jitter, port=args.port).start()
+    print(f"MUSESONAR_GOOGLE_SEARCH_URL={server.base_url}/google/customsearch/v1")
+    print(f"MUSESONAR_KIPRIS_API_BASE_URL={server.base_url}/kipris")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,54 @@
+# cache_keys.py
+
+"""
+2단 캐시(layered_cache) 항목의 명시적 키 생성 규칙입니다. resources.memoize와 직접 조회/저장 코드가 모두 이 규칙을 씁니다.
+키는 '네임스페이스:해시' 형태의 짧은 문자열이며, 해시 입력은 정규화 텍스트/문자열/숫자 등 JSON으로 표현되는 값만 허용합니다.
+(모델 객체 같은 살아 있는 객체의 pickle/hash 결과에 키가 좌우되지 않으므로 재시작, 워커 프로세스 간에 같은 키가 만들어짐)
+"""
+
+import config
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Optional
+
+# 키 규칙 버전 (정규화/직렬화 방식이 바뀌면 올려서 이전 항목과 섞이지 않도록 함)
+KEY_SCHEME_VERSION: int = 1
+
+# 캐시 통계 카운터 키 접두사 (layered_cache가 네임스페이스별 누적 히트/미스를 디스크에 기록할 때 사용)
+STATS_KEY_PREFIX: str = "cache_stats"
+
+
+# 키용 텍스트 정규화 함수 (유니코드 호환 문자, 공백 차이 무시)
+def normalize_key_text(text: str) -> str:
+    normalized: str = unicodedata.normalize('NFKC', text)
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+def build_key(namespace: str, *parts: Any) -> str:
+    """
+    네임스페이스와 키 구성 값으로 캐시 키를 만듭니다. 문자열 값은 normalize_key_text로 정규화합니다.
+    JSON으로 직렬화할 수 없는 값(객체 등)이 있으면 TypeError (키 구성 값은 호출 측에서 명시적으로 골라야 함)
+    """
+    values = [normalize_key_text(part) if isinstance(part, str) else part for part in parts]
+    raw: str = json.dumps([KEY_SCHEME_VERSION, namespace, values], sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return f"{namespace}:{hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()}"
+
+def key_namespace(key: Any) -> Optional[str]:
+    """build_key로 만든 키의 네임스페이스 (그 외 형식의 키는 None)"""
+    if isinstance(key, str) and ':' in key:
+        return key.split(':', 1)[0]
+    return None
+
+
+# 모델명 조회 함수 (Gemini GenerativeModel 등의 model_name 속성)
+def model_name_of(model: Any) -> Optional[str]:
+    return getattr(model, 'model_name', None) if model is not None else None
+
+def llm_verdict_key(user_idea: str,
+                    search_text_excerpt: str,
+                    source_type_mapped: str,
+                    model_llm: Any,
+                    prompt_ver: str = config.PROMPT_VERSION) -> str:
+    """LLM 검증 결과 키: (정규화 아이디어, 정규화 발췌문, 출처 유형, 모델명, 프롬프트 버전)"""
+    return build_key('llm_verdict', user_idea, search_text_excerpt, source_type_mapped, model_name_of(model_llm), prompt_ver)
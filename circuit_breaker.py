@@ -0,0 +1,144 @@
+# circuit_breaker.py
+
+"""
+외부 백엔드(Google Custom Search, KIPRIS, Gemini)별 회로 차단기 모듈입니다.
+상태는 cache_dir 하위 diskcache에 저장되어 Flask 워커/분석 워커 프로세스가 공유합니다.
+연속 실패가 임계값에 도달하면 차단(open)되어 호출 없이 즉시 실패하고,
+복구 대기 시간이 지나면 시험 요청(half-open) 1건만 허용하여 성공 시 닫고(closed) 실패 시 다시 차단합니다.
+"""
+
+import config
+import diskcache
+import logging
+import os
+import time
+import rate_limiter
+from typing import Any, Dict, Optional
+
+# --- 상태 저장소 (MuseSONAR_public의 cache_dir 하위) ---
+CIRCUIT_BREAKER_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "circuit_breakers")
+
+# 회로 상태 값
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# 차단으로 호출을 생략했을 때 분석 결과 metrics.degradations에 기록하는 사유
+REASON_CIRCUIT_OPEN = "circuit_open"
+
+BreakerStateType = Dict[str, Any] # state, failures, opened_at, probe_started_at, last_error, changed_at
+
+
+class CircuitOpenError(Exception):
+    """회로가 차단되어 백엔드 호출을 생략할 때 발생합니다."""
+
+    def __init__(self, backend: str):
+        super().__init__(f"{backend} 회로 차단 중 (호출 생략)")
+        self.backend: str = backend
+
+
+class CircuitBreaker:
+    """diskcache에 상태를 둔 백엔드 단위 회로 차단기"""
+
+    def __init__(self, backend: str, store: diskcache.Cache,
+                 failure_threshold: int = config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 recovery_s: float = config.CIRCUIT_BREAKER_RECOVERY_S):
+        self.backend: str = backend
+        self.store: diskcache.Cache = store
+        self.failure_threshold: int = failure_threshold
+        self.recovery_s: float = recovery_s
+        self._key: str = f"breaker:{backend}"
+
+    def _load(self) -> BreakerStateType:
+        return self.store.get(self._key, default=None) or {
+            'state': STATE_CLOSED, 'failures': 0, 'opened_at': None, 'probe_started_at': None, 'last_error': None, 'changed_at': None
+        }
+
+    def _transition(self, record: BreakerStateType, new_state: str, reason: str) -> None:
+        """[트랜잭션 안] 상태를 바꾸고 전이를 로그로 남깁니다."""
+        if record['state'] != new_state:
+            log = logging.info if new_state == STATE_CLOSED else logging.warning
+            log(f"회로 차단기 상태 전이: {self.backend} {record['state']} -> {new_state} ({reason})")
+        record['state'] = new_state
+        record['changed_at'] = time.time()
+
+    def snapshot(self) -> BreakerStateType:
+        return dict(self._load(), backend=self.backend)
+
+    def allow(self) -> bool:
+        """호출 허용 여부. 차단 상태에서 복구 대기 시간이 지났으면 이 호출을 시험 요청으로 허용합니다."""
+        with self.store.transact():
+            record: BreakerStateType = self._load()
+            if record['state'] == STATE_CLOSED:
+                return True
+            now: float = time.time()
+            if record['state'] == STATE_OPEN and now - record['opened_at'] >= self.recovery_s:
+                self._transition(record, STATE_HALF_OPEN, "복구 대기 시간 경과, 시험 요청 허용")
+                record['probe_started_at'] = now
+                self.store.set(self._key, record)
+                return True
+            if record['state'] == STATE_HALF_OPEN and now - (record['probe_started_at'] or 0) >= self.recovery_s:
+                # 시험 요청이 응답 없이 끝난 경우(프로세스 종료 등) 새 시험 요청 허용
+                record['probe_started_at'] = now
+                self.store.set(self._key, record)
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self.store.transact():
+            record: BreakerStateType = self._load()
+            if record['state'] == STATE_CLOSED and record['failures'] == 0:
+                return
+            self._transition(record, STATE_CLOSED, "호출 성공")
+            record.update(failures=0, opened_at=None, probe_started_at=None)
+            self.store.set(self._key, record)
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        with self.store.transact():
+            record: BreakerStateType = self._load()
+            record['failures'] += 1
+            record['last_error'] = error
+            if record['state'] == STATE_HALF_OPEN:
+                self._transition(record, STATE_OPEN, f"시험 요청 실패: {error}")
+                record['opened_at'] = time.time()
+            elif record['state'] == STATE_CLOSED and record['failures'] >= self.failure_threshold:
+                self._transition(record, STATE_OPEN, f"연속 실패 {record['failures']}회: {error}")
+                record['opened_at'] = time.time()
+            self.store.set(self._key, record)
+
+
+# --- 모듈 단위 차단기 ---
+_breakers: Dict[str, CircuitBreaker] = {}
+if config.CIRCUIT_BREAKER_ENABLED:
+    try:
+        _store: diskcache.Cache = diskcache.Cache(CIRCUIT_BREAKER_DIR)
+        for _backend in config.CIRCUIT_BREAKER_BACKENDS:
+            _breakers[_backend] = CircuitBreaker(_backend, _store)
+        logging.info(f"회로 차단기 초기화 완료: {list(_breakers)}")
+    except Exception as e:
+        logging.error(f"회로 차단기 초기화 실패! 차단 없이 호출합니다. 오류: {e}")
+        _breakers = {}
+
+
+# 호출 전 확인 함수
+def check(backend: str) -> None:
+    """회로가 차단 중이면 현재 분석 범위에 성능 저하를 기록하고 CircuitOpenError를 발생시킵니다. 차단기가 없는 백엔드는 바로 통과합니다."""
+    breaker: Optional[CircuitBreaker] = _breakers.get(backend)
+    if breaker is not None and not breaker.allow():
+        logging.info(f"{backend} 회로 차단 중. 호출 없이 건너뜁니다.")
+        rate_limiter.record_degradation(backend, REASON_CIRCUIT_OPEN)
+        raise CircuitOpenError(backend)
+
+def record_success(backend: str) -> None:
+    breaker: Optional[CircuitBreaker] = _breakers.get(backend)
+    if breaker is not None:
+        breaker.record_success()
+
+def record_failure(backend: str, error: Any = None) -> None:
+    breaker: Optional[CircuitBreaker] = _breakers.get(backend)
+    if breaker is not None:
+        breaker.record_failure(str(error) if error is not None else None)
+
+# 상태 조회 함수 (헬스 체크용)
+def health() -> Dict[str, BreakerStateType]:
+    return {backend: breaker.snapshot() for backend, breaker in _breakers.items()}
@@ -33,4 +33,156 @@ KW_HINTS: Tuple[str, ...] =
 LLM_VERIFICATION_PROMPT_TEMPLATE: str = """
 [Context]
 You are an AI assistant judging whether a given search result ('Hit-excerpt') provides concrete evidence that a user's idea ('User-idea') has already been implemented or exists in a tangible form. Focus *primarily*... 
-""" # 일부 공개
\ No newline at end of file
+""" # 일부 공개
+
+# --- SBERT 임베딩 관련 설정 ---
+SBERT_MODEL_NAME: str = 'jhgan/ko-sroberta-multitask'
+
+# SBERT CPU 추론 백엔드 (embedding_backends)
+# 'torch': float32 PyTorch, 'torch_int8': int8 동적 양자화 PyTorch, 'onnx': ONNX Runtime, 'onnx_int8': int8 양자화 ONNX Runtime
+SBERT_BACKEND: str = 'torch'
+SBERT_NUM_THREADS: int = 0 # 워커당 추론 스레드 수 (0이면 사용 가능한 CPU 수 / JOB_WORKER_PROCESSES로 자동 결정)
+SBERT_ONNX_QUANTIZATION: str = 'auto' # onnx_int8 양자화 대상: 'auto'(CPU 플래그로 결정), 'avx2', 'avx512', 'avx512_vnni', 'arm64'
+SBERT_PARITY_MIN_COSINE: float = 0.99 # 일치도 검사에서 float32 기준 대비 허용하는 최소 텍스트별 코사인 유사도
+
+# 임베딩 캐시 설정 (모델명 + 정규화 텍스트 해시 기반)
+EMBEDDING_CACHE_ENABLED: bool = True
+EMBEDDING_CACHE_DTYPE: str = 'float16' # 저장 정밀도: 'float16' 또는 'float32'
+EMBEDDING_CACHE_SIZE_LIMIT: int = 2 * 1024 ** 3 # 바이트 단위 (초과 시 LRU 방식으로 제거)
+
+# 요청 간 SBERT 마이크로 배칭 인코더 설정 (encoder_service.BatchingEncoder)
+ENCODER_BATCHING_ENABLED: bool = True
+ENCODER_BATCH_WAIT_MS: float = 5.0 # 첫 요청 도착 후 다른 요청을 모으는 최대 대기 시간 (밀리초)
+ENCODER_MAX_BATCH_TEXTS: int = 256 # 한 번에 모으는 최대 텍스트 수
+ENCODER_MODEL_BATCH_SIZE: int = 32 # model.encode에 전달하는 내부 배치 크기
+
+# LLM 병렬 검증 설정 (verify_hits_concurrently)
+LLM_VERIFICATION_MAX_WORKERS: int = 4 # 프로세스 전체에서 동시에 진행하는 Gemini 검증 호출 수
+LLM_VERIFICATION_DEADLINE_S: float = 20.0 # 요청 하나의 LLM 검증 단계 전체 제한 시간 (초)
+
+# 다중 hit 일괄 LLM 검증 설정 (Gemini 호출 1회에 여러 hit 검증)
+LLM_BATCH_VERIFICATION_ENABLED: bool = False
+LLM_BATCH_SIZE: int = 5 # 한 번의 호출로 검증하는 최대 hit 수
+
+# 일괄 검증용 프롬프트 템플릿 (JSON 배열 응답, hit 당 status/reason 1개)
+LLM_BATCH_VERIFICATION_PROMPT_TEMPLATE: str = """
+[Context]
+You are an AI assistant judging, for each numbered search result ('Hit'), whether it provides concrete evidence that a user's idea ('User-idea') has already been implemented or exists in a tangible form.
+Judge every hit independently of the others.
+
+[User-idea]
+{user_idea}
+
+[Hits]
+{hits_block}
+
+[Output]
+Respond with JSON only: an array of exactly {num_hits} objects in the same order as the hits, each of the form
+{{"id": <hit number>, "status": "Yes" | "No" | "Unclear", "reason": "<one short sentence>"}}
+"""
+
+# --- 외부 HTTP 호출 계층 설정 (http_client) ---
+HTTP_POOL_SIZE: int = 50 # 전체 keep-alive 연결 풀 크기
+HTTP_PER_HOST_CONCURRENCY: int = 8 # 호스트별 동시 요청 수 상한
+HTTP_KEEPALIVE_TIMEOUT_S: float = 60.0 # 유휴 연결 유지 시간 (초)
+
+# KIPRIS 검색 단계 실행 전략
+# 'sequential': Advanced(Keyword) → Word(Original) → Word(Keyword) 순차 Fallback
+# 'speculative': 1단계 시작 후 KIPRIS_HEDGE_DELAY_S 경과(또는 1단계 실패) 시 나머지 단계 동시 실행, 우선순위가 가장 높은 비어있지 않은 결과 채택
+KIPRIS_SEARCH_STRATEGY: str = 'sequential'
+KIPRIS_HEDGE_DELAY_S: float = 1.5
+
+# KIPRIS 페이지 조회 설정 (kipris_client)
+KIPRIS_MAX_PAGES: int = 3 # 검색 단계마다 가져오는 최대 페이지 수 (1페이지 전체 건수를 보고 2페이지부터 동시 요청, 1이면 기존처럼 1페이지만)
+KIPRIS_IO_MAX_WORKERS: int = 4 # 페이지 캐시 조회/저장과 응답 XML 파싱을 이벤트 루프 밖에서 처리하는 전용 스레드 수
+
+# --- 비동기 분석 작업 큐 설정 (job_queue) ---
+JOB_WORKER_PROCESSES: int = 2 # 분석 워커 프로세스 수 (프로세스마다 SBERT 모델 1회 로딩)
+JOB_RESULT_TTL_S: int = 86400 # 작업 상태/결과 보관 시간 (초)
+
+# --- 전체 분석 결과 캐시 설정 (result_cache) ---
+RESULT_CACHE_ENABLED: bool = True
+RESULT_CACHE_TTL_S: int = 6 * 3600 # 분석 결과 보관 시간 (초)
+
+# --- 유사 아이디어 재사용 인덱스 설정 (idea_index) ---
+IDEA_INDEX_ENABLED: bool = True
+IDEA_REUSE_SIMILARITY_THRESHOLD: float = 0.95 # 과거 아이디어와의 코사인 유사도가 이 값 이상이면 후보 풀/LLM 판정 재사용
+IDEA_INDEX_LSH_TABLES: int = 8 # 랜덤 초평면 LSH 테이블 수
+IDEA_INDEX_LSH_BITS: int = 12 # 테이블당 해시 비트 수
+IDEA_INDEX_TTL_S: int = 864000 # 항목 보관 시간 (검색 캐시와 동일하게 10일)
+
+# --- 로컬 특허 코퍼스 설정 (patent_corpus) ---
+PATENT_CORPUS_ENABLED: bool = True # 코퍼스 디렉토리가 있을 때만 사용
+PATENT_CORPUS_TOP_K: int = 20 # 로컬 코퍼스에서 가져오는 후보 수
+PATENT_CORPUS_MIN_LOCAL_HITS: int = 10 # 관련성 기준(RELEVANCE_THRESHOLD) 이상 로컬 후보가 이 수 이상이면 실시간 KIPRIS 호출 생략
+PATENT_CORPUS_LSH_TABLES: int = 8
+PATENT_CORPUS_LSH_BITS: int = 14
+PATENT_CORPUS_ENCODE_BATCH_SIZE: int = 64 # 수집(ingest) 시 인코딩 배치 크기
+
+# --- 다중 질의 확장 설정 (query_expansion) ---
+QUERY_EXPANSION_ENABLED: bool = True
+QUERY_EXPANSION_MAX_GOOGLE_QUERIES: int = 4 # 원문 포함 Google 하위 질의 최대 수
+QUERY_EXPANSION_MAX_KIPRIS_QUERIES: int = 2 # 원문 포함 KIPRIS 하위 질의 최대 수 (질의마다 최대 3단계 호출)
+QUERY_EXPANSION_SUBSET_SIZE: int = 3 # 키워드 부분집합 질의의 키워드 수
+QUERY_EXPANSION_ROMANIZATION_ENABLED: bool = True # 키워드의 로마자 표기(국어의 로마자 표기법 음역, 영어 번역 아님) Google 질의 추가
+QUERY_EXPANSION_MAX_CONCURRENCY: int = 6 # 프로세스 전체 하위 질의 동시 실행 상한 (모든 분석 요청 공유)
+
+# --- 유사 중복 검색 결과 묶기 설정 (near_duplicates) ---
+NEAR_DUPLICATE_ENABLED: bool = True
+NEAR_DUPLICATE_SHINGLE_SIZE: int = 3 # SimHash 조각(글자 n-gram) 길이
+NEAR_DUPLICATE_MAX_HAMMING: int = 6 # 64비트 SimHash 해밍 거리가 이 값 이하이면 같은 묶음 (LSH 밴드 수 = 값 + 1)
+
+# --- 외부 API 요청 속도/일일 할당량 설정 (rate_limiter) ---
+RATE_LIMIT_ENABLED: bool = True
+# API 이름: (초당 토큰 보충 속도, 버킷 크기(버스트), 일일 할당량(0이면 무제한))
+RATE_LIMITS: dict[str, Tuple[float, int, int]] = {
+    'google': (1.0, 10, 100),    # Custom Search 무료 할당량 100회/일
+    'kipris': (5.0, 20, 1000),
+    'gemini': (0.25, 5, 1500),   # 15 RPM
+}
+RATE_LIMIT_MAX_WAIT_S: float = 5.0 # 토큰을 기다리는 최대 시간 (초과 시 성능 저하 경로로 전환)
+
+# --- 외부 백엔드 회로 차단기 설정 (circuit_breaker) ---
+CIRCUIT_BREAKER_ENABLED: bool = True
+CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3 # 연속 실패가 이 횟수에 도달하면 차단(open)
+CIRCUIT_BREAKER_RECOVERY_S: float = 60.0 # 차단 후 이 시간이 지나면 시험 요청(half-open) 1건 허용
+CIRCUIT_BREAKER_BACKENDS: Tuple[str, ...] = ('google', 'kipris', 'gemini')
+
+# --- 지연 로딩 자원 레지스트리 설정 (resources) ---
+# 사전 로딩(--preload / MUSESONAR_PRELOAD=1) 시 초기화할 구성 요소
+# fork 기반 서버에서 마스터 프로세스가 미리 로딩하면 모델 가중치를 워커가 copy-on-write로 공유
+# (JVM(okt), 인코더 워커 스레드(encoder), gRPC 클라이언트(gemini)는 fork 이후 안전하지 않으므로 기본값에서 제외)
+RESOURCE_PRELOAD_COMPONENTS: Tuple[str, ...] = ('sbert',)
+
+# --- 2단 캐시 설정 (layered_cache: 메모리 LRU/TTL 계층 + diskcache 계층) ---
+CACHE_MEMORY_ENABLED: bool = True
+CACHE_MEMORY_MAX_ENTRIES: int = 2048 # 네임스페이스별 메모리 계층 최대 항목 수 (초과 시 LRU 제거)
+CACHE_MEMORY_TTL_S: float = 600.0 # 메모리 계층 항목 최대 보관 시간 (다른 워커의 갱신을 늦어도 이 시간 안에 반영)
+CACHE_DEFAULT_TTL_S: int = 86400 # CACHE_NAMESPACE_TTLS에 없는 네임스페이스의 디스크 보관 시간 (초)
+CACHE_NAMESPACE_TTLS: dict[str, int] = { # 네임스페이스별 디스크 보관 시간 (초)
+    'google_search': 864000,  # 10일
+    'kipris_search': 864000,  # 10일
+    'kipris_page': 864000,    # 10일 (KIPRIS 페이지별 압축 레코드)
+    'llm_verdict': 86400,     # 1일 (단건/일괄 LLM 검증 판정)
+}
+CACHE_STATS_FLUSH_INTERVAL_S: float = 30.0 # 네임스페이스별 누적 히트/미스를 디스크에 합산하는 주기 (초, 'python -m layered_cache'로 조회)
+
+# --- 키워드 추출 백엔드 설정 (keyword_extractors) ---
+KEYWORD_EXTRACTOR_BACKEND: str = 'okt' # 'okt' (KoNLPy, JVM) 또는 'regex' (프로세스 내 사전/정규식 명사 추출)
+KEYWORD_MEMO_SIZE: int = 4096 # 정규화된 텍스트별 키워드 추출 결과 LRU 메모 크기
+
+# --- 단계별 계측/지표 설정 (telemetry) ---
+METRICS_ENABLED: bool = True # 단계별 소요 시간, 캐시 히트/미스, LLM 호출 지표 수집 (/metrics)
+METRICS_ATTACH_TIMINGS: bool = False # 분석 결과(timings)에 요청별 단계 시간 목록 포함 (요청별로 켤 수도 있음)
+METRICS_LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0) # 초 단위
+METRICS_BATCH_SIZE_BUCKETS: Tuple[float, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+METRICS_CACHE_LOOKUP_BUCKETS: Tuple[float, ...] = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1) # 초 단위 (메모리 계층은 마이크로초 수준)
+METRICS_PUBLISH_INTERVAL_S: float = 10.0 # 웹/워커 프로세스가 분석 요청 종료 시 지표 스냅샷을 공유 저장소에 기록하는 최소 간격 (초)
+
+# --- 로깅 설정 (logging_setup) ---
+LOG_LEVEL: str = 'INFO' # 기본 로그 레벨
+LOG_MODULE_LEVELS: dict[str, str] = {} # 모듈(소스 파일 이름)별 레벨, 예: {'MuseSONAR_public': 'DEBUG', 'http_client': 'WARNING'}
+LOG_ASYNC_ENABLED: bool = True # 큐 기반 비동기 로깅 (파일/콘솔 쓰기와 포맷팅을 전용 스레드에서 처리)
+LOG_QUEUE_SIZE: int = 10000 # 로그 큐 최대 크기 (가득 차면 DEBUG/INFO 레코드는 버림)
+LOG_QUEUE_PUT_TIMEOUT_S: float = 1.0 # 큐가 가득 찼을 때 WARNING 이상 레코드가 자리를 기다리는 최대 시간 (초과 시 버리고 집계)
+LOG_DEBUG_SAMPLE_EVERY: int = 20 # 대량 DEBUG 로그(extra=SAMPLED)는 호출 위치별로 N개 중 1개만 기록 (1이면 모두 기록)
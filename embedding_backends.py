@@ -0,0 +1,211 @@
+# embedding_backends.py
+
+"""
+SBERT(ko-sroberta) 임베딩 모델의 CPU 추론 백엔드 모음입니다.
+resources의 'sbert' 자원은 config.SBERT_BACKEND로 선택한 백엔드로 모델을 로딩합니다.
+- 'torch': float32 PyTorch (기존 방식, 기준 모델)
+- 'torch_int8': Linear 층을 int8로 동적 양자화한 PyTorch
+- 'onnx': ONNX로 내보낸 그래프를 onnxruntime으로 실행 (그래프 최적화 적용)
+- 'onnx_int8': ONNX 그래프를 CPU 명령어 집합에 맞춰 int8로 동적 양자화하여 onnxruntime으로 실행
+ONNX 그래프는 처음 한 번 ONNX_EXPORT_DIR에 내보낸 뒤 워커들이 재사용합니다.
+(onnx 계열은 'pip install sentence-transformers[onnx]' 필요, 없으면 'torch'로 대체)
+"""
+
+import config
+import logging
+import os
+import platform
+import re
+import shutil
+import tempfile
+import time
+import numpy as np
+from typing import Any, Callable, Dict, Optional
+
+BACKENDS = ('torch', 'torch_int8', 'onnx', 'onnx_int8')
+
+# --- ONNX 그래프 저장 디렉토리 (MuseSONAR_public의 cache_dir 하위) ---
+ONNX_EXPORT_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "onnx")
+
+
+def model_id(backend: str = config.SBERT_BACKEND) -> str:
+    """
+    임베딩 캐시/결과 캐시 키에 쓰는 모델 식별자. 기준 백엔드('torch')는 모델명 그대로(기존 캐시 유지),
+    그 외 백엔드는 벡터가 조금씩 다르므로 '모델명@백엔드'로 구분합니다.
+    """
+    return config.SBERT_MODEL_NAME if backend == 'torch' else f"{config.SBERT_MODEL_NAME}@{backend}"
+
+def base_model_name(name: str) -> str:
+    """model_id에서 백엔드 표시를 뗀 모델명 (같은 모델로 만든 코퍼스 임베딩과의 호환 여부 판단용)"""
+    return name.split('@', 1)[0]
+
+
+# =============== 스레드 수 자동 조정 ===============
+
+def available_cpus() -> int:
+    """이 프로세스가 쓸 수 있는 CPU 수 (CPU affinity/컨테이너 cpuset 반영)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def resolve_num_threads(num_threads: int = config.SBERT_NUM_THREADS) -> int:
+    """
+    워커 하나가 추론에 쓸 스레드 수. 0이면 사용 가능한 CPU를 모델을 올리는 워커 프로세스 수로 나눠
+    워커끼리 코어를 두고 경쟁(과다 구독)하지 않도록 합니다.
+    """
+    if num_threads > 0:
+        return num_threads
+    return max(1, available_cpus() // max(1, config.JOB_WORKER_PROCESSES))
+
+def _tune_torch_threads(num_threads: int) -> None:
+    import torch
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1) # 모델 호출은 배칭 인코더 워커 스레드 하나에서만 일어남
+    except RuntimeError: # 이미 병렬 작업이 시작된 뒤에는 변경 불가
+        logging.debug("torch inter-op 스레드 수는 이미 고정되어 변경하지 않습니다.")
+
+def _onnx_session_options(num_threads: int) -> Any:
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = num_threads
+    options.inter_op_num_threads = 1
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+# =============== ONNX 내보내기 ===============
+
+def onnx_quantization_target() -> str:
+    """int8 동적 양자화 대상 명령어 집합 ('auto'이면 현재 CPU 플래그로 결정)"""
+    if config.SBERT_ONNX_QUANTIZATION != 'auto':
+        return config.SBERT_ONNX_QUANTIZATION
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return 'arm64'
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            flags: set[str] = set(next((line for line in f if line.startswith('flags')), '').split())
+    except OSError:
+        flags = set()
+    if 'avx512_vnni' in flags:
+        return 'avx512_vnni'
+    if 'avx512f' in flags:
+        return 'avx512'
+    return 'avx2'
+
+def _export_dir(variant: str) -> str:
+    return os.path.join(ONNX_EXPORT_DIR, re.sub(r'[^\w.-]', '_', config.SBERT_MODEL_NAME), variant)
+
+def _export_onnx(variant: str, quantization: Optional[str]) -> str:
+    """
+    ONNX 그래프(양자화 시 int8 그래프 포함)를 임시 디렉토리에 만든 뒤 이름 변경으로 한 번에 공개합니다.
+    여러 워커가 동시에 내보내도 먼저 끝난 쪽 결과만 남습니다. 내보낸 디렉토리 경로를 반환합니다.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    target: str = _export_dir(variant)
+    if os.path.isdir(target):
+        return target
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    work_dir: str = tempfile.mkdtemp(prefix=f".{variant}-", dir=os.path.dirname(target))
+    started: float = time.perf_counter()
+    logging.info(f"SBERT ONNX 그래프 내보내기 시작: {config.SBERT_MODEL_NAME} ({variant})")
+    try:
+        model = SentenceTransformer(config.SBERT_MODEL_NAME, device='cpu', backend='onnx') # 허브에 ONNX 파일이 없으면 변환
+        model.save_pretrained(work_dir)
+        if quantization is not None:
+            export_dynamic_quantized_onnx_model(model, quantization, work_dir)
+        os.rename(work_dir, target)
+    except OSError:
+        if not os.path.isdir(target): # 다른 워커가 먼저 공개한 경우가 아니면 실제 오류
+            raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    logging.info(f"SBERT ONNX 그래프 내보내기 완료: {target} ({time.perf_counter() - started:.1f}s)")
+    return target
+
+
+# =============== 백엔드별 로더 ===============
+
+def _load_torch(num_threads: int) -> Any:
+    from sentence_transformers import SentenceTransformer
+    _tune_torch_threads(num_threads)
+    return SentenceTransformer(config.SBERT_MODEL_NAME, device='cpu')
+
+def _load_torch_int8(num_threads: int) -> Any:
+    import torch
+    model = _load_torch(num_threads)
+    # 가중치의 대부분인 Linear 층만 int8로 교체 (제자리 변환, float32 가중치는 해제됨)
+    torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+def _load_onnx_variant(num_threads: int, quantization: Optional[str]) -> Any:
+    from sentence_transformers import SentenceTransformer
+    variant: str = f"qint8_{quantization}" if quantization else 'fp32'
+    export_dir: str = _export_onnx(variant, quantization)
+    file_name: str = f"onnx/model_qint8_{quantization}.onnx" if quantization else "onnx/model.onnx"
+    _tune_torch_threads(num_threads) # 토크나이저 외 torch 후처리(풀링/정규화)용
+    return SentenceTransformer(export_dir, device='cpu', backend='onnx', model_kwargs={
+        'file_name': file_name, 'provider': 'CPUExecutionProvider', 'session_options': _onnx_session_options(num_threads),
+    })
+
+def _load_onnx(num_threads: int) -> Any:
+    return _load_onnx_variant(num_threads, None)
+
+def _load_onnx_int8(num_threads: int) -> Any:
+    return _load_onnx_variant(num_threads, onnx_quantization_target())
+
+LOADERS: Dict[str, Callable[[int], Any]] = {
+    'torch': _load_torch,
+    'torch_int8': _load_torch_int8,
+    'onnx': _load_onnx,
+    'onnx_int8': _load_onnx_int8,
+}
+
+
+def load_sbert(backend: str = config.SBERT_BACKEND, num_threads: int = config.SBERT_NUM_THREADS) -> Any:
+    """
+    선택한 백엔드로 SBERT 모델을 로딩합니다. 반환 모델의 model_name 속성에 model_id(backend)를 기록합니다.
+    onnx 계열 의존성(optimum, onnxruntime)이 없으면 경고 후 'torch'로 대체합니다.
+    """
+    if backend not in LOADERS:
+        raise ValueError(f"알 수 없는 SBERT 백엔드: {backend} (선택 가능: {', '.join(BACKENDS)})")
+    threads: int = resolve_num_threads(num_threads)
+    try:
+        model = LOADERS[backend](threads)
+    except ImportError as e:
+        if backend == 'torch':
+            raise
+        logging.warning(f"SBERT 백엔드 '{backend}' 의존성 없음 ({e}). 'pip install sentence-transformers[onnx]' 후 사용할 수 있습니다. 'torch'로 대체합니다.")
+        backend = 'torch'
+        model = LOADERS[backend](threads)
+    model.model_name = model_id(backend) # embedding_cache.get_model_name에서 사용
+    logging.info(f"SBERT 모델({config.SBERT_MODEL_NAME}) 로딩 완료. 백엔드={backend}, 스레드={threads}, pid={os.getpid()}")
+    return model
+
+
+# =============== float32 기준 모델 대비 일치도 검사 ===============
+
+def parity_report(candidate: np.ndarray, reference: np.ndarray) -> Dict[str, float]:
+    """
+    같은 참조 텍스트 세트에 대한 후보 백엔드 임베딩과 기준(float32 torch) 임베딩 (n, dim)을 비교합니다.
+    mean/min/p5_cosine: 텍스트별 코사인 유사도 통계, max_drift: 1 - min_cosine,
+    pair_rank_corr: 텍스트 쌍 유사도 순위의 스피어만 상관 (유사도 순위로 후보를 고르는 분석 결과의 안정성 지표)
+    """
+    cand: np.ndarray = np.asarray(candidate, dtype=np.float32)
+    ref: np.ndarray = np.asarray(reference, dtype=np.float32)
+    cand = cand / np.maximum(np.linalg.norm(cand, axis=1, keepdims=True), 1e-12)
+    ref = ref / np.maximum(np.linalg.norm(ref, axis=1, keepdims=True), 1e-12)
+    cosines: np.ndarray = np.einsum('nd,nd->n', cand, ref)
+
+    upper = np.triu_indices(len(ref), k=1)
+    cand_ranks: np.ndarray = np.argsort(np.argsort((cand @ cand.T)[upper])).astype(np.float64)
+    ref_ranks: np.ndarray = np.argsort(np.argsort((ref @ ref.T)[upper])).astype(np.float64)
+    rank_corr: float = float(np.corrcoef(cand_ranks, ref_ranks)[0, 1]) if len(ref_ranks) > 1 else 1.0
+    return {
+        'mean_cosine': float(cosines.mean()),
+        'min_cosine': float(cosines.min()),
+        'p5_cosine': float(np.percentile(cosines, 5)),
+        'max_drift': float(1.0 - cosines.min()),
+        'pair_rank_corr': rank_corr,
+    }
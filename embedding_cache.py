@@ -0,0 +1,116 @@
+# embedding_cache.py
+
+"""
+검색 결과 텍스트의 SBERT 임베딩을 저장하는 콘텐츠 주소 기반(content-addressed) 캐시입니다.
+키는 (모델명 + 정규화된 텍스트 해시)이며, 캐시에 없는 텍스트만 트랜스포머로 인코딩합니다.
+"""
+
+import config
+import diskcache
+import hashlib
+import logging
+import os
+import re
+import telemetry
+import unicodedata
+import numpy as np
+from typing import List, Dict, Optional, Any
+
+# --- 캐시 디렉토리 (MuseSONAR_public의 cache_dir 하위) ---
+EMBEDDING_CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "embeddings")
+
+
+# 텍스트 정규화 함수
+def normalize_text(text: str) -> str:
+    """유니코드(NFC) 정규화 후 연속 공백을 하나로 줄이고 앞뒤 공백을 제거합니다."""
+    normalized: str = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+# 캐시 키 생성 함수
+def make_embedding_key(model_name: str, text: str, dtype: str = config.EMBEDDING_CACHE_DTYPE) -> str:
+    """모델명, 저장 정밀도, 정규화 텍스트의 SHA-1 해시로 캐시 키를 만듭니다."""
+    digest: str = hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+    return f"emb:{model_name}:{dtype}:{digest}"
+
+# 모델명 조회 함수
+def get_model_name(sbert_model: Any) -> str:
+    """인코더 객체에 model_name 속성이 있으면 사용하고, 없으면 설정의 기본 모델명을 사용합니다."""
+    return getattr(sbert_model, 'model_name', None) or config.SBERT_MODEL_NAME
+
+
+class EmbeddingCache:
+    """diskcache 기반 임베딩 저장소 (크기 제한 초과 시 LRU 방식으로 제거)"""
+
+    def __init__(self,
+                 directory: str = EMBEDDING_CACHE_DIR,
+                 size_limit: int = config.EMBEDDING_CACHE_SIZE_LIMIT,
+                 dtype: str = config.EMBEDDING_CACHE_DTYPE):
+        self.dtype: str = dtype
+        self.cache: diskcache.Cache = diskcache.Cache(
+            directory,
+            size_limit=size_limit,
+            eviction_policy='least-recently-used'
+        )
+        logging.info(f"임베딩 캐시 초기화 완료. 디렉토리: {directory}, dtype={dtype}, size_limit={size_limit}")
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """텍스트 목록의 캐시된 임베딩을 반환합니다. 캐시에 없으면 해당 위치는 None."""
+        vectors: List[Optional[np.ndarray]] = []
+        for text in texts:
+            raw: Optional[bytes] = self.cache.get(make_embedding_key(model_name, text, self.dtype))
+            vectors.append(np.frombuffer(raw, dtype=self.dtype).astype(np.float32) if raw is not None else None)
+        return vectors
+
+    def set_many(self, model_name: str, texts: List[str], vectors: np.ndarray) -> None:
+        """인코딩된 임베딩을 지정된 정밀도(float16/float32)로 변환하여 저장합니다."""
+        for text, vec in zip(texts, vectors):
+            self.cache.set(make_embedding_key(model_name, text, self.dtype),
+                           np.asarray(vec, dtype=self.dtype).tobytes())
+
+    def encode(self, sbert_model: Any, texts: List[str]) -> np.ndarray:
+        """캐시 미스 텍스트만 인코딩하여 (len(texts), dim) float32 행렬을 반환합니다."""
+        model_name: str = get_model_name(sbert_model)
+        cached: List[Optional[np.ndarray]] = self.get_many(model_name, texts)
+
+        # 캐시 미스 텍스트 수집 (같은 배치 안의 중복 텍스트는 한 번만 인코딩)
+        miss_positions: Dict[str, List[int]] = {}
+        for i, (text, vec) in enumerate(zip(texts, cached)):
+            if vec is None:
+                miss_positions.setdefault(normalize_text(text), []).append(i)
+
+        num_missed: int = sum(len(p) for p in miss_positions.values())
+        telemetry.record_cache('embedding', hit=True, count=len(texts) - num_missed)
+        telemetry.record_cache('embedding', hit=False, count=num_missed)
+        logging.debug("임베딩 캐시 조회: 전체 %d개, 히트 %d개, 인코딩 대상 %d개", len(texts), len(texts) - num_missed, len(miss_positions))
+
+        if miss_positions:
+            miss_texts: List[str] = [texts[positions[0]] for positions in miss_positions.values()]
+            telemetry.record_embedding_batch('request', len(miss_texts))
+            encoded: np.ndarray = np.asarray(sbert_model.encode(miss_texts, convert_to_numpy=True), dtype=np.float32)
+            self.set_many(model_name, miss_texts, encoded)
+            for positions, vec in zip(miss_positions.values(), encoded):
+                for i in positions:
+                    cached[i] = vec
+
+        return np.vstack(cached).astype(np.float32, copy=False)
+
+
+# --- 모듈 단위 임베딩 캐시 인스턴스 ---
+embedding_cache: Optional[EmbeddingCache] = None
+if config.EMBEDDING_CACHE_ENABLED:
+    try:
+        embedding_cache = EmbeddingCache()
+    except Exception as e:
+        logging.error(f"임베딩 캐시 초기화 실패! 캐시 없이 인코딩합니다. 오류: {e}")
+        embedding_cache = None
+
+# 임베딩 계산 함수
+def encode_texts(sbert_model: Any, texts: List[str]) -> np.ndarray:
+    """임베딩 캐시를 거쳐 텍스트 목록을 인코딩합니다. 캐시 오류 시 전체를 직접 인코딩합니다."""
+    if embedding_cache is not None:
+        try:
+            return embedding_cache.encode(sbert_model, texts)
+        except Exception as e:
+            logging.warning(f"임베딩 캐시 처리 중 오류 발생. 캐시 없이 인코딩합니다: {e}", exc_info=True)
+    telemetry.record_embedding_batch('request', len(texts))
+    return np.asarray(sbert_model.encode(texts, convert_to_numpy=True), dtype=np.float32)
@@ -0,0 +1,147 @@
+# encoder_service.py
+
+"""
+여러 Flask 요청의 SBERT 인코딩 요청을 모아 한 번에 처리하는 마이크로 배칭 인코더입니다.
+전용 워커 스레드 하나가 모델을 독점 사용하므로 요청 스레드끼리 torch 스레드를 두고 경쟁하지 않습니다.
+"""
+
+import config
+import logging
+import queue
+import telemetry
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import List, Tuple, Optional, Any
+
+# 큐 항목 타입 (인코딩할 텍스트 목록, 결과를 돌려줄 Future)
+EncodeRequestType = Tuple[List[str], Future]
+
+
+class EncoderClosedError(RuntimeError):
+    """종료(close)가 시작된 인코더에 요청했거나, 종료 시점에 처리되지 못한 요청"""
+
+
+class BatchingEncoder:
+    """
+    SentenceTransformer를 감싸는 요청 간 배칭 인코더.
+    encode()는 SentenceTransformer.encode와 같은 방식으로 호출할 수 있으며 항상 float32 numpy 행렬을 반환합니다.
+    """
+
+    def __init__(self,
+                 sbert_model: Any,
+                 model_name: str = config.SBERT_MODEL_NAME,
+                 max_wait_ms: float = config.ENCODER_BATCH_WAIT_MS,
+                 max_batch_texts: int = config.ENCODER_MAX_BATCH_TEXTS,
+                 model_batch_size: int = config.ENCODER_MODEL_BATCH_SIZE):
+        self.sbert_model = sbert_model
+        self.model_name: str = model_name # embedding_cache.get_model_name에서 사용
+        self.max_wait_s: float = max_wait_ms / 1000.0
+        self.max_batch_texts: int = max_batch_texts
+        self.model_batch_size: int = model_batch_size
+        self._queue: "queue.Queue[Optional[EncodeRequestType]]" = queue.Queue()
+        self._closing: bool = False
+        self._close_lock = threading.Lock() # 종료 신호(None) 뒤에 요청이 큐에 들어가지 않도록 submit/close 직렬화
+        self._worker = threading.Thread(target=self._run, name="sbert-batching-encoder", daemon=True)
+        self._worker.start()
+        logging.info(f"SBERT 배칭 인코더 시작 (max_wait={max_wait_ms}ms, max_batch_texts={max_batch_texts}, model_batch_size={model_batch_size})")
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        텍스트 목록을 인코딩 큐에 넣고, (len(texts), dim) 행렬을 돌려줄 Future를 반환합니다.
+        close()가 시작된 뒤에는 EncoderClosedError를 발생시킵니다.
+        """
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        with self._close_lock:
+            if self._closing:
+                raise EncoderClosedError("SBERT 배칭 인코더가 종료되어 요청을 받을 수 없습니다.")
+            self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts: List[str], **kwargs: Any) -> np.ndarray:
+        """[동기 래퍼] submit 후 결과를 기다립니다. (convert_to_numpy 등 추가 인자는 무시)"""
+        return self.submit(texts).result()
+
+    def close(self) -> None:
+        """
+        워커 스레드에 종료 신호를 보내고 그 전에 들어온 요청 처리가 끝날 때까지 기다립니다.
+        워커 종료 후 큐에 남은 요청은 EncoderClosedError로 끝내 호출 측이 Future를 무한히 기다리지 않도록 합니다.
+        """
+        with self._close_lock:
+            if self._closing:
+                return
+            self._closing = True
+            self._queue.put(None)
+        self._worker.join()
+        self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        while True:
+            try:
+                item: Optional[EncodeRequestType] = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and not item[1].done():
+                item[1].set_exception(EncoderClosedError("SBERT 배칭 인코더 종료로 처리되지 못한 요청입니다."))
+
+    def _collect_batch(self, first: EncodeRequestType) -> Tuple[List[EncodeRequestType], bool]:
+        """첫 요청 이후 max_wait 동안 도착한 요청을 모읍니다. (수집된 요청 목록, 종료 신호 여부) 반환"""
+        batch: List[EncodeRequestType] = [first]
+        num_texts: int = len(first[0])
+        deadline: float = time.monotonic() + self.max_wait_s
+        while num_texts < self.max_batch_texts:
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item: Optional[EncodeRequestType] = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            num_texts += len(item[0])
+        return batch, False
+
+    def _encode_batch(self, batch: List[EncodeRequestType]) -> None:
+        """모은 요청들의 텍스트를 길이순으로 정렬해 한 번에 인코딩하고, 요청별 Future에 결과를 나눠 줍니다."""
+        all_texts: List[str] = [text for texts, _ in batch for text in texts]
+        # 길이순 정렬: 비슷한 길이끼리 묶여 패딩 낭비가 줄어듦
+        order: np.ndarray = np.argsort([len(t) for t in all_texts], kind='stable')
+        try:
+            started: float = time.perf_counter()
+            telemetry.record_embedding_batch('encoder_batch', len(all_texts))
+            with telemetry.span('encode.model_batch', requests=len(batch), texts=len(all_texts)):
+                sorted_vecs: np.ndarray = np.asarray(
+                    self.sbert_model.encode([all_texts[i] for i in order], batch_size=self.model_batch_size, convert_to_numpy=True),
+                    dtype=np.float32
+                )
+            vectors: np.ndarray = np.empty_like(sorted_vecs)
+            vectors[order] = sorted_vecs
+            logging.debug("배칭 인코딩 완료: 요청 %d개, 텍스트 %d개, %.3fs", len(batch), len(all_texts), time.perf_counter() - started)
+        except Exception as e:
+            logging.error(f"배칭 인코딩 중 오류 발생 (요청 {len(batch)}개)", exc_info=True)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset: int = 0
+        for texts, future in batch:
+            future.set_result(vectors[offset:offset + len(texts)])
+            offset += len(texts)
+
+    def _run(self) -> None:
+        """워커 루프: 요청을 모아 인코딩을 반복합니다. None을 받으면 종료합니다."""
+        while True:
+            first: Optional[EncodeRequestType] = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect_batch(first)
+            self._encode_batch(batch)
+            if stop:
+                break
+        logging.info("SBERT 배칭 인코더 종료.")
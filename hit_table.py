@@ -0,0 +1,84 @@
+# hit_table.py
+
+"""
+검색 결과(hit)를 열(column) 단위로 보관하는 표입니다.
+유사도 점수와 출처 코드는 NumPy 배열, 텍스트/링크는 인덱스로 참조하는 목록으로 두고
+임계값 마스크, argpartition 기반 top-k, LLM 상태를 포함한 순위 계산을 벡터 연산으로 처리합니다.
+딕셔너리는 최종적으로 선택된 행에 대해서만 만듭니다.
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# 출처 이름 <-> 코드 (알 수 없는 출처는 마지막 코드)
+SOURCE_NAMES: Tuple[str, ...] = ('Google Search', 'KIPRIS Patent', 'Unknown')
+SOURCE_CODES: Dict[str, int] = {name: code for code, name in enumerate(SOURCE_NAMES)}
+
+
+# 코사인 유사도 계산 함수
+def cosine_scores(query_vec: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """질의 벡터와 (n, dim) 행렬의 각 행 사이 코사인 유사도 (n,) float32 배열을 계산합니다."""
+    query: np.ndarray = np.asarray(query_vec, dtype=np.float32)
+    rows: np.ndarray = np.asarray(matrix, dtype=np.float32)
+    norms: np.ndarray = np.linalg.norm(rows, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+    return (rows @ query) / np.maximum(norms, 1e-12)
+
+
+# LLM 우선 순위 정렬 함수
+def llm_first_order(scores: np.ndarray, llm_yes: np.ndarray) -> np.ndarray:
+    """(LLM 'Yes' 우선, 다음 유사도 내림차순) 정렬 순서를 반환합니다. 같은 키끼리는 입력 순서 유지"""
+    return np.lexsort((-np.asarray(scores, dtype=np.float32), ~np.asarray(llm_yes, dtype=bool))) # 마지막 키가 1순위
+
+
+class HitTable:
+    """열 단위 hit 표: scores(float32), source_codes(int8), cluster_sizes(int32, 묶인 유사 중복 수), texts/links(행 인덱스로 참조)"""
+
+    __slots__ = ('texts', 'links', 'source_codes', 'scores', 'cluster_sizes')
+
+    def __init__(self, texts: List[str], links: List[str], source_codes: np.ndarray, scores: np.ndarray, cluster_sizes: Optional[np.ndarray] = None):
+        self.texts: List[str] = texts
+        self.links: List[str] = links
+        self.source_codes: np.ndarray = source_codes
+        self.scores: np.ndarray = scores
+        self.cluster_sizes: np.ndarray = cluster_sizes if cluster_sizes is not None else np.ones(len(texts), dtype=np.int32)
+
+    @classmethod
+    def from_items(cls, items: List[Dict[str, Any]], scores: np.ndarray) -> "HitTable":
+        """검색 결과 딕셔너리 목록과 같은 순서의 점수 배열로 표를 만듭니다."""
+        unknown: int = SOURCE_CODES['Unknown']
+        return cls(
+            texts=[item.get('text', '') for item in items],
+            links=[item.get('link', '') for item in items],
+            source_codes=np.fromiter((SOURCE_CODES.get(item.get('source', ''), unknown) for item in items), dtype=np.int8, count=len(items)),
+            scores=np.asarray(scores, dtype=np.float32),
+            cluster_sizes=np.fromiter((item.get('cluster_size', 1) for item in items), dtype=np.int32, count=len(items))
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def mask_at_least(self, threshold: float) -> np.ndarray:
+        """점수가 threshold 이상인 행의 불리언 마스크"""
+        return self.scores >= threshold
+
+    def top_k(self, k: Optional[int] = None, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """(mask 안에서) 점수 상위 k개 행 인덱스를 점수 내림차순으로 반환합니다. k가 None이면 전체."""
+        candidates: np.ndarray = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+        if k is None or k >= len(candidates):
+            selected: np.ndarray = candidates
+        elif k <= 0:
+            return np.empty(0, dtype=np.int64)
+        else:
+            selected = candidates[np.argpartition(-self.scores[candidates], k - 1)[:k]]
+        return selected[np.argsort(-self.scores[selected], kind='stable')]
+
+    def to_item(self, row: int) -> Dict[str, Any]:
+        """행 하나를 기존 결과 딕셔너리 형식('text', 'score', 'link', 'source', 'cluster_size')으로 만듭니다."""
+        return {
+            'text': self.texts[row], 'score': float(self.scores[row]),
+            'link': self.links[row], 'source': SOURCE_NAMES[self.source_codes[row]],
+            'cluster_size': int(self.cluster_sizes[row])
+        }
+
+    def to_items(self, indices: np.ndarray) -> List[Dict[str, Any]]:
+        return [self.to_item(int(row)) for row in indices]
@@ -0,0 +1,214 @@
+# http_client.py
+
+"""
+외부 검색 API(Google Custom Search, KIPRIS) 호출에 쓰는 asyncio 기반 공용 HTTP 계층입니다.
+프로세스당 하나의 백그라운드 이벤트 루프와 keep-alive 연결 풀(aiohttp)을 공유하며,
+기존 동기 호출부를 위해 requests와 비슷한 동기 래퍼(get)를 제공합니다.
+"""
+
+import config
+import aiohttp
+import asyncio
+import atexit
+import inspect
+import json
+import logging
+import threading
+import requests
+from urllib.parse import urlsplit
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple, TypeVar
+
+T = TypeVar('T')
+
+STREAM_CHUNK_SIZE: int = 16 * 1024 # fetch_stream이 소비자에게 넘기는 본문 조각 크기 (바이트)
+
+
+class FetchResponse:
+    """requests.Response와 호환되는 최소 응답 객체 (status_code, content, text, json(), raise_for_status())"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], encoding: Optional[str]):
+        self.url: str = url
+        self.status_code: int = status_code
+        self.content: bytes = content
+        self.headers: Dict[str, str] = headers
+        self.encoding: str = encoding or 'utf-8'
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """4xx/5xx 응답이면 requests.exceptions.HTTPError를 발생시킵니다."""
+        if 400 <= self.status_code < 600:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=None)
+
+
+# --- 재시도 정책 (기존 request_kipris의 tenacity 설정과 동일) ---
+# 최대 3번 시도, 2초/4초 간격 (최대 10초), Timeout 또는 ConnectionError 발생 시에만 재시도
+RETRY_EXCEPTION_TYPES: Tuple[type, ...] = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+tenacity_logger = logging.getLogger(__name__)
+
+def _retrying() -> AsyncRetrying:
+    return AsyncRetrying(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(RETRY_EXCEPTION_TYPES),
+        before_sleep=before_sleep_log(tenacity_logger, logging.INFO),
+        reraise=True # 재시도 소진 시 마지막 예외(Timeout/ConnectionError)를 그대로 전달
+    )
+
+
+# --- 백그라운드 이벤트 루프 및 세션 (지연 생성) ---
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_session: Optional[aiohttp.ClientSession] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """공용 이벤트 루프를 반환합니다. 처음 호출될 때 데몬 스레드에서 루프를 시작합니다."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="http-client-loop", daemon=True).start()
+            _loop = loop
+            logging.info("HTTP 클라이언트 이벤트 루프 시작.")
+        return _loop
+
+def _get_session() -> aiohttp.ClientSession:
+    """[루프 스레드 전용] keep-alive 연결 풀을 가진 공용 ClientSession을 반환합니다."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config.HTTP_POOL_SIZE,
+            limit_per_host=config.HTTP_PER_HOST_CONCURRENCY,
+            keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT_S
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+        logging.info(f"HTTP 세션 생성 (pool={config.HTTP_POOL_SIZE}, per_host={config.HTTP_PER_HOST_CONCURRENCY})")
+    return _session
+
+def _get_host_semaphore(url: str) -> asyncio.Semaphore:
+    """[루프 스레드 전용] 호스트별 동시 요청 수를 제한하는 세마포어를 반환합니다."""
+    host: str = urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(config.HTTP_PER_HOST_CONCURRENCY)
+    return _host_semaphores[host]
+
+
+# --- 비동기 요청 함수 ---
+async def _fetch_once(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]], timeout: float) -> FetchResponse:
+    """GET 요청 1회. aiohttp 예외는 기존 호출부가 처리하던 requests 예외로 변환합니다."""
+    session: aiohttp.ClientSession = _get_session()
+    try:
+        async with _get_host_semaphore(url):
+            async with session.get(url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                body: bytes = await resp.read()
+                return FetchResponse(str(resp.url), resp.status, body, dict(resp.headers), resp.charset)
+    except asyncio.TimeoutError as e:
+        raise requests.exceptions.Timeout(f"요청 시간 초과 (timeout={timeout}s): {url}") from e
+    except aiohttp.ClientConnectionError as e:
+        raise requests.exceptions.ConnectionError(f"연결 오류: {e}") from e
+    except aiohttp.ClientError as e:
+        raise requests.exceptions.RequestException(f"요청 오류: {e}") from e
+
+async def fetch(url: str,
+                params: Optional[Dict[str, Any]] = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: float = 30,
+                retry: bool = False) -> FetchResponse:
+    """비동기 GET 요청. retry=True면 Timeout/ConnectionError에 대해 재시도 정책을 적용합니다."""
+    if not retry:
+        return await _fetch_once(url, params, headers, timeout)
+    async for attempt in _retrying():
+        with attempt:
+            return await _fetch_once(url, params, headers, timeout)
+    raise RuntimeError("재시도 루프가 결과 없이 종료되었습니다.") # reraise=True이므로 도달하지 않음
+
+
+# --- 스트리밍 요청 함수 ---
+class StreamConsumer(Protocol):
+    """
+    fetch_stream이 응답 본문 조각을 넘기는 소비자 (예: kipris_client.KiprisPageConsumer)
+    feed는 루프 스레드에서 호출되므로 가벼워야 하며, 무거운 마무리 작업은 close()가 awaitable을 반환해 루프 밖에서 처리할 수 있습니다.
+    """
+    def feed(self, chunk: bytes) -> None: ...
+    def close(self) -> Any: ...
+
+async def _fetch_stream_once(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]], timeout: float,
+                             consumer_factory: Callable[[], StreamConsumer]) -> Tuple[FetchResponse, Any]:
+    """GET 요청 1회. 성공(2xx) 응답 본문은 받는 대로 소비자에게 넘기고, 오류 응답 본문만 content로 읽습니다."""
+    session: aiohttp.ClientSession = _get_session()
+    try:
+        async with _get_host_semaphore(url):
+            async with session.get(url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                if resp.status >= 300:
+                    body: bytes = await resp.read()
+                    return FetchResponse(str(resp.url), resp.status, body, dict(resp.headers), resp.charset), None
+                consumer: StreamConsumer = consumer_factory() # 재시도마다 새 소비자
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    consumer.feed(chunk)
+                result: Any = consumer.close()
+                if inspect.isawaitable(result):
+                    result = await result
+                return FetchResponse(str(resp.url), resp.status, b'', dict(resp.headers), resp.charset), result
+    except asyncio.TimeoutError as e:
+        raise requests.exceptions.Timeout(f"요청 시간 초과 (timeout={timeout}s): {url}") from e
+    except aiohttp.ClientConnectionError as e:
+        raise requests.exceptions.ConnectionError(f"연결 오류: {e}") from e
+    except aiohttp.ClientError as e:
+        raise requests.exceptions.RequestException(f"요청 오류: {e}") from e
+
+async def fetch_stream(url: str,
+                       consumer_factory: Callable[[], StreamConsumer],
+                       params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       timeout: float = 30,
+                       retry: bool = False) -> Tuple[FetchResponse, Any]:
+    """
+    비동기 스트리밍 GET 요청. 응답 본문 전체를 메모리에 모으지 않고 조각 단위로 소비자(feed/close)에 넘깁니다.
+    (응답 객체, consumer.close() 결과)를 반환하며, 오류 응답이면 결과는 None이고 응답 객체의 content에 본문이 담깁니다.
+    """
+    if not retry:
+        return await _fetch_stream_once(url, params, headers, timeout, consumer_factory)
+    async for attempt in _retrying():
+        with attempt:
+            return await _fetch_stream_once(url, params, headers, timeout, consumer_factory)
+    raise RuntimeError("재시도 루프가 결과 없이 종료되었습니다.") # reraise=True이므로 도달하지 않음
+
+
+# --- 동기 래퍼 ---
+def run_sync(coro: Awaitable[T]) -> T:
+    """코루틴을 공용 루프에서 실행하고 결과를 기다립니다. (루프 스레드 밖에서만 호출)"""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+def get(url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+        retry: bool = False) -> FetchResponse:
+    """[동기 래퍼] requests.get 대신 사용하는 GET 요청 함수"""
+    return run_sync(fetch(url, params=params, headers=headers, timeout=timeout, retry=retry))
+
+def run_blocking_concurrently(calls: List[Tuple[Callable[..., Any], Tuple[Any, ...]]]) -> List[Any]:
+    """
+    (함수, 인자) 목록을 공용 루프의 기본 스레드 풀에서 동시에 실행하고 결과를 순서대로 반환합니다.
+    요청마다 ThreadPoolExecutor를 새로 만들지 않기 위해 사용합니다. 예외는 그대로 전달됩니다.
+    """
+    async def _gather() -> List[Any]:
+        return list(await asyncio.gather(*(asyncio.to_thread(func, *args) for func, args in calls)))
+    return run_sync(_gather())
+
+
+# --- 종료 처리 ---
+@atexit.register
+def _close_session() -> None:
+    if _loop is not None and _session is not None and not _session.closed:
+        try:
+            asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(timeout=5)
+        except Exception:
+            pass
@@ -0,0 +1,169 @@
+# idea_index.py
+
+"""
+과거에 분석한 아이디어 임베딩의 근사 최근접 이웃(ANN) 인덱스입니다.
+새 아이디어가 과거 아이디어와 충분히 비슷하면(코사인 유사도 기준) 그 분석의 검색 후보 풀과 LLM 판정을 재사용합니다.
+ANN 구조는 NumPy 랜덤 초평면 LSH(여러 테이블) + 정확한 코사인 재정렬로 구현합니다.
+"""
+
+import config
+import diskcache
+import logging
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# --- 저장소 디렉토리 (MuseSONAR_public의 cache_dir 하위) ---
+IDEA_INDEX_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "idea_index")
+
+IdeaEntryType = Dict[str, Any] # idea_text, embedding(bytes), candidates, llm_verdicts, created_at
+IdeaMatchType = Tuple[float, IdeaEntryType] # (코사인 유사도, 저장된 항목)
+
+
+class RandomHyperplaneLSH:
+    """코사인 유사도용 랜덤 초평면 LSH. 테이블마다 bits개의 부호 비트를 정수 버킷 코드로 묶습니다."""
+
+    def __init__(self, dim: int, num_tables: int, num_bits: int, seed: int = 42):
+        rng = np.random.default_rng(seed) # 프로세스 간 동일한 초평면을 쓰도록 고정 시드
+        self.planes: np.ndarray = rng.standard_normal((num_tables, dim, num_bits)).astype(np.float32)
+        self.bit_weights: np.ndarray = (1 << np.arange(num_bits)).astype(np.int64)
+        self.buckets: List[Dict[int, List[int]]] = [{} for _ in range(num_tables)]
+
+    def codes(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, dim) 벡터의 테이블별 버킷 코드 (n, num_tables)를 계산합니다."""
+        signs: np.ndarray = np.einsum('nd,tdb->ntb', vectors, self.planes) > 0
+        return (signs * self.bit_weights).sum(axis=2)
+
+    def add(self, row_ids: List[int], vectors: np.ndarray) -> None:
+        for row_id, row_codes in zip(row_ids, self.codes(vectors)):
+            for table, code in enumerate(row_codes):
+                self.buckets[table].setdefault(int(code), []).append(row_id)
+
+    def candidates(self, vector: np.ndarray) -> List[int]:
+        """질의 벡터와 하나 이상의 테이블에서 같은 버킷에 속한 행 번호 목록"""
+        found: set[int] = set()
+        for table, code in enumerate(self.codes(vector[None, :])[0]):
+            found.update(self.buckets[table].get(int(code), ()))
+        return sorted(found)
+
+
+class IdeaIndex:
+    """diskcache에 항목을 저장하고, 메모리에는 정규화된 임베딩 행렬과 LSH 버킷을 유지하는 아이디어 인덱스"""
+
+    def __init__(self, directory: str = IDEA_INDEX_DIR):
+        self.store: diskcache.Cache = diskcache.Cache(directory)
+        self._lock = threading.Lock()
+        self._entry_ids: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lsh: Optional[RandomHyperplaneLSH] = None
+        self._loaded_count: int = -1
+        self._rebuilding: bool = False
+        if hasattr(os, 'register_at_fork'): # fork 시점에 재구성 스레드가 돌고 있었다면 자식 프로세스에서 상태 초기화
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+        logging.info(f"아이디어 인덱스 저장소 초기화 완료. 디렉토리: {directory}")
+        self.schedule_rebuild() # 시작 시 백그라운드에서 메모리 인덱스 구성
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms: np.ndarray = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def schedule_rebuild(self) -> Optional[threading.Thread]:
+        """메모리 인덱스 재구성을 백그라운드 스레드로 시작하고 그 스레드를 반환합니다. (이미 진행 중이면 None)"""
+        with self._lock:
+            if self._rebuilding:
+                return None
+            self._rebuilding = True
+        worker = threading.Thread(target=self._rebuild, name="idea-index-rebuild", daemon=True)
+        worker.start()
+        return worker
+
+    def _rebuild(self) -> None:
+        """
+        [백그라운드 스레드] 저장소의 전체 항목으로 새 메모리 인덱스를 만든 뒤 잠금 안에서 한 번에 교체합니다.
+        (다른 워커가 추가한 항목, 만료/제거된 항목 반영. 재구성 중 조회는 기존 인덱스를 사용)
+        """
+        try:
+            started: float = time.perf_counter()
+            store_count: int = len(self.store) # 재구성 중 추가된 항목은 다음 조회에서 개수 차이로 다시 반영
+            entry_ids: List[str] = []
+            vectors: List[np.ndarray] = []
+            for entry_id in self.store.iterkeys():
+                entry: Optional[IdeaEntryType] = self.store.get(entry_id, default=None)
+                if entry is None:
+                    continue # 만료된 항목
+                entry_ids.append(entry_id)
+                vectors.append(np.frombuffer(entry['embedding'], dtype=np.float32))
+            matrix: Optional[np.ndarray] = self._normalize(np.vstack(vectors)) if vectors else None
+            lsh: Optional[RandomHyperplaneLSH] = None
+            if matrix is not None:
+                lsh = RandomHyperplaneLSH(matrix.shape[1], config.IDEA_INDEX_LSH_TABLES, config.IDEA_INDEX_LSH_BITS)
+                lsh.add(list(range(len(entry_ids))), matrix)
+            with self._lock:
+                self._entry_ids, self._matrix, self._lsh, self._loaded_count = entry_ids, matrix, lsh, store_count
+            logging.info(f"아이디어 인덱스 재구성 완료: 항목 {len(entry_ids)}개 ({time.perf_counter() - started:.2f}s)")
+        except Exception as e:
+            logging.error(f"아이디어 인덱스 재구성 실패. 기존 인덱스로 조회합니다. 오류: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def find_similar(self, embedding: np.ndarray, threshold: float = config.IDEA_REUSE_SIMILARITY_THRESHOLD) -> Optional[IdeaMatchType]:
+        """
+        threshold 이상으로 가장 비슷한 과거 아이디어 항목을 (유사도, 항목)으로 반환합니다. 없으면 None.
+        저장소 항목 수가 메모리 인덱스와 다르면 백그라운드 재구성만 시작하고, 이번 조회는 현재 인덱스로 처리합니다.
+        """
+        if self._loaded_count != len(self.store):
+            self.schedule_rebuild()
+        with self._lock:
+            if self._matrix is None or self._lsh is None:
+                return None
+            query: np.ndarray = self._normalize(np.asarray(embedding, dtype=np.float32))
+            rows: List[int] = self._lsh.candidates(query)
+            if not rows:
+                return None
+            sims: np.ndarray = self._matrix[rows] @ query
+            best: int = int(np.argmax(sims))
+            best_sim: float = float(sims[best])
+            entry_id: str = self._entry_ids[rows[best]]
+        logging.debug(f"아이디어 인덱스 조회: LSH 후보 {len(rows)}개, 최고 유사도 {best_sim:.4f}")
+        if best_sim < threshold:
+            return None
+        entry: Optional[IdeaEntryType] = self.store.get(entry_id, default=None)
+        return (best_sim, entry) if entry is not None else None
+
+    def add(self, idea_text: str, embedding: np.ndarray, candidates: List[Dict[str, Any]], llm_verdicts: Dict[str, Tuple[str, str]]) -> None:
+        """분석이 끝난 아이디어의 임베딩, 검색 후보 풀, LLM 판정을 저장합니다."""
+        vector: np.ndarray = np.asarray(embedding, dtype=np.float32)
+        entry: IdeaEntryType = {
+            'idea_text': idea_text, 'embedding': vector.tobytes(),
+            'candidates': candidates, 'llm_verdicts': dict(llm_verdicts), 'created_at': time.time()
+        }
+        entry_id: str = uuid.uuid4().hex
+        self.store.set(entry_id, entry, expire=config.IDEA_INDEX_TTL_S)
+        with self._lock:
+            if self._matrix is not None and self._lsh is not None and self._loaded_count == len(self.store) - 1:
+                # 메모리 인덱스에 바로 추가 (재구성 없이)
+                normalized: np.ndarray = self._normalize(vector)[None, :]
+                self._lsh.add([len(self._entry_ids)], normalized)
+                self._matrix = np.vstack([self._matrix, normalized])
+                self._entry_ids.append(entry_id)
+                self._loaded_count += 1
+        logging.info(f"아이디어 인덱스에 항목 추가: '{idea_text[:50]}...' (후보 {len(candidates)}개, LLM 판정 {len(llm_verdicts)}개)")
+
+
+# --- 모듈 단위 인덱스 인스턴스 ---
+idea_index: Optional[IdeaIndex] = None
+if config.IDEA_INDEX_ENABLED:
+    try:
+        idea_index = IdeaIndex()
+    except Exception as e:
+        logging.error(f"아이디어 인덱스 초기화 실패! 유사 아이디어 재사용 비활성화. 오류: {e}")
+        idea_index = None
@@ -0,0 +1,147 @@
+# job_queue.py
+
+"""
+분석 요청을 작업(job)으로 큐에 넣고 로컬 워커 프로세스 풀에서 analyze_idea를 실행하는 모듈입니다.
+각 워커 프로세스는 시작 시 SBERT/Gemini 모델을 한 번만 로딩하며,
+작업 상태와 직렬화된 AnalysisResultModel은 diskcache 저장소에 보관되어 job id로 조회합니다.
+"""
+
+import config
+import diskcache
+import logging
+import multiprocessing
+import os
+import telemetry
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pydantic_models import AnalysisResultModel
+from typing import Any, Dict, Optional
+
+# 작업 상태 값
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_DONE = "done"
+JOB_STATUS_ERROR = "error"
+
+JobRecordType = Dict[str, Any] # status, idea_text, created_at, started_at, finished_at, result(JSON 문자열), error
+
+
+class JobSubmissionError(RuntimeError):
+    """워커 프로세스 풀을 다시 만들어도 작업을 제출하지 못했을 때 발생합니다. (작업 레코드는 오류 상태로 기록됨)"""
+
+    def __init__(self, job_id: str, message: str):
+        super().__init__(message)
+        self.job_id: str = job_id
+
+# --- 작업 저장소 (프로세스 간 공유되는 diskcache) ---
+JOB_STORE_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "jobs")
+job_store: diskcache.Cache = diskcache.Cache(JOB_STORE_DIR)
+
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    """작업 레코드의 일부 필드를 갱신합니다. (트랜잭션으로 읽기-수정-쓰기)"""
+    with job_store.transact():
+        record: JobRecordType = job_store.get(job_id, default={}) or {}
+        record.update(fields)
+        job_store.set(job_id, record, expire=config.JOB_RESULT_TTL_S)
+
+
+# =============== 워커 프로세스 측 ===============
+
+def _init_worker() -> None:
+    """워커 프로세스 시작 시 SBERT 및 Gemini 모델을 미리 로딩합니다. (자원 레지스트리 warm-up, 프로세스당 1회)"""
+    from resources import registry
+    logging.info(f"분석 워커 프로세스 초기화 시작 (pid={os.getpid()})")
+    registry.warm_up(('sbert', 'gemini'))
+
+def _run_job(job_id: str, idea_text: str) -> None:
+    """[워커 프로세스] 작업 하나를 실행하고 결과를 저장소에 기록합니다."""
+    from MuseSONAR_public import analyze_idea_cached as analyze_idea
+    from resources import registry
+    _update_job(job_id, status=JOB_STATUS_RUNNING, started_at=time.time(), worker_pid=os.getpid())
+    logging.info(f"분석 작업 실행 시작: job_id={job_id}")
+    sbert_model: Any = registry.get('sbert')
+    if sbert_model is None:
+        result = AnalysisResultModel(error="워커 프로세스의 SBERT 모델 로딩에 실패하여 분석을 수행할 수 없습니다. 서버 로그를 확인해주세요.")
+    else:
+        result = analyze_idea(idea_text, sbert_model, registry.get('gemini'))
+    _update_job(job_id, status=JOB_STATUS_DONE, finished_at=time.time(), result=result.model_dump_json())
+    logging.info(f"분석 작업 완료: job_id={job_id}, Rating={result.rating}, Error='{result.error}'")
+    telemetry.publish() # 웹 프로세스 /metrics에서 합산하도록 워커 지표 스냅샷 기록
+
+
+# =============== 웹 프로세스 측 ===============
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _create_executor() -> ProcessPoolExecutor:
+    """워커 프로세스 풀을 만듭니다. (JVM/torch 상태 공유를 피하기 위해 spawn 사용)"""
+    return ProcessPoolExecutor(
+        max_workers=config.JOB_WORKER_PROCESSES,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
+
+def _get_executor() -> ProcessPoolExecutor:
+    """워커 프로세스 풀을 반환합니다. 첫 작업 제출 시(또는 이전 풀이 깨진 뒤) 생성합니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _create_executor()
+            logging.info(f"분석 워커 프로세스 풀 생성 (workers={config.JOB_WORKER_PROCESSES})")
+        return _executor
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    """
+    워커 프로세스가 비정상 종료(OOM, torch/JVM 세그폴트 등)하여 깨진 풀을 버립니다. 다음 _get_executor 호출에서 새로 생성
+    (깨진 풀에 남아 있던 작업은 BrokenProcessPool로 끝나 _on_job_finished가 오류로 기록)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _on_job_finished(job_id: str, future: Future) -> None:
+    """워커 내부에서 처리되지 못한 예외(프로세스 비정상 종료 등)를 작업 오류로 기록합니다."""
+    error: Optional[BaseException] = future.exception()
+    if error is not None:
+        logging.error(f"분석 작업 실패: job_id={job_id}, 오류: {error}")
+        _update_job(job_id, status=JOB_STATUS_ERROR, finished_at=time.time(), error=str(error))
+
+def submit_job(idea_text: str) -> str:
+    """분석 작업을 큐에 넣고 job id를 즉시 반환합니다."""
+    job_id: str = uuid.uuid4().hex
+    _update_job(job_id, status=JOB_STATUS_QUEUED, idea_text=idea_text, created_at=time.time())
+    future: Optional[Future] = None
+    for attempt in range(2): # 풀이 깨져 있으면 새 풀로 한 번 더 시도
+        executor: ProcessPoolExecutor = _get_executor()
+        try:
+            future = executor.submit(_run_job, job_id, idea_text)
+            break
+        except BrokenProcessPool as e:
+            logging.warning(f"워커 프로세스 풀이 깨져 있어 새로 생성합니다 (시도 {attempt + 1}/2): {e}")
+            _discard_executor(executor)
+    if future is None:
+        error: str = "분석 워커 프로세스 풀에 작업을 제출하지 못했습니다."
+        logging.error(f"{error} job_id={job_id}")
+        _update_job(job_id, status=JOB_STATUS_ERROR, finished_at=time.time(), error=error)
+        raise JobSubmissionError(job_id, error)
+    future.add_done_callback(lambda f: _on_job_finished(job_id, f))
+    logging.info(f"분석 작업 등록: job_id={job_id}, idea='{idea_text[:50]}...'")
+    return job_id
+
+def get_job(job_id: str) -> Optional[JobRecordType]:
+    """작업 레코드를 반환합니다. 없거나 만료되었으면 None."""
+    return job_store.get(job_id, default=None)
+
+def get_job_result(job_id: str) -> Optional[AnalysisResultModel]:
+    """완료된 작업의 AnalysisResultModel을 반환합니다. 아직 완료되지 않았으면 None."""
+    record: Optional[JobRecordType] = get_job(job_id)
+    if not record or record.get('status') != JOB_STATUS_DONE or not record.get('result'):
+        return None
+    return AnalysisResultModel.model_validate_json(record['result'])
@@ -0,0 +1,109 @@
+# keyword_extractors.py
+
+"""
+키워드(명사) 추출 백엔드 모음입니다.
+extract_keywords는 config.KEYWORD_EXTRACTOR_BACKEND로 선택한 백엔드의 명사 목록을 사용합니다.
+- 'okt': KoNLPy Okt 형태소 분석 (JVM, 정확하지만 느리고 fork 기반 워커에서 다루기 어려움)
+- 'regex': 한글 어절에서 조사/어미를 사전 기반으로 떼어내는 프로세스 내 명사 추출 (JVM 불필요)
+"""
+
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from resources import registry as resources
+from typing import Dict, List, Optional, Tuple
+
+
+class KeywordExtractor(ABC):
+    """키워드 추출 백엔드 인터페이스 (extract_nouns를 구현하지 않은 백엔드는 생성 시점에 TypeError)"""
+    name: str = "base"
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def extract_nouns(self, text: str) -> List[str]:
+        """텍스트에 나온 순서대로 명사 후보 목록을 반환합니다. (중복/길이 필터링은 호출 측에서 수행)"""
+
+
+class OktExtractor(KeywordExtractor):
+    """KoNLPy Okt 품사 태깅 기반 명사 추출 (기존 extract_keywords 방식)"""
+    name = "okt"
+
+    def available(self) -> bool:
+        return resources.get('okt') is not None
+
+    def extract_nouns(self, text: str) -> List[str]:
+        pos_tagged: List[Tuple[str, str]] = resources.get('okt').pos(text, norm=True, stem=True)
+        return [n for n, t in pos_tagged if t == 'Noun']
+
+
+class RegexNounExtractor(KeywordExtractor):
+    """
+    한글 어절 끝의 조사/어미를 사전(접미사 목록)으로 떼어내고 기능어를 제외하여 명사 후보를 얻습니다.
+    접미사는 긴 것부터 비교하며, 떼어낸 뒤 2글자 이상 남는 경우에만 적용합니다.
+    """
+    name = "regex"
+
+    # 조사 및 자주 쓰이는 용언 어미 (긴 것 우선)
+    SUFFIXES: Tuple[str, ...] = tuple(sorted((
+        '으로부터', '에서부터', '으로써', '으로서', '에게서', '이라는', '이라고', '합니다', '됩니다', '하도록', '되도록',
+        '에서', '에게', '한테', '으로', '까지', '부터', '처럼', '보다', '이나', '이며', '이고', '이다', '라는', '라고',
+        '하는', '하고', '하여', '해서', '하게', '하기', '하면', '한다', '된다', '되는', '되어', '되고', '시키는', '시켜',
+        '들을', '들이', '들은', '들의', '들',
+        '을', '를', '이', '가', '은', '는', '의', '에', '로', '와', '과', '도', '만', '며', '고', '한', '할', '된', '될', '적',
+    ), key=len, reverse=True))
+    # 명사로 보기 어려운 기능어/형식어
+    STOPWORDS: frozenset = frozenset((
+        '위한', '위해', '통한', '통해', '대한', '대해', '관한', '관련', '있는', '없는', '같은', '이런', '저런', '그런',
+        '모든', '각각', '정도', '경우', '때문', '이것', '저것', '그것', '여기', '거기', '우리', '누구', '무엇', '어떤',
+        '가능', '다양', '가지', '기존', '새로운', '이용', '사용', '활용',
+    ))
+    # 조사처럼 보이는 글자로 끝나는 명사 사전 (어절이 '명사' 또는 '명사 + 접미사'일 때만 사용: '고양이의' -> '고양이', '아이디어'는 해당 없음)
+    KNOWN_NOUNS: Tuple[str, ...] = tuple(sorted((
+        '고양이', '어린이', '아이', '놀이', '노인', '쓰레기', '세탁기', '냉장고', '청소기', '자동차', '오토바이', '킥보드',
+        '스마트폰', '애플리케이션', '어플리케이션', '어플', '플랫폼', '서비스', '시스템', '데이터', '센서', '드론', '로봇',
+        '배터리', '카메라', '디스플레이', '모니터링', '효과', '온도', '습도', '속도', '경로', '광고', '평가', '회의', '비만',
+        '택시', '피아노', '라디오', '메타버스', '블록체인', '인공지능', '사료',
+    ), key=len, reverse=True))
+    TOKEN_PATTERN = re.compile(r'[가-힣]+')
+
+    def _strip_suffix(self, token: str) -> str:
+        for noun in self.KNOWN_NOUNS:
+            if token.startswith(noun) and (len(token) == len(noun) or token[len(noun):] in self.SUFFIXES):
+                return noun
+        for _ in range(2): # '분석하는데' 같은 겹친 어미 대비 두 번까지
+            for suffix in self.SUFFIXES:
+                if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+                    token = token[:-len(suffix)]
+                    break
+            else:
+                break
+        return token
+
+    def extract_nouns(self, text: str) -> List[str]:
+        nouns: List[str] = []
+        for token in self.TOKEN_PATTERN.findall(text):
+            stem: str = self._strip_suffix(token)
+            if stem not in self.STOPWORDS:
+                nouns.append(stem)
+        return nouns
+
+
+# --- 백엔드 등록 ---
+EXTRACTORS: Dict[str, KeywordExtractor] = {extractor.name: extractor for extractor in (OktExtractor(), RegexNounExtractor())}
+FALLBACK_EXTRACTOR: str = RegexNounExtractor.name
+
+
+# 백엔드 선택 함수
+def get_extractor(name: str) -> KeywordExtractor:
+    """이름으로 백엔드를 찾습니다. 없거나 사용할 수 없으면(예: konlpy 미설치) 프로세스 내 regex 백엔드를 반환합니다."""
+    extractor: Optional[KeywordExtractor] = EXTRACTORS.get(name)
+    if extractor is None or not extractor.available():
+        return EXTRACTORS[FALLBACK_EXTRACTOR]
+    return extractor
+
+# 메모 키용 텍스트 정규화 함수
+def normalize_keyword_text(text: str) -> str:
+    """유니코드(NFKC)와 공백 차이만 정규화합니다. (영문 대소문자는 키워드에 그대로 쓰이므로 유지)"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip()
@@ -0,0 +1,176 @@
+# kipris_client.py
+
+"""
+KIPRIS 응답의 스트리밍 파싱과 페이지 단위 캐시입니다.
+- 응답 본문으로 문서 전체 트리를 만들지 않고, 조각을 lxml 증분 파서(XMLPullParser)에 차례로 넣어
+  <item>이 끝날 때마다 parse_kipris_items에 필요한 필드(출원번호, 발명의 명칭, 초록)만 뽑고 요소를 버립니다.
+- 공용 이벤트 루프 스레드에서는 응답 조각을 모으기만 하고, XML 파싱과 페이지 캐시 조회/저장(디스크 I/O)은
+  이 모듈 전용 스레드 풀에서 처리합니다. (기본 executor는 run_blocking_concurrently의 동기 작업이 점유하고
+  그 작업이 루프의 코루틴 결과를 기다릴 수 있으므로, 루프 코루틴이 기본 executor를 기다리면 교착될 수 있음)
+- 파싱 결과는 (출원번호, 제목, 초록) 튜플 목록의 KiprisPage로 보관하며, 캐시에도 이 압축 레코드만 저장합니다.
+  (XML 문서/요소 트리는 저장하지 않음)
+- 내보낸 KIPRIS XML 파일(patent_corpus 수집)도 같은 방식(iterparse)으로 읽습니다.
+"""
+
+import config
+import asyncio
+from cache_keys import build_key
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+from resources import cache_tiers
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+
+# 압축 레코드 (applicationNumber, inventionTitle, astrtCont)
+KiprisRecordType = Tuple[str, str, str]
+RECORD_FIELDS: Tuple[str, ...] = ('applicationNumber', 'inventionTitle', 'astrtCont')
+
+# 응답 헤더/건수 태그 (item 외에 필요한 값)
+_META_TAGS: Tuple[str, ...] = ('resultCode', 'resultMsg', 'totalCount')
+
+# 추가 페이지 일부를 받지 못한 부분 결과의 성능 저하 사유 (rate_limiter.record_degradation)
+REASON_PARTIAL_PAGES = "partial_pages"
+
+# 페이지 캐시 키에서 제외할 파라미터 (API 키, 페이지 번호는 키에 따로 포함)
+_PAGE_KEY_EXCLUDED = frozenset(('ServiceKey', 'pageNo'))
+
+# 파싱/페이지 캐시 I/O 전용 스레드 풀 (프로세스 전체 공유, 루프 코루틴이 기다리는 작업만 실행하므로 교착 없음)
+kipris_io_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=config.KIPRIS_IO_MAX_WORKERS, thread_name_prefix="kipris-io"
+)
+
+
+class KiprisPage:
+    """KIPRIS 응답 한 페이지의 압축 표현 (결과 코드/메시지, 전체 건수, 레코드 튜플 목록)"""
+
+    __slots__ = ('result_code', 'result_msg', 'total_count', 'records')
+
+    def __init__(self, result_code: Optional[str], result_msg: Optional[str], total_count: Optional[int], records: List[KiprisRecordType]):
+        self.result_code: Optional[str] = result_code
+        self.result_msg: Optional[str] = result_msg
+        self.total_count: Optional[int] = total_count
+        self.records: List[KiprisRecordType] = records
+
+    @property
+    def ok(self) -> bool:
+        return self.result_code == '00'
+
+    def __getstate__(self) -> Tuple[Any, ...]: # diskcache(pickle) 저장용
+        return (self.result_code, self.result_msg, self.total_count, self.records)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        self.result_code, self.result_msg, self.total_count, self.records = state
+
+
+def _local_name(tag: Any) -> str:
+    return etree.QName(tag).localname if isinstance(tag, str) else ''
+
+def _record_from_item(item: Any) -> KiprisRecordType:
+    values: Dict[str, str] = {}
+    for child in item:
+        name: str = _local_name(child.tag)
+        if name in RECORD_FIELDS:
+            values[name] = (child.text or '').strip()
+    return tuple(values.get(field, '') for field in RECORD_FIELDS) # type: ignore[return-value]
+
+def _release(element: Any) -> None:
+    """처리가 끝난 요소와 앞선 형제 요소를 트리에서 떼어 메모리 사용량을 응답 크기와 무관하게 유지합니다."""
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+class KiprisPageParser:
+    """
+    KIPRIS XML 응답 증분 파서. feed(chunk)로 받은 조각을 바로 파싱하고 close()에서 KiprisPage를 반환합니다.
+    (http_client.fetch_stream의 consumer로 사용, 외부 엔티티/네트워크 접근 비활성화)
+    """
+
+    def __init__(self):
+        self._parser = etree.XMLPullParser(events=('end',), resolve_entities=False, no_network=True, huge_tree=False)
+        self._meta: Dict[str, str] = {}
+        self._records: List[KiprisRecordType] = []
+
+    def _drain(self) -> None:
+        for _, element in self._parser.read_events():
+            name: str = _local_name(element.tag)
+            if name == 'item':
+                self._records.append(_record_from_item(element))
+                _release(element)
+            elif name in _META_TAGS:
+                self._meta[name] = (element.text or '').strip()
+
+    def feed(self, chunk: bytes) -> None:
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> KiprisPage:
+        self._parser.close()
+        self._drain()
+        total: str = self._meta.get('totalCount', '')
+        return KiprisPage(self._meta.get('resultCode'), self._meta.get('resultMsg'), int(total) if total.isdigit() else None, self._records)
+
+
+def parse_page_chunks(chunks: List[bytes]) -> KiprisPage:
+    """받은 응답 조각을 순서대로 증분 파서에 넣어 KiprisPage를 만듭니다."""
+    parser = KiprisPageParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+class KiprisPageConsumer:
+    """
+    http_client.fetch_stream용 소비자. 루프 스레드의 feed(chunk)는 조각을 모으기만 하고,
+    close()가 반환하는 awaitable이 전용 스레드 풀에서 parse_page_chunks로 KiprisPage를 만듭니다.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> None:
+        self._chunks.append(chunk)
+
+    def close(self) -> Awaitable[KiprisPage]:
+        chunks, self._chunks = self._chunks, []
+        return asyncio.get_running_loop().run_in_executor(kipris_io_executor, parse_page_chunks, chunks)
+
+
+def iter_file_records(path: str) -> Iterator[KiprisRecordType]:
+    """내보낸 KIPRIS XML 파일의 <item>을 순서대로 압축 레코드로 반환합니다. (파일 전체를 트리로 만들지 않음)"""
+    for _, element in etree.iterparse(path, events=('end',), resolve_entities=False, no_network=True):
+        if _local_name(element.tag) == 'item':
+            yield _record_from_item(element)
+            _release(element)
+
+
+# =============== 페이지 캐시 ===============
+
+def page_cache_key(url: str, params: Dict[str, Any], page_no: int) -> str:
+    """엔드포인트 + API 키를 뺀 파라미터 + 페이지 번호로 페이지 캐시 키를 만듭니다."""
+    endpoint: str = url.rstrip('/').rsplit('/', 1)[-1]
+    public_params: Dict[str, str] = {k: str(v) for k, v in params.items() if k not in _PAGE_KEY_EXCLUDED}
+    return build_key('kipris_page', endpoint, public_params, page_no)
+
+async def load_cached_page(url: str, params: Dict[str, Any], page_no: int) -> Optional[KiprisPage]:
+    """캐시된 페이지를 반환합니다. (미스 시 None, 디스크 계층 I/O가 있을 수 있으므로 전용 스레드 풀에서)"""
+    return await asyncio.get_running_loop().run_in_executor(
+        kipris_io_executor, cache_tiers.get, 'kipris_page', page_cache_key(url, params, page_no)
+    )
+
+async def store_page(url: str, params: Dict[str, Any], page_no: int, page: KiprisPage) -> None:
+    """정상 응답(결과 코드 '00') 페이지만 캐시에 저장합니다. (보관 시간: 'kipris_page' 네임스페이스 TTL)"""
+    if page.ok:
+        await asyncio.get_running_loop().run_in_executor(
+            kipris_io_executor, cache_tiers.set, 'kipris_page', page_cache_key(url, params, page_no), page
+        )
+
+def pages_to_fetch(first_page: KiprisPage, rows_per_page: int, max_pages: int = config.KIPRIS_MAX_PAGES) -> List[int]:
+    """1페이지 결과로 추가로 가져올 페이지 번호 목록을 정합니다. (전체 건수가 없으면 1페이지가 가득 찬 경우에만 다음 페이지)"""
+    if max_pages <= 1 or rows_per_page <= 0 or len(first_page.records) < rows_per_page:
+        return []
+    if first_page.total_count is None:
+        return [2]
+    last_page: int = min(max_pages, -(-first_page.total_count // rows_per_page))
+    return list(range(2, last_page + 1))
@@ -0,0 +1,250 @@
+# layered_cache.py
+
+"""
+메모리 LRU/TTL 계층 + 디스크(diskcache) 계층으로 이루어진 2단 캐시입니다.
+- 조회: 메모리 -> 디스크 순. 디스크에서 찾은 값은 남은 만료 시간 안에서 메모리 계층에 올림
+  (자주 쓰는 키는 SQLite 조회/역직렬화 없이 메모리에서 반환)
+- 저장: 디스크(다른 워커 프로세스와 공유)와 메모리에 함께 저장
+- 네임스페이스(google_search, kipris_search, kipris_page, llm_verdict 등)별로 TTL과 메모리 계층을 따로 두고,
+  계층별 히트/미스 수와 조회 시간을 집계하여 telemetry 지표로 내보냅니다.
+  누적 히트/미스 수는 주기적으로 디스크 계층에도 합산하여 재시작/워커 프로세스와 무관한 히트율을 남깁니다. (아래 CLI로 조회)
+메모리 계층이 돌려주는 값은 여러 요청이 공유하므로 호출 측에서 수정하지 않아야 합니다.
+"""
+
+import config
+import argparse
+import atexit
+import json
+import logging
+import telemetry
+import threading
+import time
+from cache_keys import STATS_KEY_PREFIX, key_namespace
+from cachetools import TLRUCache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 조회 결과 없음 표시 (None도 정상 캐시 값일 수 있으므로 별도 객체 사용)
+MISSING: Any = object()
+
+# 메모리 계층 항목 = (값, 만료 시각(time.monotonic 기준))
+_MemoryEntryType = Tuple[Any, float]
+
+
+class NamespaceStats:
+    """네임스페이스 하나의 계층별 히트/미스 수와 조회 시간 누계"""
+
+    __slots__ = ('memory_hits', 'disk_hits', 'misses', 'sets', 'lookup_seconds')
+
+    def __init__(self):
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.sets: int = 0
+        self.lookup_seconds: Dict[str, float] = {'memory': 0.0, 'disk': 0.0, 'miss': 0.0}
+
+    def as_dict(self) -> Dict[str, Any]:
+        mean_lookup_ms: Dict[str, float] = {tier: seconds * 1000 / count for tier, seconds, count in (
+            ('memory', self.lookup_seconds['memory'], self.memory_hits),
+            ('disk', self.lookup_seconds['disk'], self.disk_hits),
+            ('miss', self.lookup_seconds['miss'], self.misses)) if count}
+        return dict(hit_rates(self.memory_hits, self.disk_hits, self.misses), sets=self.sets, mean_lookup_ms=mean_lookup_ms)
+
+
+def hit_rates(memory_hits: int, disk_hits: int, misses: int) -> Dict[str, Any]:
+    """계층별 히트/미스 수와 전체/메모리 계층 히트율 (조회가 없으면 히트율 None)"""
+    lookups: int = memory_hits + disk_hits + misses
+    return {
+        'memory_hits': memory_hits, 'disk_hits': disk_hits, 'misses': misses,
+        'hit_rate': (memory_hits + disk_hits) / lookups if lookups else None,
+        'memory_hit_rate': memory_hits / lookups if lookups else None,
+    }
+
+
+def namespace_ttl(namespace: str) -> float:
+    """네임스페이스별 디스크 보관 시간 (config.CACHE_NAMESPACE_TTLS, 없으면 기본값)"""
+    return config.CACHE_NAMESPACE_TTLS.get(namespace, config.CACHE_DEFAULT_TTL_S)
+
+
+class LayeredCache:
+    """네임스페이스별 메모리 LRU/TTL 계층을 디스크 캐시 앞에 둔 2단 캐시"""
+
+    def __init__(self,
+                 disk_factory: Callable[[], Any],
+                 memory_max_entries: int = config.CACHE_MEMORY_MAX_ENTRIES,
+                 memory_ttl_s: float = config.CACHE_MEMORY_TTL_S):
+        self._disk_factory: Callable[[], Any] = disk_factory # 디스크 계층 (resources 'cache' 자원, 없으면 None)
+        self.memory_max_entries: int = memory_max_entries
+        self.memory_ttl_s: float = memory_ttl_s # 다른 프로세스의 갱신/삭제를 늦어도 이 시간 안에는 반영
+        self._memory: Dict[str, TLRUCache] = {}
+        self._stats: Dict[str, NamespaceStats] = {}
+        self._lock = threading.Lock() # cachetools 캐시는 스레드 안전하지 않음
+        self._pending: Dict[Tuple[str, str], int] = {} # 디스크에 아직 합산하지 않은 (네임스페이스, 항목)별 증가분
+        self._last_flush: float = time.monotonic()
+        atexit.register(self.flush_stats)
+
+    @property
+    def disk(self) -> Any:
+        return self._disk_factory()
+
+    @property
+    def memory_enabled(self) -> bool:
+        return config.CACHE_MEMORY_ENABLED and self.memory_max_entries > 0
+
+    def _namespace(self, namespace: str) -> Tuple[TLRUCache, NamespaceStats]:
+        """[lock 보유 시 호출] 네임스페이스의 메모리 계층과 통계를 반환합니다. (처음이면 생성)"""
+        if namespace not in self._memory:
+            self._memory[namespace] = TLRUCache(maxsize=self.memory_max_entries, ttu=lambda _key, entry, _now: entry[1])
+            self._stats[namespace] = NamespaceStats()
+        return self._memory[namespace], self._stats[namespace]
+
+    def _record(self, namespace: str, tier: str, seconds: float) -> None:
+        field: str = {'memory': 'memory_hits', 'disk': 'disk_hits'}.get(tier, 'misses')
+        with self._lock:
+            stats: NamespaceStats = self._namespace(namespace)[1]
+            setattr(stats, field, getattr(stats, field) + 1)
+            stats.lookup_seconds[tier] += seconds
+            self._pending[(namespace, field)] = self._pending.get((namespace, field), 0) + 1
+        telemetry.record_cache_lookup(namespace, tier, seconds)
+        self._maybe_flush()
+
+    def _promote(self, namespace: str, key: Any, value: Any, ttl_s: Optional[float]) -> None:
+        """메모리 계층에 저장합니다. 만료 시각은 디스크 항목의 남은 시간과 memory_ttl_s 중 짧은 쪽"""
+        if not self.memory_enabled:
+            return
+        lifetime: float = self.memory_ttl_s if ttl_s is None else min(self.memory_ttl_s, ttl_s)
+        if lifetime <= 0:
+            return
+        entry: _MemoryEntryType = (value, time.monotonic() + lifetime)
+        with self._lock:
+            self._namespace(namespace)[0][key] = entry
+
+    def get(self, namespace: str, key: Any, default: Any = None) -> Any:
+        """메모리 -> 디스크 순으로 조회합니다. 없으면 default를 반환합니다."""
+        started: float = time.perf_counter()
+        if self.memory_enabled:
+            with self._lock:
+                entry: Optional[_MemoryEntryType] = self._namespace(namespace)[0].get(key)
+            if entry is not None:
+                self._record(namespace, 'memory', time.perf_counter() - started)
+                return entry[0]
+        disk = self.disk
+        if disk is not None:
+            try:
+                value, expire_time = disk.get(key, default=MISSING, expire_time=True, retry=True)
+            except Exception as e:
+                logging.warning(f"디스크 캐시 조회 실패 (namespace={namespace}): {e}")
+                value, expire_time = MISSING, None
+            if value is not MISSING:
+                self._promote(namespace, key, value, None if expire_time is None else expire_time - time.time())
+                self._record(namespace, 'disk', time.perf_counter() - started)
+                return value
+        self._record(namespace, 'miss', time.perf_counter() - started)
+        return default
+
+    def set(self, namespace: str, key: Any, value: Any, expire: Optional[float] = None) -> None:
+        """디스크와 메모리 계층에 저장합니다. expire가 없으면 네임스페이스 TTL을 사용합니다."""
+        ttl_s: float = expire if expire is not None else namespace_ttl(namespace)
+        disk = self.disk
+        if disk is not None:
+            try:
+                disk.set(key, value, expire=ttl_s, retry=True)
+            except Exception as e:
+                logging.warning(f"디스크 캐시 저장 실패 (namespace={namespace}): {e}")
+        self._promote(namespace, key, value, ttl_s)
+        with self._lock:
+            self._namespace(namespace)[1].sets += 1
+            self._pending[(namespace, 'sets')] = self._pending.get((namespace, 'sets'), 0) + 1
+        self._maybe_flush()
+
+    # --- 디스크 누적 통계 ---
+
+    def _maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= config.CACHE_STATS_FLUSH_INTERVAL_S:
+            self.flush_stats()
+
+    def flush_stats(self) -> None:
+        """쌓인 히트/미스 증가분을 디스크 계층 카운터에 합산합니다. (조회마다 쓰지 않도록 주기적으로, 종료 시 한 번 더)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        disk = self.disk
+        if disk is None:
+            return
+        try:
+            for (namespace, field), delta in pending.items():
+                disk.incr(f"{STATS_KEY_PREFIX}:{namespace}:{field}", delta, retry=True)
+        except Exception as e:
+            logging.warning(f"캐시 통계 기록 실패 (이번 증가분은 버림): {e}")
+
+    def disk_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        디스크 계층의 네임스페이스별 항목 수와 누적 히트/미스/히트율 (모든 프로세스, 재시작 이후 합산)
+        build_key 규칙 이전 형식의 키는 'legacy'로 묶습니다. 만료되었지만 아직 정리되지 않은 항목도 항목 수에 포함됩니다.
+        """
+        disk = self.disk
+        if disk is None:
+            return {}
+        entries: Dict[str, int] = {}
+        counters: Dict[str, Dict[str, int]] = {}
+        for key in disk.iterkeys():
+            namespace: Optional[str] = key_namespace(key)
+            if namespace == STATS_KEY_PREFIX:
+                _, stats_namespace, field = key.split(':', 2)
+                counters.setdefault(stats_namespace, {})[field] = int(disk.get(key, default=0, retry=True) or 0)
+            else:
+                entries[namespace or 'legacy'] = entries.get(namespace or 'legacy', 0) + 1
+        report: Dict[str, Dict[str, Any]] = {}
+        for namespace in sorted(set(entries) | set(counters)):
+            counts: Dict[str, int] = counters.get(namespace, {})
+            report[namespace] = dict(hit_rates(counts.get('memory_hits', 0), counts.get('disk_hits', 0), counts.get('misses', 0)),
+                                     sets=counts.get('sets', 0), entries=entries.get(namespace, 0))
+        return report
+
+    def reset_disk_stats(self) -> int:
+        """디스크에 누적한 통계 카운터를 지웁니다. 삭제 개수 반환"""
+        disk = self.disk
+        if disk is None:
+            return 0
+        keys: List[str] = [key for key in disk.iterkeys() if key_namespace(key) == STATS_KEY_PREFIX]
+        return sum(1 for key in keys if disk.delete(key, retry=True))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """네임스페이스별 계층 히트/미스 수, 히트율, 평균 조회 시간, 메모리 계층 항목 수 (이 프로세스 기준)"""
+        with self._lock:
+            return {namespace: dict(stats.as_dict(), memory_entries=len(self._memory[namespace]))
+                    for namespace, stats in self._stats.items()}
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            for memory in self._memory.values():
+                memory.clear()
+
+
+# --- 네임스페이스별 히트율/항목 수 조회 CLI ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MuseSonar 2단 캐시 네임스페이스별 히트율/항목 수")
+    parser.add_argument('--json', action='store_true', help="JSON으로 출력")
+    parser.add_argument('--purge-expired', action='store_true', help="집계 전에 만료된 디스크 항목 정리")
+    parser.add_argument('--reset-stats', action='store_true', help="출력 후 누적 히트/미스 카운터 초기화")
+    args = parser.parse_args()
+
+    from resources import cache_tiers as tiers
+    if tiers.disk is None:
+        parser.error("디스크 캐시를 열 수 없습니다.")
+    if args.purge_expired:
+        print(f"만료 항목 정리: {tiers.disk.expire()}개")
+    rows: Dict[str, Dict[str, Any]] = tiers.disk_report()
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        def _rate(value: Optional[float]) -> str:
+            return '-' if value is None else f"{value:.1%}"
+        print(f"  {'네임스페이스':<16}{'항목 수':>10}{'조회':>10}{'히트율':>9}{'메모리 히트율':>14}{'미스':>10}{'저장':>10}")
+        for namespace, row in rows.items():
+            lookups: int = row['memory_hits'] + row['disk_hits'] + row['misses']
+            print(f"  {namespace:<16}{row['entries']:>10}{lookups:>10}{_rate(row['hit_rate']):>9}"
+                  f"{_rate(row['memory_hit_rate']):>14}{row['misses']:>10}{row['sets']:>10}")
+    if args.reset_stats:
+        print(f"통계 카운터 초기화: {tiers.reset_disk_stats()}개")
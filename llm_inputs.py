@@ -0,0 +1,47 @@
+# llm_inputs.py
+
+"""
+검색 결과(hit)에서 LLM 2차 검증 입력(발췌문, 출처 유형)과 검증 결과 캐시 키를 만드는 규칙입니다.
+단건 검증(verify_similarity_with_llm -> verify_similarity_with_llm_cached)과 일괄 검증(verify_hits_batch)의
+캐시 조회/저장이 모두 이 함수들을 거치므로 같은 hit은 두 경로에서 같은 캐시 항목을 사용합니다.
+"""
+
+import config
+import logging
+from cache_keys import llm_verdict_key
+from logging_setup import SAMPLED
+from typing import Any, Dict, Tuple
+
+
+# 구글 검색 발췌 함수
+def build_excerpt(full_text: str) -> str:
+    """입력 텍스트에서 LLM 검증에 사용할 스니펫을 생성합니다. 특정 키워드 포함 시 길이를 늘립니다."""
+    # 키워드가 텍스트 앞부분(예: 1200자)에 있는지 확인
+    # full_text가 1200자보다 짧을 수 있으므로 슬라이싱 주의
+    check_range = min(len(full_text), 1200)
+    if any(k in full_text[:check_range] for k in config.KW_HINTS):
+        # 힌트 키워드가 있으면 더 길게 자름 (예: 1000자)
+        # full_text가 1000자보다 짧을 수 있으므로 슬라이싱 주의
+        target_length = min(len(full_text), 1000)
+        logging.debug("힌트 키워드 발견! 스니펫 길이를 %d자로 확장.", target_length, extra=SAMPLED) # hit마다 발생하는 대량 로그
+        return full_text[:target_length]
+    else:
+        # 힌트 키워드 없으면 기본 길이로 자름
+        target_length = min(len(full_text), config.MAX_EXCERPT)
+        logging.debug("힌트 키워드 없음. 스니펫 기본 길이 %d자 적용.", target_length, extra=SAMPLED)
+        return full_text[:target_length]
+
+# 출처 유형 조회 함수 (검색 결과의 'source' 필드: 'Google Search', 'KIPRIS Patent' 등)
+def source_type_of(hit: Dict[str, Any]) -> str:
+    return hit.get('source') or 'Unknown'
+
+# LLM 검증 입력 준비 함수
+def prepare_llm_inputs(hit: Dict[str, Any]) -> Tuple[str, str]:
+    """hit에서 LLM 검증용 (발췌문, 출처 유형)을 만듭니다. 단건/일괄 검증 공통"""
+    return build_excerpt(hit.get('text', '')), source_type_of(hit)
+
+# hit 단위 LLM 검증 캐시 키 함수
+def verdict_key_for_hit(user_idea: str, hit: Dict[str, Any], model_llm: Any) -> str:
+    """verify_similarity_with_llm_cached가 같은 hit으로 호출될 때 쓰는 것과 같은 캐시 키"""
+    excerpt, source_type = prepare_llm_inputs(hit)
+    return llm_verdict_key(user_idea, excerpt, source_type, model_llm)
@@ -0,0 +1,178 @@
+# logging_setup.py
+
+"""
+MuseSonar 공용 로깅 설정 모듈입니다. (app, MuseSONAR_public 등 진입점에서 setup_logging 호출, 처음 호출한 진입점의 로그 파일로 한 번만 구성)
+- 큐 기반 비동기 처리: 요청 스레드는 레코드를 큐에 넣기만 하고, 파일/콘솔 쓰기와 포맷팅은 전용 리스너 스레드가 처리
+  (마스터 프로세스에서 구성한 뒤 fork한 워커(gunicorn --preload 등)는 새 큐와 리스너 스레드를 자식 프로세스에서 다시 시작)
+- 모듈별 레벨: config.LOG_MODULE_LEVELS (모듈 = 소스 파일 이름, 루트 로거를 쓰는 기존 logging.xxx 호출에도 적용)
+- 표본 추출: extra=SAMPLED로 표시한 대량 DEBUG 로그는 호출 위치(파일:줄)별로 N개 중 1개만 기록
+"""
+
+import atexit
+import config
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(funcName)s:%(lineno)d] - %(message)s'
+
+# 대량 DEBUG 로그 표시용 extra (예: logging.debug("...: %s", value, extra=SAMPLED))
+SAMPLED: Dict[str, bool] = {'sampled': True}
+
+
+class ModuleLevelFilter(logging.Filter):
+    """레코드의 모듈(소스 파일 이름)별 최소 레벨을 적용합니다. 지정되지 않은 모듈은 기본 레벨"""
+
+    def __init__(self, default_level: int, module_levels: Dict[str, int]):
+        super().__init__()
+        self.default_level: int = default_level
+        self.module_levels: Dict[str, int] = module_levels
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.module_levels.get(record.module, self.default_level)
+
+
+class SamplingFilter(logging.Filter):
+    """extra=SAMPLED로 표시된 레코드를 호출 위치별로 every개 중 1개(첫 번째 포함)만 통과시킵니다."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every: int = max(1, every)
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, 'sampled', False):
+            return True
+        key: Tuple[str, int] = (record.pathname, record.lineno)
+        with self._lock:
+            count: int = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    메시지만 호출 시점에 조합해 레코드를 큐에 넣는 핸들러. (시간 포맷/예외 문자열화는 리스너 스레드에서 처리)
+    큐가 가득 차면 WARNING 미만 레코드는 바로 버리고, WARNING 이상은 config.LOG_QUEUE_PUT_TIMEOUT_S까지만 기다린 뒤 버립니다.
+    (리스너가 멈춰도 로깅이 요청 스레드를 무한정 막지 않음, 버린 개수는 dropped에 집계)
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자(args)가 가변 객체면 리스너가 포맷할 때 값이 이미 바뀌어 있을 수 있으므로 메시지는 여기서 확정
+        # (exc_info는 같은 프로세스의 리스너가 그대로 쓸 수 있으므로 문자열화하지 않고 유지)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                try:
+                    self.queue.put(record, timeout=config.LOG_QUEUE_PUT_TIMEOUT_S)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """종료 신호(sentinel)를 큐에 자리가 날 때까지 기다렸다 넣는 리스너 (기본 구현은 큐가 가득 차면 stop()에서 queue.Full)"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel) # 리스너 스레드가 계속 비우므로 곧 자리가 남
+
+
+class _LoggingState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.log_file: Optional[str] = None
+        self.queue_handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[_QueueListener] = None
+
+_state = _LoggingState()
+
+
+def _level(name: str) -> int:
+    return logging.getLevelName(name.upper()) if isinstance(name, str) else int(name)
+
+def _output_handlers(log_file: str) -> List[logging.Handler]:
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.FileHandler(log_file, encoding='utf-8'), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+def setup_logging(log_file: str) -> None:
+    """
+    루트 로거를 구성합니다. 이미 구성되어 있으면 아무것도 하지 않습니다.
+    (app이 먼저 호출하면 MuseSONAR_public 임포트 시의 호출은 무시되어 모든 로그가 app 로그 파일 하나에 기록됨)
+    """
+    with _state.lock:
+        if _state.log_file is not None:
+            return
+        _state.log_file = log_file
+        root = logging.getLogger()
+
+        default_level: int = _level(config.LOG_LEVEL)
+        module_levels: Dict[str, int] = {module: _level(level) for module, level in config.LOG_MODULE_LEVELS.items()}
+        # 루트 레벨은 가장 낮은 모듈 레벨까지 열어 두고, 모듈별 판단은 필터가 담당
+        root.setLevel(min([default_level] + list(module_levels.values())))
+        filters: List[logging.Filter] = [ModuleLevelFilter(default_level, module_levels), SamplingFilter(config.LOG_DEBUG_SAMPLE_EVERY)]
+
+        for handler in list(root.handlers): # 다른 곳에서 basicConfig 등으로 붙인 핸들러 정리
+            root.removeHandler(handler)
+        if config.LOG_ASYNC_ENABLED:
+            queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+            for filt in filters:
+                queue_handler.addFilter(filt) # 버릴 레코드는 큐에 넣기 전에 요청 스레드에서 걸러냄
+            root.addHandler(queue_handler)
+            _state.queue_handler = queue_handler
+            _state.listener = _QueueListener(queue_handler.queue, *_output_handlers(log_file), respect_handler_level=True)
+            _state.listener.start()
+            atexit.register(shutdown_logging)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_restart_listener_after_fork)
+        else:
+            for handler in _output_handlers(log_file):
+                for filt in filters:
+                    handler.addFilter(filt)
+                root.addHandler(handler)
+
+def _restart_listener_after_fork() -> None:
+    """
+    [fork 직후 자식 프로세스] 리스너 스레드는 복제되지 않으므로, 아무도 읽지 않는 부모의 큐 대신 새 큐와 리스너를 시작합니다.
+    (부모 큐에 남아 있던 레코드는 부모의 리스너가 기록하므로 버림)
+    """
+    _state.lock = threading.Lock() # fork 시점에 다른 스레드가 잡고 있었을 수 있음
+    listener, queue_handler = _state.listener, _state.queue_handler
+    if listener is None or queue_handler is None:
+        return
+    child_queue: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    queue_handler.queue = child_queue
+    queue_handler.dropped = 0
+    _state.listener = _QueueListener(child_queue, *listener.handlers, respect_handler_level=True)
+    _state.listener.start()
+
+def shutdown_logging() -> None:
+    """큐에 남은 레코드를 모두 기록하고 리스너 스레드를 종료합니다. (프로세스 종료 시 자동 호출)"""
+    with _state.lock:
+        listener = _state.listener
+        _state.listener = None
+    if listener is not None:
+        if _state.queue_handler is not None and _state.queue_handler.dropped:
+            logging.warning(f"로그 큐 포화로 버린 DEBUG/INFO 레코드: {_state.queue_handler.dropped}개")
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
@@ -0,0 +1,101 @@
+# near_duplicates.py
+
+"""
+검색 결과(hit)의 유사 중복 묶기입니다. (미러 페이지의 Google 스니펫, 제목/초록이 거의 같은 KIPRIS 패밀리 출원 등)
+텍스트를 정규화한 뒤 글자 n-gram 조각(shingle)의 64비트 SimHash를 만들고,
+SimHash를 (최대 해밍 거리 + 1)개 밴드로 나눈 LSH 버킷에서 후보 쌍을 찾아 해밍 거리로 확인합니다.
+(해밍 거리가 k 이하인 두 해시는 비둘기집 원리로 k + 1개 밴드 중 적어도 하나가 같으므로 후보 누락이 없음)
+묶음마다 가장 앞(검색 순위가 높은) 항목 하나만 남기고, 묶인 항목 수를 'cluster_size'로 기록합니다.
+"""
+
+import hashlib
+import re
+import unicodedata
+import numpy as np
+from typing import Any, Dict, List
+
+_BIT_POSITIONS: np.ndarray = np.arange(64, dtype=np.uint64)
+
+
+# 텍스트 정규화 함수 (대소문자, 구두점, 공백 차이 무시)
+def normalize_for_shingles(text: str) -> str:
+    normalized: str = unicodedata.normalize('NFKC', text).lower()
+    normalized = re.sub(r'[^\w\s]', ' ', normalized)
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+def shingles(text: str, size: int) -> List[str]:
+    """정규화 텍스트의 글자 n-gram 목록 (띄어쓰기가 불규칙한 한국어에도 안정적). 짧은 텍스트는 전체 한 조각"""
+    normalized: str = normalize_for_shingles(text)
+    if len(normalized) <= size:
+        return [normalized] if normalized else []
+    return [normalized[i:i + size] for i in range(len(normalized) - size + 1)]
+
+def simhash(text: str, shingle_size: int) -> int:
+    """글자 n-gram 조각의 64비트 SimHash (조각 빈도를 가중치로 사용)"""
+    pieces: List[str] = shingles(text, shingle_size)
+    if not pieces:
+        return 0
+    hashes: np.ndarray = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(piece.encode('utf-8'), digest_size=8).digest(), 'little') for piece in pieces),
+        dtype=np.uint64, count=len(pieces)
+    )
+    bits: np.ndarray = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.int32) # (조각 수, 64)
+    votes: np.ndarray = 2 * bits.sum(axis=0) - len(pieces) # 비트별 (1 개수 - 0 개수)
+    return int(((votes > 0).astype(np.uint64) << _BIT_POSITIONS).sum())
+
+def band_keys(fingerprint: int, num_bands: int) -> List[int]:
+    """64비트 해시를 num_bands개 구간으로 나눈 LSH 버킷 키 (밴드 번호를 상위 비트에 붙여 테이블 구분)"""
+    bounds: np.ndarray = np.linspace(0, 64, num_bands + 1).astype(int)
+    return [(band << 64) | ((fingerprint >> int(start)) & ((1 << int(end - start)) - 1))
+            for band, (start, end) in enumerate(zip(bounds[:-1], bounds[1:]))]
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent: List[int] = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b) # 루트는 항상 앞 순위 항목
+
+
+def cluster_near_duplicates(texts: List[str], max_hamming: int, shingle_size: int) -> List[int]:
+    """텍스트별 묶음 대표(가장 앞 항목)의 인덱스 목록을 반환합니다. 대표 자신은 자기 인덱스"""
+    fingerprints: List[int] = [simhash(text, shingle_size) for text in texts]
+    num_bands: int = min(64, max_hamming + 1)
+    buckets: Dict[int, List[int]] = {}
+    for index, fingerprint in enumerate(fingerprints):
+        for key in band_keys(fingerprint, num_bands):
+            buckets.setdefault(key, []).append(index)
+
+    groups = _UnionFind(len(texts))
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for pos, a in enumerate(members):
+            for b in members[pos + 1:]:
+                if (a, b) in checked:
+                    continue
+                checked.add((a, b))
+                if bin(fingerprints[a] ^ fingerprints[b]).count("1") <= max_hamming:
+                    groups.union(a, b)
+    return [groups.find(index) for index in range(len(texts))]
+
+def collapse_near_duplicates(items: List[Dict[str, Any]], max_hamming: int, shingle_size: int) -> List[Dict[str, Any]]:
+    """
+    유사 중복 묶음마다 대표 항목 하나만 남긴 새 목록을 반환합니다. (입력 순서 유지, 입력 딕셔너리는 수정하지 않음)
+    대표 항목의 'cluster_size'는 묶인 항목들의 cluster_size 합 (재사용 후보 풀처럼 이미 묶인 항목을 다시 넣어도 유지)
+    """
+    if len(items) < 2:
+        return [dict(item, cluster_size=item.get('cluster_size', 1)) for item in items]
+    representatives: List[int] = cluster_near_duplicates([item.get('text', '') for item in items], max_hamming, shingle_size)
+    sizes: Dict[int, int] = {}
+    for index, root in enumerate(representatives):
+        sizes[root] = sizes.get(root, 0) + items[index].get('cluster_size', 1)
+    return [dict(items[index], cluster_size=sizes[index]) for index, root in enumerate(representatives) if root == index]
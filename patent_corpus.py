@@ -0,0 +1,164 @@
+# patent_corpus.py
+
+"""
+KIPRIS에서 내보낸 XML로 만드는 오프라인 로컬 특허 코퍼스입니다.
+제목/초록 레코드(JSON Lines)와 미리 계산한 SBERT 임베딩(메모리 맵 .npy 행렬), LSH 코드를 저장하고,
+analyze_idea가 실시간 KIPRIS 호출 없이 수 ms 안에 top-k 후보를 가져올 수 있게 합니다.
+
+사용법:
+    python patent_corpus.py ingest exports/*.xml [--out cache_dir/patent_corpus]
+"""
+
+import config
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+import numpy as np
+from idea_index import RandomHyperplaneLSH
+from kipris_client import KiprisRecordType, iter_file_records
+from lxml.etree import XMLSyntaxError
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# --- 코퍼스 디렉토리 및 파일 구성 ---
+PATENT_CORPUS_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "patent_corpus")
+RECORDS_FILE = "records.jsonl"       # 레코드 1줄 = 특허 1건 (parse_kipris_items 결과 형식)
+EMBEDDINGS_FILE = "embeddings.npy"   # (n, dim) float16, L2 정규화된 임베딩
+LSH_CODES_FILE = "lsh_codes.npy"     # (n, tables) int64 버킷 코드
+META_FILE = "meta.json"              # 모델명, 차원, 건수, LSH 설정
+
+CorpusHitType = Tuple[float, Dict[str, str]] # (코사인 유사도, 레코드)
+
+
+class PatentCorpus:
+    """메모리 맵 임베딩 행렬 + 테이블별 정렬된 LSH 코드로 top-k 후보를 찾는 로컬 특허 코퍼스"""
+
+    def __init__(self, directory: str = PATENT_CORPUS_DIR):
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        with open(os.path.join(directory, RECORDS_FILE), encoding='utf-8') as f:
+            self.records: List[Dict[str, str]] = [json.loads(line) for line in f if line.strip()]
+        self.embeddings: np.ndarray = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode='r')
+        codes: np.ndarray = np.load(os.path.join(directory, LSH_CODES_FILE))
+        self.lsh = RandomHyperplaneLSH(self.embeddings.shape[1], self.meta['lsh_tables'], self.meta['lsh_bits'], seed=self.meta['lsh_seed'])
+        # 테이블별로 코드를 정렬해 두고 질의 시 searchsorted로 같은 버킷 범위를 찾음
+        self._orders: List[np.ndarray] = [np.argsort(codes[:, t], kind='stable') for t in range(codes.shape[1])]
+        self._sorted_codes: List[np.ndarray] = [codes[order, t] for t, order in enumerate(self._orders)]
+        logging.info(f"로컬 특허 코퍼스 로딩 완료: {len(self.records)}건, 모델={self.meta.get('model_name')}, 디렉토리={directory}")
+
+    @property
+    def model_name(self) -> str:
+        return self.meta.get('model_name', '')
+
+    def _candidate_rows(self, query: np.ndarray) -> np.ndarray:
+        rows: List[np.ndarray] = []
+        for t, code in enumerate(self.lsh.codes(query[None, :])[0]):
+            left: int = int(np.searchsorted(self._sorted_codes[t], code, side='left'))
+            right: int = int(np.searchsorted(self._sorted_codes[t], code, side='right'))
+            rows.append(self._orders[t][left:right])
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+    def search(self, query_embedding: np.ndarray, top_k: int = config.PATENT_CORPUS_TOP_K) -> List[CorpusHitType]:
+        """질의 임베딩과 코사인 유사도가 높은 순서로 최대 top_k개의 (유사도, 레코드)를 반환합니다."""
+        query: np.ndarray = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        rows: np.ndarray = self._candidate_rows(query)
+        if len(rows) < top_k:
+            rows = np.arange(len(self.records)) # LSH 후보가 부족하면 전체 행렬로 정확 검색
+        sims: np.ndarray = np.asarray(self.embeddings[rows], dtype=np.float32) @ query
+        k: int = min(top_k, len(rows))
+        if k == 0:
+            return []
+        top: np.ndarray = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(float(sims[i]), self.records[int(rows[i])]) for i in top]
+
+
+# --- 모듈 단위 코퍼스 인스턴스 (디렉토리가 있을 때만 로딩) ---
+patent_corpus: Optional[PatentCorpus] = None
+if config.PATENT_CORPUS_ENABLED and os.path.exists(os.path.join(PATENT_CORPUS_DIR, META_FILE)):
+    try:
+        patent_corpus = PatentCorpus()
+    except Exception as e:
+        logging.error(f"로컬 특허 코퍼스 로딩 실패! 실시간 KIPRIS 검색만 사용합니다. 오류: {e}")
+        patent_corpus = None
+
+
+# =============== 코퍼스 수집(ingest) ===============
+
+def _iter_xml_items(paths: Iterable[str]) -> Iterable[KiprisRecordType]:
+    """내보낸 KIPRIS XML 파일들의 <item>을 순서대로 압축 레코드로 반환합니다. (파일마다 iterparse로 스트리밍)"""
+    for path in paths:
+        count: int = 0
+        try:
+            for record in iter_file_records(path):
+                count += 1
+                yield record
+        except XMLSyntaxError as e:
+            logging.error(f"XML 파싱 오류로 파일 나머지 건너뜀: {path} ({count}건까지 읽음, {e})")
+            continue
+        logging.info(f"XML 파일 읽기: {path} ({count}건)")
+
+def ingest(xml_paths: List[str], out_dir: str = PATENT_CORPUS_DIR) -> int:
+    """XML 파일들을 파싱·중복 제거·인코딩하여 out_dir에 코퍼스를 만듭니다. 저장된 건수를 반환합니다."""
+    from MuseSONAR_public import parse_kipris_items # 실시간 검색과 동일한 파싱 규칙 사용
+    from sentence_transformers import SentenceTransformer
+
+    records: List[Dict[str, str]] = []
+    seen: set[str] = set()
+    for record in parse_kipris_items(list(_iter_xml_items(xml_paths))):
+        dedupe_key: str = record.get('link') or record['text']
+        if dedupe_key not in seen:
+            seen.add(dedupe_key)
+            records.append(record)
+    if not records:
+        logging.warning("수집할 특허 레코드가 없습니다.")
+        return 0
+    logging.info(f"코퍼스 레코드 {len(records)}건 인코딩 시작 (모델={config.SBERT_MODEL_NAME})")
+
+    os.makedirs(out_dir, exist_ok=True)
+    model = SentenceTransformer(config.SBERT_MODEL_NAME)
+    dim: int = model.get_sentence_embedding_dimension()
+    embeddings = np.lib.format.open_memmap(os.path.join(out_dir, EMBEDDINGS_FILE), mode='w+', dtype=np.float16, shape=(len(records), dim))
+    lsh_seed: int = 42
+    lsh = RandomHyperplaneLSH(dim, config.PATENT_CORPUS_LSH_TABLES, config.PATENT_CORPUS_LSH_BITS, seed=lsh_seed)
+    codes: np.ndarray = np.empty((len(records), config.PATENT_CORPUS_LSH_TABLES), dtype=np.int64)
+
+    started: float = time.perf_counter()
+    batch_size: int = config.PATENT_CORPUS_ENCODE_BATCH_SIZE
+    for start in range(0, len(records), batch_size):
+        batch_texts: List[str] = [r['text'] for r in records[start:start + batch_size]]
+        vectors: np.ndarray = model.encode(batch_texts, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+        embeddings[start:start + len(batch_texts)] = vectors
+        codes[start:start + len(batch_texts)] = lsh.codes(vectors)
+        logging.info(f"  인코딩 진행: {min(start + batch_size, len(records))}/{len(records)}")
+    embeddings.flush()
+    np.save(os.path.join(out_dir, LSH_CODES_FILE), codes)
+
+    with open(os.path.join(out_dir, RECORDS_FILE), 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with open(os.path.join(out_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': config.SBERT_MODEL_NAME, 'dim': dim, 'count': len(records),
+            'lsh_tables': config.PATENT_CORPUS_LSH_TABLES, 'lsh_bits': config.PATENT_CORPUS_LSH_BITS, 'lsh_seed': lsh_seed,
+            'created_at': time.time()
+        }, f, ensure_ascii=False, indent=2)
+
+    logging.info(f"로컬 특허 코퍼스 생성 완료: {len(records)}건, {time.perf_counter() - started:.1f}s, 디렉토리={out_dir}")
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KIPRIS XML 내보내기 파일로 로컬 특허 코퍼스 생성")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ingest_parser = subparsers.add_parser('ingest', help="XML 파일(또는 glob 패턴)로 코퍼스 생성 (기존 코퍼스는 덮어씀)")
+    ingest_parser.add_argument('paths', nargs='+', help="KIPRIS XML 파일 경로 또는 glob 패턴")
+    ingest_parser.add_argument('--out', default=PATENT_CORPUS_DIR, help="코퍼스 출력 디렉토리")
+    args = parser.parse_args()
+
+    xml_files: List[str] = sorted({path for pattern in args.paths for path in glob.glob(pattern)})
+    count: int = ingest(xml_files, args.out)
+    print(f"코퍼스 레코드 {count}건 저장 완료: {args.out}")
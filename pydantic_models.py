@@ -4,8 +4,8 @@
 MuseSonar 분석 결과 데이터 구조를 정의하는 Pydantic 모델입니다.
 """
 
-from pydantic import BaseModel, Field, NonNegativeInt, NonNegativeFloat
-from typing import List, Optional
+from pydantic import BaseModel, Field, NonNegativeInt, NonNegativeFloat, PositiveInt
+from typing import Any, Dict, List, Optional
 
 # LLM 검증 결과를 위한 모델
 class LlmVerificationModel(BaseModel):
@@ -22,6 +22,14 @@ class SimilarResultModel(BaseModel):
     link: Optional[str] = None                              # 결과 링크 (Optional 문자열)
     source: str                                             # 출처 (예: "Google Search", "KIPRIS Patent")
     llm_verification: Optional[LlmVerificationModel] = None # LLM 검증 결과 (Optional 모델)
+    cluster_size: PositiveInt = 1                           # 이 결과로 묶인 유사 중복 검색 결과 수 (대표 자신 포함)
+
+# 호출 예산 부족으로 인한 성능 저하 결정을 위한 모델
+class DegradationModel(BaseModel):
+    """API 호출 예산(요청 속도/일일 할당량) 부족 시 내려진 성능 저하 결정 모델"""
+    api: str       # 예: "google", "kipris", "gemini"
+    decision: str  # 예: "cache_or_local_only" (캐시/로컬 코퍼스 결과만 사용), "skip_llm" (LLM 검증 생략)
+    reason: str    # 예: "quota_exhausted" (일일 할당량 소진), "rate_limited" (대기 시간 초과)
 
 # 평가 지표(메트릭)를 위한 모델
 class MetricModel(BaseModel):
@@ -33,6 +41,16 @@ class MetricModel(BaseModel):
     relevant_search_results_count: NonNegativeInt          # 관련성 높은 검색 결과 개수 (0 이상 정수)
     combined_results_found: bool                           # 웹/특허 검색 결과 존재 여부 (True/False)
     verification_threshold_percentage: float = Field(ge=0.0, le=100.0) # LLM 검증 대상 선정 기준 유사도 (0~100)
+    degradations: List[DegradationModel] = []             # 호출 예산 부족으로 내려진 성능 저하 결정 목록
+
+# 요청별 단계 소요 시간을 위한 모델
+class StageTimingModel(BaseModel):
+    """분석 파이프라인 단계 하나의 소요 시간 (telemetry span 기록)"""
+    stage: str                                  # 예: "keywords", "search", "search.google", "encode", "llm.call", "scoring"
+    start_ms: float                             # 분석 시작 기준 단계 시작 시각 (ms, 동시 실행 단계는 구간이 겹침)
+    duration_ms: NonNegativeFloat               # 소요 시간 (ms)
+    status: str = "ok"                          # "ok" 또는 "error" (단계 안에서 예외 발생)
+    attributes: Dict[str, Any] = {}             # 단계별 속성 (결과 수, 배치 크기, LLM 판정 등)
 
 class AnalysisResultModel(BaseModel):
     """MuseSonar 최종 분석 결과 모델"""
@@ -45,6 +63,8 @@ class AnalysisResultModel(BaseModel):
     top_similar_results: List[SimilarResultModel] = []
     # --- 오류 처리용 필드 추가 ---
     error: Optional[str] = None # 오류 발생 시 메시지 저장
+    # --- 요청별 단계 소요 시간 (요청 시 또는 config.METRICS_ATTACH_TIMINGS일 때만) ---
+    timings: Optional[List[StageTimingModel]] = None
 
     # 모델 유효성 검사 예시 (선택 사항): 점수가 있는데 0~100 범위를 벗어나면 오류 발생시킴
     # from pydantic import validator
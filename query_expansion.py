@@ -0,0 +1,135 @@
+# query_expansion.py
+
+"""
+아이디어 원문 하나로 여러 하위 질의(키워드 부분집합, Okt 명사의 로마자 표기 등)를 만들고,
+(로마자 표기 질의는 국어의 로마자 표기법에 따른 음역이며 영어 번역이 아님)
+프로세스 전체 동시 실행 상한 아래에서 병렬로 실행한 뒤 결과를 정규화된 링크/텍스트 기준으로 중복 제거하여 함께 순위화합니다.
+하위 질의는 각각 google_search/search_kipris_patents의 질의 단위 캐시를 그대로 사용합니다.
+"""
+
+import config
+import logging
+import threading
+import http_client
+import rate_limiter
+from rate_limiter import RateLimitExceeded
+from circuit_breaker import CircuitOpenError, REASON_CIRCUIT_OPEN
+from result_cache import normalize_idea_text
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+SearchFuncType = Callable[[str], List[Dict[str, str]]]
+
+
+class SubQuery(NamedTuple):
+    engine: str # 'google' 또는 'kipris'
+    text: str
+    kind: str # 'original', 'keywords', 'subset', 'romanized'(키워드의 로마자 표기)
+
+
+# --- 한글 로마자 표기 (국어의 로마자 표기법 기본 자모 대응, 음운 변화 규칙은 생략) ---
+_HANGUL_BASE = 0xAC00
+_INITIALS: Tuple[str, ...] = ('g', 'kk', 'n', 'd', 'tt', 'r', 'm', 'b', 'pp', 's', 'ss', '', 'j', 'jj', 'ch', 'k', 't', 'p', 'h')
+_MEDIALS: Tuple[str, ...] = ('a', 'ae', 'ya', 'yae', 'eo', 'e', 'yeo', 'ye', 'o', 'wa', 'wae', 'oe', 'yo', 'u', 'wo', 'we', 'wi', 'yu', 'eu', 'ui', 'i')
+_FINALS: Tuple[str, ...] = ('', 'k', 'k', 'k', 'n', 'n', 'n', 't', 'l', 'k', 'm', 'l', 'l', 'l', 'p', 'l', 'm', 'p', 'p', 't', 't', 'ng', 't', 't', 'k', 't', 'p', 't')
+
+# 한글 로마자 변환 함수
+def romanize_hangul(text: str) -> str:
+    """한글 음절을 로마자로 바꿉니다. 한글이 아닌 문자는 그대로 둡니다."""
+    out: List[str] = []
+    for ch in text:
+        code: int = ord(ch) - _HANGUL_BASE
+        if 0 <= code < 11172:
+            out.append(_INITIALS[code // 588] + _MEDIALS[(code % 588) // 28] + _FINALS[code % 28])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+# 하위 질의 생성 함수
+def expand_queries(idea_text: str, keywords: str, include_kipris: bool = True) -> List[SubQuery]:
+    """원문과 추출 키워드로 엔진별 하위 질의 목록을 만듭니다. 원문 질의가 항상 첫 번째입니다."""
+    google_queries: List[SubQuery] = [SubQuery('google', idea_text, 'original')]
+    kipris_queries: List[SubQuery] = [SubQuery('kipris', idea_text, 'original')] if include_kipris else []
+
+    keyword_list: List[str] = keywords.split() if keywords and keywords.strip() != idea_text.strip() else []
+    if keyword_list:
+        google_queries.append(SubQuery('google', ' '.join(keyword_list), 'keywords'))
+        subset_size: int = config.QUERY_EXPANSION_SUBSET_SIZE
+        if len(keyword_list) > subset_size:
+            # 앞쪽(상위) 키워드와 나머지 키워드로 나눈 부분집합
+            head: str = ' '.join(keyword_list[:subset_size])
+            tail: str = ' '.join(keyword_list[subset_size:subset_size * 2])
+            google_queries.append(SubQuery('google', head, 'subset'))
+            kipris_queries.append(SubQuery('kipris', tail, 'subset'))
+        romanized: str = ' '.join(romanize_hangul(k) for k in keyword_list)
+        if config.QUERY_EXPANSION_ROMANIZATION_ENABLED and romanized != ' '.join(keyword_list):
+            google_queries.append(SubQuery('google', romanized, 'romanized'))
+
+    # 같은 질의(정규화 기준) 제거 후 엔진별 상한 적용
+    sub_queries: List[SubQuery] = []
+    for queries, limit in ((google_queries, config.QUERY_EXPANSION_MAX_GOOGLE_QUERIES), (kipris_queries, config.QUERY_EXPANSION_MAX_KIPRIS_QUERIES)):
+        seen: set[str] = set()
+        for query in queries:
+            key: str = normalize_idea_text(query.text)
+            if key and key not in seen and len(seen) < limit:
+                seen.add(key)
+                sub_queries.append(query)
+    logging.info(f"하위 질의 {len(sub_queries)}개 생성: {[(q.engine, q.kind, q.text[:30]) for q in sub_queries]}")
+    return sub_queries
+
+
+# --- 프로세스 전체 하위 질의 동시 실행 상한 ---
+_fanout_semaphore = threading.BoundedSemaphore(config.QUERY_EXPANSION_MAX_CONCURRENCY)
+
+def _run_limited(search_func: SearchFuncType, query: str) -> List[Dict[str, str]]:
+    with _fanout_semaphore:
+        try:
+            return search_func(query)
+        except (RateLimitExceeded, CircuitOpenError) as e:
+            # 호출 예산 부족/회로 차단: 이 하위 질의는 결과 없이 진행 (캐시된 하위 질의/로컬 코퍼스 결과만 사용)
+            # 빈 결과가 '검색 결과 없음'과 구분되도록 성능 저하를 기록 -> 분석 결과는 결과 캐시에 저장되지 않음
+            if isinstance(e, RateLimitExceeded):
+                rate_limiter.record_degradation(e.api, e.reason)
+            else:
+                rate_limiter.record_degradation(e.backend, REASON_CIRCUIT_OPEN)
+            logging.info(f"하위 질의 건너뜀 ({e}): '{query[:30]}'")
+            return []
+
+# 하위 질의 병렬 실행 함수
+def run_sub_queries(sub_queries: List[SubQuery], search_funcs: Dict[str, SearchFuncType]) -> List[List[Dict[str, str]]]:
+    """
+    하위 질의를 공용 루프 스레드 풀에서 동시에 실행하고 질의 순서대로 결과 목록을 반환합니다.
+    (호출 스레드의 컨텍스트가 전달되므로 분석 범위의 성능 저하 기록/공정 대기열 키가 유지됨)
+    """
+    calls: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = [
+        (_run_limited, (search_funcs[query.engine], query.text)) for query in sub_queries
+    ]
+    return http_client.run_blocking_concurrently(calls)
+
+
+# 결과 병합 키 함수
+def hit_dedupe_key(hit: Dict[str, str]) -> str:
+    """링크가 있으면 정규화된 링크, 없으면 정규화된 텍스트를 중복 판정 키로 사용합니다."""
+    link: str = (hit.get('link') or '').strip().lower().rstrip('/')
+    return f"link:{link}" if link else f"text:{normalize_idea_text(hit.get('text', ''))}"
+
+# 결과 병합 및 순위화 함수
+def merge_ranked_hits(result_lists: List[List[Dict[str, str]]], rrf_k: int = 60) -> List[Dict[str, str]]:
+    """
+    하위 질의별 결과를 중복 제거하여 하나로 합칩니다.
+    순서는 역순위 융합(RRF, 여러 질의에서 상위에 나온 결과 우선)이며, 각 결과에 매칭된 하위 질의 수를 기록합니다.
+    """
+    fused_scores: Dict[str, float] = {}
+    merged: Dict[str, Dict[str, str]] = {}
+    match_counts: Dict[str, int] = {}
+    for results in result_lists:
+        for rank, hit in enumerate(results or []):
+            if not isinstance(hit, dict) or not hit.get('text'):
+                continue
+            key: str = hit_dedupe_key(hit)
+            if key not in merged:
+                merged[key] = hit
+            fused_scores[key] = fused_scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            match_counts[key] = match_counts.get(key, 0) + 1
+    ordered_keys: List[str] = sorted(merged, key=lambda k: fused_scores[k], reverse=True) # 동점은 최초 등장 순서 유지
+    return [dict(merged[key], matched_queries=match_counts[key]) for key in ordered_keys]
@@ -0,0 +1,255 @@
+# rate_limiter.py
+
+"""
+외부 API(Google Custom Search, KIPRIS, Gemini)별 요청 속도/일일 할당량 관리 모듈입니다.
+토큰 버킷 상태와 일일 호출 카운터는 cache_dir 하위 diskcache에 저장되어 Flask 워커/분석 워커 프로세스가 함께 사용하고,
+프로세스 안에서는 토큰을 적게 받은 분석 요청부터 순서를 주는 공정 대기열로 한 요청의 fan-out이 다른 요청을 굶기지 않게 합니다.
+예산이 부족하면 RateLimitExceeded를 발생시키고, 현재 분석 범위에 성능 저하 결정(degradation)을 기록합니다.
+"""
+
+import config
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import diskcache
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# --- 상태 저장소 (MuseSONAR_public의 cache_dir 하위) ---
+RATE_LIMIT_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "rate_limits")
+
+# 예산 부족 사유
+REASON_QUOTA_EXHAUSTED = "quota_exhausted" # 일일 할당량 소진
+REASON_RATE_LIMITED = "rate_limited"       # 최대 대기 시간 안에 토큰을 받지 못함
+
+# 비동기 예산 확보 시 스레드 대기열(공정 대기열)에 앞선 요청이 있을 때 다시 확인하는 간격 (초)
+ASYNC_POLL_INTERVAL_S = 0.05
+
+# API별 성능 저하 결정
+DEGRADE_DECISIONS: Dict[str, str] = {
+    'google': "cache_or_local_only", # 캐시된 검색 결과/로컬 코퍼스만 사용
+    'kipris': "cache_or_local_only",
+    'gemini': "skip_llm",            # LLM 검증 단계 생략
+}
+
+
+class RateLimitExceeded(Exception):
+    """API 호출 예산(토큰 버킷 또는 일일 할당량)이 부족할 때 발생합니다."""
+
+    def __init__(self, api: str, reason: str):
+        super().__init__(f"{api} 호출 예산 부족 ({reason})")
+        self.api: str = api
+        self.reason: str = reason
+
+
+# =============== 분석 요청 범위 (공정 대기열 키 + 성능 저하 기록) ===============
+
+DegradationType = Tuple[str, str, str] # (api, decision, reason)
+
+
+class AnalysisScope:
+    """분석 요청 하나의 식별자와 그 요청에서 내려진 성능 저하 결정 목록"""
+
+    def __init__(self):
+        self.request_key: str = uuid.uuid4().hex
+        self.degradations: List[DegradationType] = []
+        self._lock = threading.Lock()
+
+    def record(self, api: str, reason: str) -> None:
+        entry: DegradationType = (api, DEGRADE_DECISIONS.get(api, "skipped"), reason)
+        with self._lock:
+            if entry not in self.degradations:
+                self.degradations.append(entry)
+
+
+_current_scope: contextvars.ContextVar[Optional[AnalysisScope]] = contextvars.ContextVar('rate_limit_scope', default=None)
+
+@contextlib.contextmanager
+def analysis_scope() -> Iterator[AnalysisScope]:
+    """with 블록 안(같은 컨텍스트를 복사한 스레드/태스크 포함)의 API 호출을 하나의 분석 요청으로 묶습니다."""
+    scope = AnalysisScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+def current_degradations() -> List[DegradationType]:
+    scope: Optional[AnalysisScope] = _current_scope.get()
+    return list(scope.degradations) if scope is not None else []
+
+
+# =============== API별 토큰 버킷 + 일일 할당량 ===============
+
+class ApiRateLimiter:
+    """diskcache에 상태를 둔 토큰 버킷과 일일 카운터, 프로세스 내 공정 대기열을 가진 API 단위 제한기"""
+
+    def __init__(self, api: str, rate_per_s: float, burst: int, daily_quota: int, store: diskcache.Cache):
+        self.api: str = api
+        self.rate_per_s: float = rate_per_s
+        self.burst: int = burst
+        self.daily_quota: int = daily_quota
+        self.store: diskcache.Cache = store
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int, str]] = [] # (요청이 이미 받은 토큰 수, 도착 순번, 요청 키) 힙
+        self._granted: Dict[str, int] = {}
+        self._seq = itertools.count()
+
+    def _quota_key(self) -> str:
+        return f"quota:{self.api}:{datetime.date.today().isoformat()}"
+
+    def used_today(self) -> int:
+        return int(self.store.get(self._quota_key(), default=0))
+
+    def quota_exhausted(self) -> bool:
+        return self.daily_quota > 0 and self.used_today() >= self.daily_quota
+
+    def _try_take_token(self) -> float:
+        """토큰 하나를 가져옵니다. 성공하면 0, 아니면 다음 토큰까지 기다릴 시간(초)을 반환합니다."""
+        bucket_key: str = f"bucket:{self.api}"
+        with self.store.transact():
+            now: float = time.time()
+            tokens, updated_at = self.store.get(bucket_key, default=(float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate_per_s)
+            if tokens >= 1.0:
+                self.store.set(bucket_key, (tokens - 1.0, now))
+                return 0.0
+            self.store.set(bucket_key, (tokens, now))
+        return (1.0 - tokens) / self.rate_per_s
+
+    def _count_call(self) -> bool:
+        """일일 카운터를 1 올립니다. 할당량을 넘으면 되돌리고 False를 반환합니다."""
+        if self.daily_quota <= 0:
+            return True
+        key: str = self._quota_key()
+        with self.store.transact():
+            used: int = int(self.store.get(key, default=0))
+            if used >= self.daily_quota:
+                return False
+            self.store.set(key, used + 1, expire=2 * 86400)
+        return True
+
+    def acquire(self, request_key: str, max_wait_s: float) -> None:
+        """호출 1회 예산을 확보합니다. 확보하지 못하면 RateLimitExceeded를 발생시킵니다."""
+        deadline: float = time.monotonic() + max_wait_s
+        with self._cond:
+            entry: Tuple[int, int, str] = (self._granted.get(request_key, 0), next(self._seq), request_key)
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] is not entry:
+                        # 앞선 요청(토큰을 덜 받은 요청)이 먼저 처리되도록 대기
+                        remaining: float = deadline - time.monotonic()
+                        if remaining <= 0 or not self._cond.wait(timeout=remaining):
+                            raise RateLimitExceeded(self.api, REASON_RATE_LIMITED)
+                        continue
+                    if self.quota_exhausted():
+                        raise RateLimitExceeded(self.api, REASON_QUOTA_EXHAUSTED)
+                    wait_s: float = self._try_take_token()
+                    if wait_s == 0.0:
+                        if not self._count_call():
+                            raise RateLimitExceeded(self.api, REASON_QUOTA_EXHAUSTED)
+                        self._granted[request_key] = self._granted.get(request_key, 0) + 1
+                        return
+                    if time.monotonic() + wait_s > deadline:
+                        raise RateLimitExceeded(self.api, REASON_RATE_LIMITED)
+                    self._cond.wait(timeout=wait_s)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                if not any(key == request_key for _, _, key in self._waiting):
+                    self._granted.pop(request_key, None) # 대기 중인 호출이 없는 요청은 기록 정리
+                self._cond.notify_all()
+
+
+    def try_acquire(self) -> float:
+        """
+        [비차단] 호출 1회 예산을 바로 확보하면 0, 아니면 다시 시도하기까지 기다릴 시간(초)을 반환합니다.
+        스레드 대기열에 기다리는 요청이 있으면 그 요청들에 양보합니다. 일일 할당량 소진 시 RateLimitExceeded
+        """
+        with self._cond:
+            if self._waiting:
+                return ASYNC_POLL_INTERVAL_S
+            if self.quota_exhausted():
+                raise RateLimitExceeded(self.api, REASON_QUOTA_EXHAUSTED)
+            wait_s: float = self._try_take_token()
+            if wait_s > 0.0:
+                return wait_s
+            if not self._count_call():
+                raise RateLimitExceeded(self.api, REASON_QUOTA_EXHAUSTED)
+            return 0.0
+
+
+# --- 모듈 단위 제한기 ---
+_limiters: Dict[str, ApiRateLimiter] = {}
+if config.RATE_LIMIT_ENABLED:
+    try:
+        _store: diskcache.Cache = diskcache.Cache(RATE_LIMIT_DIR)
+        for _api, (_rate, _burst, _quota) in config.RATE_LIMITS.items():
+            _limiters[_api] = ApiRateLimiter(_api, _rate, _burst, _quota, _store)
+        logging.info(f"API 요청 속도 제한 초기화 완료: {config.RATE_LIMITS}")
+    except Exception as e:
+        logging.error(f"API 요청 속도 제한 초기화 실패! 제한 없이 호출합니다. 오류: {e}")
+        _limiters = {}
+
+
+# API 호출 예산 확보 함수
+def acquire(api: str, max_wait_s: float = config.RATE_LIMIT_MAX_WAIT_S) -> None:
+    """
+    api 호출 1회 예산을 확보합니다. 부족하면 현재 분석 범위에 성능 저하 결정을 기록하고 RateLimitExceeded를 발생시킵니다.
+    제한기가 없는 API(또는 비활성화 상태)는 바로 통과합니다.
+    """
+    limiter: Optional[ApiRateLimiter] = _limiters.get(api)
+    if limiter is None:
+        return
+    scope: Optional[AnalysisScope] = _current_scope.get()
+    request_key: str = scope.request_key if scope is not None else f"thread:{threading.get_ident()}"
+    try:
+        limiter.acquire(request_key, max_wait_s)
+    except RateLimitExceeded as e:
+        _record_exceeded(scope, e)
+        raise
+
+async def acquire_async(api: str, max_wait_s: float = config.RATE_LIMIT_MAX_WAIT_S) -> None:
+    """
+    [이벤트 루프 안 코루틴용] acquire와 같지만 토큰을 기다리는 동안 스레드를 점유하지 않고 asyncio.sleep으로 대기합니다.
+    (공용 루프의 기본 스레드 풀에서 run_sync로 기다리는 호출자가 있을 때 to_thread(acquire)를 쓰면 스레드 풀이 고갈되어 교착됨)
+    """
+    limiter: Optional[ApiRateLimiter] = _limiters.get(api)
+    if limiter is None:
+        return
+    deadline: float = time.monotonic() + max_wait_s
+    try:
+        while True:
+            wait_s: float = limiter.try_acquire()
+            if wait_s == 0.0:
+                return
+            if time.monotonic() + wait_s > deadline:
+                raise RateLimitExceeded(api, REASON_RATE_LIMITED)
+            await asyncio.sleep(wait_s)
+    except RateLimitExceeded as e:
+        _record_exceeded(_current_scope.get(), e)
+        raise
+
+def _record_exceeded(scope: Optional[AnalysisScope], e: RateLimitExceeded) -> None:
+    logging.warning(f"{e.api} 호출 예산 부족 ({e.reason}): 성능 저하 경로 '{DEGRADE_DECISIONS.get(e.api)}' 사용")
+    if scope is not None:
+        scope.record(e.api, e.reason)
+
+# 일일 할당량 소진 여부 확인 함수
+def is_exhausted(api: str) -> bool:
+    limiter: Optional[ApiRateLimiter] = _limiters.get(api)
+    return limiter is not None and limiter.quota_exhausted()
+
+# 현재 분석 범위에 성능 저하 결정을 기록하는 함수 (호출 전에 소진을 확인하고 생략한 경우)
+def record_degradation(api: str, reason: str) -> None:
+    scope: Optional[AnalysisScope] = _current_scope.get()
+    if scope is not None:
+        scope.record(api, reason)
@@ -0,0 +1,205 @@
+# resources.py
+
+"""
+무거운 공용 자원(diskcache, KoNLPy Okt(JVM), SBERT 모델, Gemini 모델)의 지연 로딩 레지스트리입니다.
+모듈 임포트 시에는 아무것도 초기화하지 않고, 처음 사용할 때(또는 warm_up 호출 시) 한 번만 초기화하며
+구성 요소별 초기화 시간을 기록합니다.
+"""
+
+import config
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from cache_keys import build_key
+from layered_cache import LayeredCache, MISSING
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# --- 공용 캐시 디렉토리 ---
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache_dir")
+
+
+class _MemoizeCall:
+    """실행 중인 memoize 함수 호출 하나의 저장 여부 (같은 컨텍스트를 복사한 스레드/태스크에서도 같은 객체를 봄)"""
+
+    def __init__(self):
+        self.skip_store: bool = False
+
+_current_memoize_call: contextvars.ContextVar[Optional[_MemoizeCall]] = contextvars.ContextVar('memoize_call', default=None)
+
+
+class LazyResource:
+    """처음 get() 호출 시 factory로 한 번만 초기화되는 자원. 초기화 실패 시 None을 반환하고 오류를 기록합니다."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name: str = name
+        self.factory: Callable[[], Any] = factory
+        self.init_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._value: Any = None
+        self._loaded: bool = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def available(self) -> bool:
+        return self._loaded and self._value is not None
+
+    def get(self) -> Any:
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                logging.info(f"자원 초기화 시작: {self.name}")
+                started: float = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    logging.error(f"자원 초기화 실패: {self.name}. 해당 기능이 비활성화됩니다. 오류: {e}", exc_info=True)
+                    self._value = None
+                    self.error = str(e)
+                self.init_seconds = time.perf_counter() - started
+                self._loaded = True
+                logging.info(f"자원 초기화 완료: {self.name} ({self.init_seconds:.2f}s, pid={os.getpid()})")
+        return self._value
+
+
+class ResourceRegistry:
+    """이름으로 등록된 LazyResource 모음"""
+
+    def __init__(self):
+        self._resources: Dict[str, LazyResource] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._resources[name] = LazyResource(name, factory)
+
+    def get(self, name: str) -> Any:
+        return self._resources[name].get()
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """지정한(없으면 전체) 자원을 미리 초기화하고 구성 요소별 초기화 시간(초)을 반환합니다."""
+        targets = list(names) if names is not None else list(self._resources)
+        logging.info(f"자원 사전 로딩 시작: {targets}")
+        for name in targets:
+            self.get(name)
+        timings: Dict[str, Optional[float]] = {name: self._resources[name].init_seconds for name in targets}
+        logging.info("자원 사전 로딩 완료: %s", ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items() if seconds is not None))
+        return timings
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """자원별 초기화 여부, 초기화 시간, 오류 (헬스 체크용, 초기화를 유발하지 않음)"""
+        return {
+            name: {'loaded': resource.loaded, 'available': resource.available, 'init_seconds': resource.init_seconds, 'error': resource.error}
+            for name, resource in self._resources.items()
+        }
+
+    def memoize(self, namespace: str, key: Optional[Callable[..., str]] = None, expire: Optional[float] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        2단 캐시(layered_cache)를 쓰는 메모이즈 데코레이터. 메모리 계층에서 찾으면 디스크를 건드리지 않습니다.
+        key: 함수와 같은 인자를 받아 캐시 키를 반환하는 함수 (cache_keys 규칙). 없으면 기본값을 채운 모든 인자를
+        cache_keys.build_key에 넣으므로, 객체 인자가 있는 함수는 키에 쓸 값을 고르는 key 함수를 지정해야 합니다.
+        보관 시간은 expire가 없으면 네임스페이스 TTL(config.CACHE_NAMESPACE_TTLS)을 따르고,
+        계층별 히트/미스와 조회 시간은 네임스페이스 단위로 telemetry 지표에 기록됩니다.
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            signature = inspect.signature(func)
+
+            def bound_arguments_key(*args: Any, **kwargs: Any) -> str:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return build_key(namespace, *bound.arguments.values())
+
+            cache_key: Callable[..., str] = key or bound_arguments_key
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                cache_key_value: str = cache_key(*args, **kwargs)
+                result = cache_tiers.get(namespace, cache_key_value, MISSING)
+                if result is MISSING:
+                    call = _MemoizeCall()
+                    token = _current_memoize_call.set(call)
+                    try:
+                        result = func(*args, **kwargs)
+                    finally:
+                        _current_memoize_call.reset(token)
+                    if call.skip_store:
+                        self.skip_memoize_store() # 부분 결과를 쓴 바깥 memoize 호출도 저장하지 않음
+                    else:
+                        cache_tiers.set(namespace, cache_key_value, result, expire)
+                return result
+
+            wrapper.__cache_key__ = cache_key
+            return wrapper
+        return decorator
+
+    def skip_memoize_store(self) -> None:
+        """
+        실행 중인 memoize 함수의 이번 결과를 캐시에 저장하지 않도록 표시합니다. (일부 요청이 실패한 부분 결과 등)
+        함수 안에서 호출한 코루틴/스레드에서 불러도 적용되며, memoize 함수 밖에서 부르면 아무 일도 하지 않습니다.
+        """
+        call: Optional[_MemoizeCall] = _current_memoize_call.get()
+        if call is not None:
+            call.skip_store = True
+
+
+# =============== 자원 팩토리 ===============
+
+def _create_cache() -> Any:
+    import diskcache
+    cache = diskcache.Cache(CACHE_DIR)
+    logging.info(f"DiskCache 초기화 완료. 캐시 디렉토리: {CACHE_DIR}")
+    return cache
+
+def _create_okt() -> Any:
+    try:
+        from konlpy.tag import Okt
+    except ImportError:
+        logging.warning("konlpy 라이브러리를 찾을 수 없습니다. 'pip install konlpy JPype1'으로 설치해주세요. 키워드 추출 기능이 비활성화됩니다.")
+        return None
+    okt = Okt() # JVM 시작
+    logging.info("KoNLPy Okt 형태소 분석기 로딩 완료.")
+    return okt
+
+def _create_sbert() -> Any:
+    """config.SBERT_BACKEND로 선택한 추론 백엔드(float32/int8 torch, ONNX)로 SBERT 모델을 로딩합니다."""
+    from embedding_backends import load_sbert
+    return load_sbert()
+
+def _create_encoder() -> Any:
+    """SBERT 모델을 요청 간 마이크로 배칭 인코더로 감쌉니다. (배칭 비활성화 시 모델 그대로)"""
+    sbert_model = registry.get('sbert')
+    if sbert_model is None or not config.ENCODER_BATCHING_ENABLED:
+        return sbert_model
+    from encoder_service import BatchingEncoder
+    return BatchingEncoder(sbert_model, model_name=sbert_model.model_name)
+
+def _create_gemini() -> Any:
+    from dotenv import load_dotenv
+    load_dotenv()
+    google_api_key_gemini: Optional[str] = os.getenv('GOOGLE_API_KEY_GEMINI')
+    if not google_api_key_gemini:
+        logging.warning("환경 변수 'GOOGLE_API_KEY_GEMINI' 없음. LLM 검증 비활성화.")
+        return None
+    import google.generativeai as genai
+    genai.configure(api_key=google_api_key_gemini)
+    model_name: str = os.getenv('GEMINI_MODEL_NAME', 'models/gemini-2.0-flash')
+    logging.info(f"사용할 Gemini 모델: {model_name} (환경 변수 'GEMINI_MODEL_NAME' 또는 기본값)")
+    return genai.GenerativeModel(model_name)
+
+
+# --- 모듈 단위 레지스트리 ---
+registry = ResourceRegistry()
+registry.register('cache', _create_cache)
+registry.register('okt', _create_okt)
+registry.register('sbert', _create_sbert)
+registry.register('encoder', _create_encoder)
+registry.register('gemini', _create_gemini)
+
+# --- 2단 캐시 (메모리 계층 + 'cache' 자원 디스크 계층) ---
+cache_tiers = LayeredCache(lambda: registry.get('cache'))
@@ -0,0 +1,128 @@
+# result_cache.py
+
+"""
+analyze_idea 전체 결과(AnalysisResultModel)를 저장하는 캐시입니다.
+키는 정규화된 아이디어 텍스트 + 설정 지문(임계값, PROMPT_VERSION, 모델명)이며, TTL과 명시적 무효화를 지원합니다.
+"""
+
+import config
+import argparse
+import diskcache
+import hashlib
+import logging
+import os
+import re
+import unicodedata
+from pydantic_models import AnalysisResultModel
+from typing import Optional, Tuple
+
+# --- 캐시 디렉토리 (MuseSONAR_public의 cache_dir 하위) ---
+RESULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "results")
+
+# 분석 결과에 영향을 주는 설정 항목 (값이 바뀌면 캐시 키가 달라짐)
+FINGERPRINT_CONFIG_KEYS: Tuple[str, ...] = (
+    'RELEVANCE_THRESHOLD', 'HIGH_SIMILARITY_THRESHOLD', 'JHGAN_THRESHOLD_IGNORE_LLM', 'LLM_YES_THRESHOLD_LOW',
+    'KIPRIS_ADVANCED_SEARCH_ROWS', 'KIPRIS_WORD_SEARCH_ROWS', 'KIPRIS_MAX_PAGES', 'MAX_KIPRIS_KEYWORDS',
+    'MAX_LLM_VERIFICATION_TARGETS', 'PROMPT_VERSION', 'MAX_EXCERPT', 'KW_HINTS',
+    'LLM_VERIFICATION_PROMPT_TEMPLATE', 'LLM_BATCH_VERIFICATION_PROMPT_TEMPLATE', 'SBERT_MODEL_NAME',
+    'QUERY_EXPANSION_ENABLED', 'QUERY_EXPANSION_MAX_GOOGLE_QUERIES', 'QUERY_EXPANSION_MAX_KIPRIS_QUERIES', 'QUERY_EXPANSION_SUBSET_SIZE',
+    'QUERY_EXPANSION_ROMANIZATION_ENABLED', 'KEYWORD_EXTRACTOR_BACKEND', 'NEAR_DUPLICATE_ENABLED', 'NEAR_DUPLICATE_SHINGLE_SIZE', 'NEAR_DUPLICATE_MAX_HAMMING',
+)
+
+
+# 아이디어 텍스트 정규화 함수
+def normalize_idea_text(text: str) -> str:
+    """대소문자, 구두점, 공백 차이를 무시하도록 아이디어 텍스트를 정규화합니다."""
+    normalized: str = unicodedata.normalize('NFKC', text).lower()
+    normalized = re.sub(r'[^\w\s]', ' ', normalized)
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+# 설정 지문 생성 함수
+def config_fingerprint(sbert_model_name: str, gemini_model_name: Optional[str]) -> str:
+    """분석 결과에 영향을 주는 설정값과 모델명으로 짧은 지문(해시)을 만듭니다."""
+    parts = [f"{name}={getattr(config, name, None)!r}" for name in FINGERPRINT_CONFIG_KEYS]
+    parts.append(f"sbert={sbert_model_name}")
+    parts.append(f"gemini={gemini_model_name}")
+    return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()[:16]
+
+# 텍스트 해시 함수 (무효화용 태그)
+def idea_text_tag(idea_text: str) -> str:
+    return hashlib.sha1(normalize_idea_text(idea_text).encode('utf-8')).hexdigest()
+
+# 캐시 키 생성 함수
+def make_result_key(idea_text: str, sbert_model_name: str, gemini_model_name: Optional[str]) -> str:
+    return f"result:{config_fingerprint(sbert_model_name, gemini_model_name)}:{idea_text_tag(idea_text)}"
+
+
+class ResultCache:
+    """diskcache 기반 분석 결과 저장소. 항목마다 아이디어 텍스트 해시를 태그로 달아 텍스트 단위 무효화를 지원합니다."""
+
+    def __init__(self, directory: str = RESULT_CACHE_DIR, ttl_s: int = config.RESULT_CACHE_TTL_S):
+        self.ttl_s: int = ttl_s
+        self.cache: diskcache.Cache = diskcache.Cache(directory, tag_index=True)
+        logging.info(f"분석 결과 캐시 초기화 완료. 디렉토리: {directory}, TTL={ttl_s}s")
+
+    def get(self, key: str) -> Optional[AnalysisResultModel]:
+        raw: Optional[str] = self.cache.get(key, default=None)
+        if raw is None:
+            return None
+        try:
+            return AnalysisResultModel.model_validate_json(raw)
+        except Exception as e:
+            logging.warning(f"캐시된 분석 결과 역직렬화 실패. 항목 삭제: key='{key}', 오류: {e}")
+            self.cache.delete(key)
+            return None
+
+    def set(self, key: str, idea_text: str, result: AnalysisResultModel) -> None:
+        self.cache.set(key, result.model_dump_json(), expire=self.ttl_s, tag=idea_text_tag(idea_text))
+
+    def invalidate(self, idea_text: Optional[str] = None) -> int:
+        """idea_text가 주어지면 해당 아이디어(정규화 기준)의 결과만, 없으면 전체 결과를 삭제합니다. 삭제 개수 반환"""
+        if idea_text is None:
+            return self.cache.clear()
+        return self.cache.evict(idea_text_tag(idea_text))
+
+
+# 제한 시간 초과로 건너뛴 LLM 검증의 reason 표식 (MuseSONAR_public.verify_hits_concurrently 메시지와 일치)
+DEADLINE_SKIP_MARKER: str = "제한 시간"
+
+# 캐시 저장 가능 여부 판단 함수
+def is_cacheable(result: AnalysisResultModel) -> bool:
+    """오류 결과, 성능 저하 결과, LLM 검증이 오류/제한 시간 초과로 끝난 부분 결과는 캐시하지 않습니다."""
+    if result.error:
+        return False
+    if result.metrics is not None and result.metrics.degradations:
+        return False # 호출 예산 부족으로 검색/LLM 단계를 줄인 결과
+    for item in result.top_similar_results:
+        verification = item.llm_verification
+        if verification is None:
+            continue
+        if verification.status == "Error":
+            return False
+        if verification.status == "Skipped" and DEADLINE_SKIP_MARKER in (verification.reason or ""):
+            return False
+    return True
+
+
+# --- 모듈 단위 결과 캐시 인스턴스 ---
+result_cache: Optional[ResultCache] = None
+if config.RESULT_CACHE_ENABLED:
+    try:
+        result_cache = ResultCache()
+    except Exception as e:
+        logging.error(f"분석 결과 캐시 초기화 실패! 결과 캐시 없이 분석합니다. 오류: {e}")
+        result_cache = None
+
+
+# --- 명시적 무효화 CLI ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MuseSonar 분석 결과 캐시 무효화")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--idea', help="해당 아이디어 텍스트(정규화 기준)의 캐시된 결과만 삭제")
+    group.add_argument('--all', action='store_true', help="캐시된 분석 결과 전체 삭제")
+    args = parser.parse_args()
+
+    if result_cache is None:
+        parser.error("분석 결과 캐시가 비활성화되어 있거나 초기화에 실패했습니다.")
+    removed: int = result_cache.invalidate(None if args.all else args.idea)
+    print(f"삭제된 분석 결과: {removed}개")
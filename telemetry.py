@@ -0,0 +1,355 @@
+# telemetry.py
+
+"""
+분석 파이프라인 단계별 계측(span)과 Prometheus 텍스트 형식 지표 모듈입니다.
+- span(name, **attributes): 단계 소요 시간을 히스토그램에 기록하고, 요청 범위(request_timings) 안이면 요청별 단계 시간 목록에도 추가
+- Counter/Histogram: 프로세스 내 집계. 웹/작업 큐 워커 프로세스는 publish()로 cache_dir 하위 diskcache에 스냅샷을 남기고
+  (분석 요청이 끝날 때 config.METRICS_PUBLISH_INTERVAL_S 간격으로, 작업 큐 워커는 작업마다),
+  /metrics(render_prometheus)가 어느 웹 프로세스에서 응답하든 모든 프로세스의 지표를 합산하여 내보냅니다.
+  종료된 프로세스의 스냅샷은 누적 합계(retired)로 옮겨 카운터가 줄어들지 않도록 합니다.
+"""
+
+import config
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# --- 프로세스별 지표 스냅샷 저장소 (MuseSONAR_public의 cache_dir 하위) ---
+METRICS_DIR = os.path.join(os.path.dirname(__file__), "cache_dir", "metrics")
+SNAPSHOT_KEY_PREFIX = "proc"        # 실행 중인 프로세스 스냅샷 키: proc:<pid>:<프로세스 토큰>
+RETIRED_KEY = "retired"             # 종료된 프로세스 스냅샷을 합산한 누적 합계 키
+
+LabelValuesType = Tuple[str, ...]
+MetricSnapshotType = Dict[str, Any] # type, help, labels, buckets(히스토그램), values({레이블 값 튜플: 값})
+INF_BUCKET_LABEL = 'le="+Inf"'
+
+
+class Counter:
+    """레이블 조합별 누적 카운터"""
+
+    kind: str = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.labels: Tuple[str, ...] = labels
+        self._values: Dict[LabelValuesType, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key: LabelValuesType = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> MetricSnapshotType:
+        with self._lock:
+            return {'type': self.kind, 'help': self.help_text, 'labels': self.labels, 'values': dict(self._values)}
+
+
+class Histogram:
+    """레이블 조합별 누적 버킷 히스토그램 (버킷별 개수, 합계, 관측 수)"""
+
+    kind: str = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = config.METRICS_LATENCY_BUCKETS):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.labels: Tuple[str, ...] = labels
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._values: Dict[LabelValuesType, List[float]] = {} # [버킷별 개수..., 합계, 관측 수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key: LabelValuesType = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            row: Optional[List[float]] = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1 # 누적 버킷이 아닌 구간 개수로 저장 (출력 시 누적)
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def snapshot(self) -> MetricSnapshotType:
+        with self._lock:
+            return {'type': self.kind, 'help': self.help_text, 'labels': self.labels, 'buckets': self.buckets,
+                    'values': {key: list(row) for key, row in self._values.items()}}
+
+
+class MetricsRegistry:
+    """이름으로 등록된 지표 모음. 여러 프로세스의 스냅샷을 합산해 Prometheus 텍스트 형식으로 출력합니다."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = config.METRICS_LATENCY_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, labels, buckets))
+
+    def snapshot(self) -> Dict[str, MetricSnapshotType]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self) -> None:
+        """모든 지표 값을 비웁니다. (fork한 자식 프로세스가 부모의 값을 이중 집계하지 않도록)"""
+        for metric in self._metrics.values():
+            with metric._lock:
+                metric._values.clear()
+
+    @staticmethod
+    def merge(snapshots: List[Dict[str, MetricSnapshotType]]) -> Dict[str, MetricSnapshotType]:
+        """프로세스별 스냅샷을 지표 이름/레이블 값 기준으로 더합니다."""
+        merged: Dict[str, MetricSnapshotType] = {}
+        for snapshot in snapshots:
+            for name, metric in snapshot.items():
+                target: MetricSnapshotType = merged.setdefault(name, dict(metric, values={}))
+                for key, value in metric['values'].items():
+                    if metric['type'] == 'counter':
+                        target['values'][key] = target['values'].get(key, 0.0) + value
+                    else:
+                        current: Optional[List[float]] = target['values'].get(key)
+                        target['values'][key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+        return merged
+
+    @staticmethod
+    def render(merged: Dict[str, MetricSnapshotType]) -> str:
+        lines: List[str] = []
+        for name in sorted(merged):
+            metric: MetricSnapshotType = merged[name]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key in sorted(metric['values']):
+                label_pairs: List[str] = [f'{label}="{_escape(value)}"' for label, value in zip(metric['labels'], key)]
+                if metric['type'] == 'counter':
+                    lines.append(f"{name}{_format_labels(label_pairs)} {_format_number(metric['values'][key])}")
+                    continue
+                row: List[float] = metric['values'][key]
+                cumulative: float = 0.0
+                for bound, count in zip(metric['buckets'], row):
+                    cumulative += count
+                    bucket_label: str = 'le="' + _format_number(bound) + '"'
+                    lines.append(f"{name}_bucket{_format_labels(label_pairs + [bucket_label])} {_format_number(cumulative)}")
+                lines.append(f"{name}_bucket{_format_labels(label_pairs + [INF_BUCKET_LABEL])} {_format_number(row[-1])}")
+                lines.append(f"{name}_sum{_format_labels(label_pairs)} {_format_number(row[-2])}")
+                lines.append(f"{name}_count{_format_labels(label_pairs)} {_format_number(row[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_pairs: List[str]) -> str:
+    return "{" + ",".join(label_pairs) + "}" if label_pairs else ""
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# --- 모듈 단위 지표 ---
+metrics = MetricsRegistry()
+STAGE_SECONDS: Histogram = metrics.histogram('musesonar_stage_duration_seconds', "분석 파이프라인 단계별 소요 시간", ('stage', 'status'))
+SEARCH_REQUESTS: Counter = metrics.counter('musesonar_search_requests_total', "검색 백엔드 호출 수 (결과 상태별)", ('backend', 'status'))
+CACHE_REQUESTS: Counter = metrics.counter('musesonar_cache_requests_total', "캐시 조회 수 (함수/캐시별 히트·미스)", ('function', 'result'))
+CACHE_LOOKUP_SECONDS: Histogram = metrics.histogram('musesonar_cache_lookup_seconds', "2단 캐시 조회 시간 (네임스페이스/응답 계층별: memory, disk, miss)", ('namespace', 'tier'), config.METRICS_CACHE_LOOKUP_BUCKETS)
+EMBEDDING_BATCH_SIZE: Histogram = metrics.histogram('musesonar_embedding_batch_size', "SBERT 인코딩 배치 크기 (텍스트 수)", ('source',), config.METRICS_BATCH_SIZE_BUCKETS)
+LLM_CALLS: Counter = metrics.counter('musesonar_llm_calls_total', "LLM 검증 호출 수 (모드/결과 상태별)", ('mode', 'status'))
+ANALYSES: Counter = metrics.counter('musesonar_analyses_total', "analyze_idea 실행 수 (결과별)", ('outcome',))
+
+
+# =============== 단계 계측 (span) ===============
+
+class Span:
+    """진행 중인 단계 하나. 실행 중 set()으로 속성(배치 크기, 결과 수 등)을 덧붙일 수 있습니다."""
+
+    __slots__ = ('name', 'attributes', 'status', 'started')
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name: str = name
+        self.attributes: Dict[str, Any] = attributes
+        self.status: str = 'ok'
+        self.started: float = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class RequestTimings:
+    """분석 요청 하나의 단계 시간 기록 (LLM 검증 스레드 등 복사된 컨텍스트에서도 같은 객체에 추가)"""
+
+    def __init__(self):
+        self.started: float = time.perf_counter()
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span, duration_s: float) -> None:
+        record: Dict[str, Any] = {
+            'stage': span.name, 'start_ms': round((span.started - self.started) * 1000, 2),
+            'duration_ms': round(duration_s * 1000, 2), 'status': span.status, 'attributes': dict(span.attributes)
+        }
+        with self._lock:
+            self.records.append(record)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return sorted(self.records, key=lambda record: record['start_ms'])
+
+
+_current_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar('musesonar_request_timings', default=None)
+
+@contextlib.contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    """분석 요청 하나의 단계 시간 수집 범위. 이미 범위 안이면 바깥 범위를 그대로 사용합니다."""
+    current: Optional[RequestTimings] = _current_timings.get()
+    if current is not None:
+        yield current
+        return
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+        _maybe_publish() # 웹 프로세스도 /metrics 합산 대상이 되도록 주기적으로 스냅샷 기록
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """단계 소요 시간을 stage 히스토그램과 (요청 범위 안이면) 요청별 단계 시간 목록에 기록합니다. 예외는 status='error'로 기록 후 전달"""
+    current = Span(name, attributes)
+    try:
+        yield current
+    except BaseException:
+        current.status = 'error'
+        raise
+    finally:
+        duration_s: float = time.perf_counter() - current.started
+        if config.METRICS_ENABLED:
+            STAGE_SECONDS.observe(duration_s, stage=name, status=current.status)
+        timings: Optional[RequestTimings] = _current_timings.get()
+        if timings is not None:
+            timings.add(current, duration_s)
+        logging.debug("span stage=%s status=%s duration_ms=%.1f %s", name, current.status, duration_s * 1000, current.attributes)
+
+
+# =============== 지표 기록 함수 ===============
+
+def record_search(backend: str, status: str) -> None:
+    if config.METRICS_ENABLED:
+        SEARCH_REQUESTS.inc(backend=backend, status=status)
+
+def record_cache(function: str, hit: bool, count: int = 1) -> None:
+    if config.METRICS_ENABLED and count > 0:
+        CACHE_REQUESTS.inc(count, function=function, result='hit' if hit else 'miss')
+
+def record_cache_lookup(namespace: str, tier: str, seconds: float) -> None:
+    """2단 캐시(layered_cache) 조회 1건. tier: 'memory'/'disk'(히트 계층) 또는 'miss'"""
+    if config.METRICS_ENABLED:
+        CACHE_REQUESTS.inc(function=namespace, result='miss' if tier == 'miss' else f"hit_{tier}")
+        CACHE_LOOKUP_SECONDS.observe(seconds, namespace=namespace, tier=tier)
+
+def record_embedding_batch(source: str, size: int) -> None:
+    if config.METRICS_ENABLED:
+        EMBEDDING_BATCH_SIZE.observe(size, source=source)
+
+def record_llm_call(mode: str, status: str) -> None:
+    if config.METRICS_ENABLED:
+        LLM_CALLS.inc(mode=mode, status=status)
+
+def record_analysis(outcome: str) -> None:
+    if config.METRICS_ENABLED:
+        ANALYSES.inc(outcome=outcome)
+
+
+# =============== 프로세스 간 공유 (웹/작업 큐 워커 프로세스 -> /metrics) ===============
+
+class _PublishState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.store: Any = None
+        self.key: str = f"{SNAPSHOT_KEY_PREFIX}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.last_publish: float = 0.0
+
+_publish_state = _PublishState()
+
+def _reset_after_fork() -> None:
+    """[fork 직후 자식 프로세스] 부모에게서 복사된 지표 값, 저장소 연결, 스냅샷 키를 버립니다."""
+    global _publish_state
+    _publish_state = _PublishState()
+    metrics.reset()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _get_store() -> Any:
+    state: _PublishState = _publish_state
+    if state.store is None:
+        with state.lock:
+            if state.store is None:
+                import diskcache
+                state.store = diskcache.Cache(METRICS_DIR)
+    return state.store
+
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt': # Windows의 os.kill은 신호 0도 프로세스를 종료시키므로 확인하지 않음
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def publish() -> None:
+    """현재 프로세스의 지표 스냅샷을 공유 저장소에 기록합니다. (값은 프로세스 시작 이후 누적치, 만료 없음)"""
+    if not config.METRICS_ENABLED:
+        return
+    state: _PublishState = _publish_state
+    state.last_publish = time.monotonic()
+    try:
+        _get_store().set(state.key, metrics.snapshot())
+    except Exception as e:
+        logging.warning(f"지표 스냅샷 저장 실패: {e}")
+
+def _maybe_publish() -> None:
+    if config.METRICS_ENABLED and time.monotonic() - _publish_state.last_publish >= config.METRICS_PUBLISH_INTERVAL_S:
+        publish()
+
+def _retire(store: Any, key: str) -> None:
+    """종료된 프로세스의 스냅샷을 누적 합계에 더하고 지웁니다. (여러 웹 프로세스가 동시에 처리해도 한 번만 합산)"""
+    with store.transact():
+        snapshot: Optional[Dict[str, MetricSnapshotType]] = store.get(key, default=None)
+        if snapshot is None:
+            return
+        retired: Dict[str, MetricSnapshotType] = store.get(RETIRED_KEY, default=None) or {}
+        store.set(RETIRED_KEY, MetricsRegistry.merge([retired, snapshot]))
+        store.delete(key)
+
+def render_prometheus() -> str:
+    """현재 프로세스 지표 + 다른 프로세스가 publish한 스냅샷 + 종료된 프로세스 누적 합계를 합산한 Prometheus 텍스트 형식 문자열"""
+    publish() # 응답한 프로세스의 최신 값도 저장소에 남겨 다른 프로세스의 응답과 같은 합계가 되도록
+    snapshots: List[Dict[str, MetricSnapshotType]] = [metrics.snapshot()]
+    own_key: str = _publish_state.key
+    try:
+        store = _get_store()
+        for key in list(store.iterkeys()):
+            if not isinstance(key, str) or not key.startswith(SNAPSHOT_KEY_PREFIX + ":") or key == own_key:
+                continue
+            if not _process_alive(int(key.split(':')[1])):
+                _retire(store, key)
+        with store.transact(): # 다른 프로세스의 _retire와 섞이지 않게 (같은 값을 스냅샷과 누적 합계에서 두 번 읽지 않도록)
+            for key in list(store.iterkeys()):
+                if key != own_key:
+                    snapshot: Optional[Dict[str, MetricSnapshotType]] = store.get(key, default=None)
+                    if snapshot is not None:
+                        snapshots.append(snapshot)
+    except Exception as e:
+        logging.warning(f"다른 프로세스 지표 스냅샷 조회 실패. 현재 프로세스 지표만 출력합니다: {e}")
+    return MetricsRegistry.render(MetricsRegistry.merge(snapshots))
@@ -0,0 +1,28 @@
+# tests/conftest.py
+
+"""테스트 공용 설정: 저장소 루트를 임포트 경로에 추가하고, 임시 디렉토리의 2단 캐시 fixture를 제공합니다."""
+
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    import diskcache
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def cache_tiers(disk_cache, monkeypatch):
+    """임시 diskcache를 디스크 계층으로 쓰는 LayeredCache를 resources.cache_tiers 자리에 넣습니다. (memoize가 사용)"""
+    import resources
+    from layered_cache import LayeredCache
+    tiers = LayeredCache(lambda: disk_cache, memory_max_entries=16, memory_ttl_s=60.0)
+    monkeypatch.setattr(resources, 'cache_tiers', tiers)
+    return tiers
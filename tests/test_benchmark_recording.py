@@ -0,0 +1,19 @@
+# tests/test_benchmark_recording.py
+
+from urllib.parse import urlencode
+from benchmarks.recording import normalize_query, request_key
+
+KIPRIS_URL = "https://plus.kipris.or.kr/kipris/getWordSearch"
+
+
+def test_recorded_and_replayed_keys_match_with_blank_params():
+    params = {'word': '드론 택시', 'pageNo': 2, 'patent': '', 'ServiceKey': 'secret'}
+    served_path = "/kipris/getWordSearch?" + urlencode(params)
+    assert request_key(KIPRIS_URL, params) == request_key(served_path)
+
+def test_blank_params_are_part_of_the_key():
+    assert normalize_query(KIPRIS_URL, {'word': '드론', 'patent': ''}) == {'word': '드론', 'patent': ''}
+    assert request_key(KIPRIS_URL, {'word': '드론', 'patent': ''}) != request_key(KIPRIS_URL, {'word': '드론'})
+
+def test_secret_params_do_not_change_the_key():
+    assert request_key(KIPRIS_URL, {'word': '드론', 'ServiceKey': 'a'}) == request_key(KIPRIS_URL, {'word': '드론', 'ServiceKey': 'b'})
@@ -0,0 +1,46 @@
+# tests/test_cache_keys.py
+
+import re
+import pytest
+import config
+from cache_keys import build_key, key_namespace, llm_verdict_key, model_name_of, normalize_key_text
+
+
+class FakeModel:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+
+def test_normalize_key_text_ignores_width_and_spacing():
+    assert normalize_key_text("  드론\t택시\n 호출 ") == "드론 택시 호출"
+    assert normalize_key_text("ＡＩ　드론") == "AI 드론" # 전각 문자/공백 (NFKC)
+
+def test_build_key_format_and_stability():
+    key = build_key('google_search', '드론 택시', 10)
+    assert re.fullmatch(r"google_search:[0-9a-f]{32}", key)
+    assert key == build_key('google_search', ' 드론   택시 ', 10) # 재시작/프로세스와 무관하게 같은 키
+    assert key != build_key('kipris_search', '드론 택시', 10)
+    assert key != build_key('google_search', '드론 택시', '10')
+    assert key != build_key('google_search', '드론 택시')
+
+def test_build_key_dict_parts_are_order_independent():
+    assert build_key('kipris_page', 'getWordSearch', {'word': 'a', 'year': '0'}, 1) == \
+           build_key('kipris_page', 'getWordSearch', {'year': '0', 'word': 'a'}, 1)
+
+def test_build_key_rejects_objects():
+    with pytest.raises(TypeError):
+        build_key('llm_verdict', FakeModel('gemini'))
+
+def test_key_namespace():
+    assert key_namespace(build_key('llm_verdict', 'x')) == 'llm_verdict'
+    assert key_namespace(('legacy', 'tuple')) is None
+    assert key_namespace('no-namespace') is None
+
+def test_llm_verdict_key_uses_model_name_not_object():
+    first = llm_verdict_key("아이디어", "발췌문", "Google Search", FakeModel("gemini-pro"))
+    assert first == llm_verdict_key(" 아이디어 ", "발췌문", "Google Search", FakeModel("gemini-pro"))
+    assert first != llm_verdict_key("아이디어", "발췌문", "Google Search", FakeModel("gemini-flash"))
+    assert first != llm_verdict_key("아이디어", "발췌문", "KIPRIS Patent", FakeModel("gemini-pro"))
+    assert first != llm_verdict_key("아이디어", "발췌문", "Google Search", FakeModel("gemini-pro"), prompt_ver=config.PROMPT_VERSION + "-next")
+    assert model_name_of(None) is None
+    assert llm_verdict_key("아이디어", "발췌문", "Google Search", None).startswith("llm_verdict:")
@@ -0,0 +1,70 @@
+# tests/test_circuit_breaker.py
+
+import time
+import diskcache
+import pytest
+import circuit_breaker
+import rate_limiter
+from circuit_breaker import CircuitBreaker, CircuitOpenError, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, REASON_CIRCUIT_OPEN
+
+RECOVERY_S = 0.05
+
+
+@pytest.fixture
+def store(tmp_path):
+    cache = diskcache.Cache(str(tmp_path / "circuit_breakers"))
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def breaker(store):
+    return CircuitBreaker('test', store, failure_threshold=2, recovery_s=RECOVERY_S)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure("timeout")
+    assert breaker.allow() and breaker.snapshot()['state'] == STATE_CLOSED
+    breaker.record_failure("timeout")
+    assert breaker.snapshot()['state'] == STATE_OPEN
+    assert not breaker.allow()
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure("timeout")
+    breaker.record_success()
+    breaker.record_failure("timeout")
+    assert breaker.snapshot()['state'] == STATE_CLOSED
+
+def test_half_open_allows_one_probe_then_closes_on_success(breaker):
+    breaker.record_failure("e")
+    breaker.record_failure("e")
+    time.sleep(RECOVERY_S * 1.5)
+    assert breaker.allow() # 시험 요청
+    assert breaker.snapshot()['state'] == STATE_HALF_OPEN
+    assert not breaker.allow() # 시험 요청 진행 중에는 나머지 차단
+    breaker.record_success()
+    assert breaker.snapshot()['state'] == STATE_CLOSED and breaker.allow()
+
+def test_failed_probe_reopens(breaker):
+    breaker.record_failure("e")
+    breaker.record_failure("e")
+    time.sleep(RECOVERY_S * 1.5)
+    assert breaker.allow()
+    breaker.record_failure("probe failed")
+    snapshot = breaker.snapshot()
+    assert snapshot['state'] == STATE_OPEN and snapshot['last_error'] == "probe failed"
+    assert not breaker.allow()
+
+def test_state_is_shared_through_store(store):
+    first = CircuitBreaker('shared', store, failure_threshold=1, recovery_s=60)
+    second = CircuitBreaker('shared', store, failure_threshold=1, recovery_s=60) # 다른 프로세스
+    first.record_failure("e")
+    assert not second.allow()
+
+def test_check_records_degradation_and_raises(breaker, monkeypatch):
+    monkeypatch.setitem(circuit_breaker._breakers, 'test', breaker)
+    breaker.record_failure("e")
+    breaker.record_failure("e")
+    with rate_limiter.analysis_scope() as scope:
+        with pytest.raises(CircuitOpenError):
+            circuit_breaker.check('test')
+    assert scope.degradations == [('test', rate_limiter.DEGRADE_DECISIONS.get('test', "skipped"), REASON_CIRCUIT_OPEN)]
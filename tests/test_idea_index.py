@@ -0,0 +1,50 @@
+# tests/test_idea_index.py
+
+import threading
+import time
+import numpy as np
+from idea_index import IdeaIndex
+
+
+def _vector(seed: int, dim: int = 32) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+def _wait_idle(index: IdeaIndex) -> None:
+    """진행 중인 재구성이 끝나길 기다린 뒤 한 번 더 재구성하여 저장소 최신 상태를 반영합니다."""
+    deadline: float = time.monotonic() + 10
+    while (worker := index.schedule_rebuild()) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker is not None
+    worker.join(timeout=10)
+
+
+def test_lookup_serves_stale_index_while_rebuilding_in_background(tmp_path):
+    index = IdeaIndex(str(tmp_path))
+    _wait_idle(index)
+    other_process = IdeaIndex(str(tmp_path)) # 같은 저장소를 쓰는 다른 워커
+    _wait_idle(other_process)
+    vector = _vector(1)
+    other_process.add("다른 워커가 분석한 아이디어", vector, candidates=[], llm_verdicts={})
+
+    release = threading.Event()
+    original_rebuild = index._rebuild
+    def slow_rebuild() -> None:
+        release.wait(timeout=10)
+        original_rebuild()
+    index._rebuild = slow_rebuild
+
+    assert index.find_similar(vector, threshold=0.99) is None # 재구성을 기다리지 않고 기존(빈) 인덱스로 응답
+    release.set()
+    index._rebuild = original_rebuild
+    _wait_idle(index)
+    match = index.find_similar(vector, threshold=0.99)
+    assert match is not None and match[1]['idea_text'] == "다른 워커가 분석한 아이디어"
+
+def test_add_is_visible_without_rebuild(tmp_path):
+    index = IdeaIndex(str(tmp_path))
+    index.add("첫 아이디어", _vector(1), candidates=[], llm_verdicts={})
+    _wait_idle(index)
+    vector = _vector(2)
+    index.add("두 번째 아이디어", vector, candidates=[{'text': 'x'}], llm_verdicts={'x': ('No', '')})
+    match = index.find_similar(vector, threshold=0.99)
+    assert match is not None and match[1]['llm_verdicts'] == {'x': ('No', '')}
@@ -0,0 +1,68 @@
+# tests/test_job_queue.py
+
+import multiprocessing
+import os
+import time
+import diskcache
+import pytest
+import job_queue
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="테스트 워커 풀은 fork 컨텍스트 사용")
+
+
+def crashing_job(job_id: str, idea_text: str) -> None:
+    os._exit(1) # 워커 프로세스 비정상 종료 (OOM, 세그폴트 등)
+
+def finishing_job(job_id: str, idea_text: str) -> None:
+    job_queue._update_job(job_id, status=job_queue.JOB_STATUS_DONE, finished_at=time.time())
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    """임시 작업 저장소 + 모델 로딩 없는 fork 워커 풀 (작업 함수는 테스트에서 교체)"""
+    store = diskcache.Cache(str(tmp_path / "jobs"))
+    monkeypatch.setattr(job_queue, 'job_store', store)
+    monkeypatch.setattr(job_queue, '_executor', None)
+    monkeypatch.setattr(job_queue, '_create_executor', lambda: ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork')))
+    yield job_queue
+    if job_queue._executor is not None:
+        job_queue._executor.shutdown(wait=True, cancel_futures=True)
+    store.close()
+
+def wait_for_status(job_id: str, timeout_s: float = 20.0) -> str:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        status = (job_queue.get_job(job_id) or {}).get('status')
+        if status in (job_queue.JOB_STATUS_DONE, job_queue.JOB_STATUS_ERROR):
+            return status
+        time.sleep(0.05)
+    return status
+
+
+def test_worker_crash_marks_job_error_and_next_submission_succeeds(jobs, monkeypatch):
+    monkeypatch.setattr(jobs, '_run_job', crashing_job)
+    crashed = jobs.submit_job("드론 택시")
+    assert wait_for_status(crashed) == jobs.JOB_STATUS_ERROR
+    broken = jobs._executor
+
+    monkeypatch.setattr(jobs, '_run_job', finishing_job)
+    recovered = jobs.submit_job("고양이 급식기") # 깨진 풀을 버리고 새 풀에 제출
+    assert jobs._executor is not broken
+    assert wait_for_status(recovered) == jobs.JOB_STATUS_DONE
+
+def test_submission_failure_is_recorded(jobs, monkeypatch):
+    class AlwaysBroken:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+            pass
+
+    monkeypatch.setattr(jobs, '_create_executor', AlwaysBroken)
+    with pytest.raises(jobs.JobSubmissionError) as raised:
+        jobs.submit_job("드론 택시")
+    record = jobs.get_job(raised.value.job_id)
+    assert record['status'] == jobs.JOB_STATUS_ERROR and record['error']
+    assert jobs._executor is None # 다음 제출에서 다시 생성
@@ -0,0 +1,36 @@
+# tests/test_keyword_extractors.py
+
+import pytest
+from keyword_extractors import KeywordExtractor, RegexNounExtractor, get_extractor, normalize_keyword_text
+
+
+@pytest.fixture
+def extractor():
+    return RegexNounExtractor()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("아이디어 평가 플랫폼", ['아이디어', '평가', '플랫폼']), # 알려진 명사('아이')로 시작할 뿐인 어절은 자르지 않음
+    ("아이폰 케이스", ['아이폰', '케이스']),
+    ("고양이의 사료를 자동으로", ['고양이', '사료', '자동']),
+    ("아이가 노는 놀이터", ['아이', '노는', '놀이터']),
+    ("스마트폰으로 드론을 조종하는 서비스", ['스마트폰', '드론', '조종', '서비스']),
+])
+def test_regex_extractor_strips_only_particles(extractor, text, expected):
+    assert extractor.extract_nouns(text) == expected
+
+def test_stopwords_are_dropped(extractor):
+    assert extractor.extract_nouns("노인을 위한 새로운 택시 호출") == ['노인', '택시', '호출']
+
+def test_unknown_backend_falls_back_to_regex():
+    assert get_extractor('no-such-backend').name == RegexNounExtractor.name
+
+def test_normalize_keyword_text_keeps_case():
+    assert normalize_keyword_text("  AI　기반   Drone ") == "AI 기반 Drone"
+
+def test_backend_without_extract_nouns_fails_at_construction():
+    class IncompleteExtractor(KeywordExtractor):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteExtractor()
@@ -0,0 +1,100 @@
+# tests/test_kipris_client.py
+
+import asyncio
+import concurrent.futures
+import threading
+import pytest
+import http_client
+import kipris_client
+from kipris_client import KiprisPage, KiprisPageConsumer, load_cached_page, pages_to_fetch, parse_page_chunks, store_page
+
+URL = "https://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getWordSearch"
+PARAMS = {'word': '드론 택시', 'numOfRows': 2, 'pageNo': 1, 'ServiceKey': 'secret'}
+RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<response><header><resultCode>00</resultCode><resultMsg>NORMAL SERVICE.</resultMsg></header>
+<body><items>
+<item><applicationNumber>1020200000001</applicationNumber><inventionTitle>드론 택시 호출 시스템</inventionTitle><astrtCont> 초록 1 </astrtCont></item>
+<item><applicationNumber>1020200000002</applicationNumber><inventionTitle>무인 비행체 배차 방법</inventionTitle></item>
+</items><totalCount>5</totalCount></body></response>""".encode('utf-8')
+
+
+@pytest.fixture
+def page_cache(cache_tiers, monkeypatch):
+    monkeypatch.setattr(kipris_client, 'cache_tiers', cache_tiers)
+    return cache_tiers
+
+
+def test_parse_page_chunks_across_split_points():
+    chunks = [RESPONSE[i:i + 7] for i in range(0, len(RESPONSE), 7)]
+    page = parse_page_chunks(chunks)
+    assert page.ok and page.total_count == 5
+    assert page.records == [('1020200000001', '드론 택시 호출 시스템', '초록 1'), ('1020200000002', '무인 비행체 배차 방법', '')]
+
+def test_consumer_parses_off_the_loop_thread():
+    parsed_on: list = []
+    original = kipris_client.parse_page_chunks
+
+    def recording_parse(chunks):
+        parsed_on.append(threading.current_thread().name)
+        return original(chunks)
+
+    async def consume() -> KiprisPage:
+        consumer = KiprisPageConsumer()
+        for i in range(0, len(RESPONSE), 64):
+            consumer.feed(RESPONSE[i:i + 64])
+        return await consumer.close()
+
+    kipris_client.parse_page_chunks = recording_parse
+    try:
+        page = asyncio.run(consume())
+    finally:
+        kipris_client.parse_page_chunks = original
+    assert len(page.records) == 2
+    assert parsed_on and parsed_on[0].startswith("kipris-io")
+
+def test_page_cache_key_ignores_api_key_and_page_param():
+    assert kipris_client.page_cache_key(URL, PARAMS, 2) == kipris_client.page_cache_key(URL, {**PARAMS, 'ServiceKey': 'other', 'pageNo': 9}, 2)
+    assert kipris_client.page_cache_key(URL, PARAMS, 2) != kipris_client.page_cache_key(URL, PARAMS, 3)
+
+def test_only_ok_pages_are_stored(page_cache):
+    async def roundtrip():
+        await store_page(URL, PARAMS, 1, parse_page_chunks([RESPONSE]))
+        await store_page(URL, PARAMS, 2, KiprisPage('99', 'ERROR', None, []))
+        return await load_cached_page(URL, PARAMS, 1), await load_cached_page(URL, PARAMS, 2)
+    first, second = asyncio.run(roundtrip())
+    assert first is not None and first.total_count == 5 and len(first.records) == 2
+    assert second is None
+
+def test_page_cache_does_not_wait_on_saturated_default_executor(page_cache):
+    """run_blocking_concurrently로 기본 스레드 풀을 채운 호출자들이 run_sync로 페이지 캐시/파싱을 기다려도 끝나야 함"""
+    loop = http_client.get_loop()
+    loop.call_soon_threadsafe(loop.set_default_executor, concurrent.futures.ThreadPoolExecutor(max_workers=2))
+
+    async def load_and_parse() -> int:
+        cached = await load_cached_page(URL, PARAMS, 1)
+        consumer = KiprisPageConsumer()
+        consumer.feed(RESPONSE)
+        return len((await consumer.close()).records) if cached is None else -1
+
+    def blocking_call() -> int:
+        return http_client.run_sync(load_and_parse())
+
+    outcome: list = []
+    runner = threading.Thread(target=lambda: outcome.append(http_client.run_blocking_concurrently([(blocking_call, ())] * 4)))
+    try:
+        runner.start()
+        runner.join(timeout=10)
+        assert not runner.is_alive(), "기본 스레드 풀 고갈로 교착"
+        assert outcome == [[2] * 4]
+    finally:
+        loop.call_soon_threadsafe(loop.set_default_executor, concurrent.futures.ThreadPoolExecutor())
+
+@pytest.mark.parametrize("total_count, records, expected", [
+    (5, 2, [2, 3]),
+    (100, 2, [2, 3]),    # config.KIPRIS_MAX_PAGES까지만
+    (None, 2, [2]),      # 전체 건수가 없으면 1페이지가 가득 찬 경우 다음 페이지만
+    (5, 1, []),          # 1페이지가 가득 차지 않음
+])
+def test_pages_to_fetch(total_count, records, expected):
+    page = KiprisPage('00', '', total_count, [('n', 't', 'a')] * records)
+    assert pages_to_fetch(page, rows_per_page=2, max_pages=3) == expected
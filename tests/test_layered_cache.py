@@ -0,0 +1,104 @@
+# tests/test_layered_cache.py
+
+import time
+import pytest
+import config
+from cache_keys import build_key
+from layered_cache import LayeredCache, MISSING, hit_rates
+from resources import ResourceRegistry
+
+
+@pytest.fixture
+def slow_flush(monkeypatch):
+    """조회마다 디스크 카운터에 합산하지 않도록 (flush_stats 호출 시에만 합산)"""
+    monkeypatch.setattr(config, 'CACHE_STATS_FLUSH_INTERVAL_S', 3600.0)
+
+
+def test_memory_hit_after_set(cache_tiers):
+    cache_tiers.set('ns', 'k', {'v': 1})
+    assert cache_tiers.get('ns', 'k') == {'v': 1}
+    stats = cache_tiers.stats()['ns']
+    assert (stats['memory_hits'], stats['disk_hits'], stats['misses'], stats['sets']) == (1, 0, 0, 1)
+
+def test_disk_hit_is_promoted_to_memory(cache_tiers, disk_cache):
+    disk_cache.set('k', 'from-other-worker', expire=60)
+    assert cache_tiers.get('ns', 'k') == 'from-other-worker'
+    disk_cache.delete('k') # 메모리 계층에 올라간 값은 디스크 삭제 후에도 memory_ttl_s 동안 반환
+    assert cache_tiers.get('ns', 'k') == 'from-other-worker'
+    stats = cache_tiers.stats()['ns']
+    assert (stats['memory_hits'], stats['disk_hits']) == (1, 1)
+
+def test_miss_returns_default(cache_tiers):
+    assert cache_tiers.get('ns', 'absent') is None
+    assert cache_tiers.get('ns', 'absent', MISSING) is MISSING
+    assert cache_tiers.stats()['ns']['misses'] == 2
+
+def test_none_is_a_cacheable_value(cache_tiers):
+    cache_tiers.set('ns', 'k', None)
+    cache_tiers.clear_memory()
+    assert cache_tiers.get('ns', 'k', MISSING) is None
+
+def test_entry_expires_in_both_tiers(cache_tiers):
+    cache_tiers.set('ns', 'k', 'v', expire=0.05)
+    time.sleep(0.1)
+    assert cache_tiers.get('ns', 'k', MISSING) is MISSING
+
+def test_memory_ttl_bounds_staleness(disk_cache):
+    tiers = LayeredCache(lambda: disk_cache, memory_max_entries=16, memory_ttl_s=0.05)
+    tiers.set('ns', 'k', 'old')
+    disk_cache.set('k', 'new') # 다른 프로세스의 갱신
+    assert tiers.get('ns', 'k') == 'old'
+    time.sleep(0.1)
+    assert tiers.get('ns', 'k') == 'new'
+
+def test_memory_tier_is_bounded_per_namespace(disk_cache):
+    tiers = LayeredCache(lambda: disk_cache, memory_max_entries=2, memory_ttl_s=60.0)
+    for key in ('a', 'b', 'c'):
+        tiers.set('ns', key, key)
+    tiers.set('other', 'd', 'd') # 디스크 키는 공유되므로 실제 키에는 네임스페이스 접두사(build_key)가 붙음
+    assert tiers.stats()['ns']['memory_entries'] == 2
+    assert tiers.stats()['other']['memory_entries'] == 1
+    assert tiers.get('ns', 'a') == 'a' # 밀려난 항목은 디스크에서
+    assert tiers.stats()['ns']['disk_hits'] == 1
+
+def test_memory_tier_can_be_disabled(cache_tiers, monkeypatch):
+    monkeypatch.setattr(config, 'CACHE_MEMORY_ENABLED', False)
+    cache_tiers.set('ns', 'k', 'v')
+    assert cache_tiers.get('ns', 'k') == 'v'
+    assert cache_tiers.stats()['ns']['disk_hits'] == 1
+
+def test_works_without_disk_tier():
+    tiers = LayeredCache(lambda: None, memory_max_entries=4, memory_ttl_s=60.0)
+    tiers.set('ns', 'k', 'v')
+    assert tiers.get('ns', 'k') == 'v'
+    assert tiers.disk_report() == {}
+
+def test_flush_stats_accumulates_on_disk(cache_tiers, disk_cache, slow_flush):
+    key = build_key('ns', 'q')
+    cache_tiers.set('ns', key, 'v')
+    cache_tiers.get('ns', key)
+    cache_tiers.get('ns', build_key('ns', 'other'))
+    disk_cache.set('old-style-key', 'v')
+    assert cache_tiers.disk_report()['ns']['misses'] == 0 # 아직 합산 전
+    cache_tiers.flush_stats()
+    cache_tiers.flush_stats() # 증가분은 한 번만 합산
+    report = cache_tiers.disk_report()
+    assert report['ns'] == dict(hit_rates(1, 0, 1), sets=1, entries=1)
+    assert report['legacy']['entries'] == 1
+    assert cache_tiers.reset_disk_stats() == 3
+    assert cache_tiers.disk_report()['ns']['sets'] == 0
+
+def test_memoize_uses_namespace_and_argument_key(cache_tiers):
+    registry = ResourceRegistry()
+    calls: list = []
+
+    @registry.memoize('test_search')
+    def search(query: str, rows: int = 10) -> list:
+        calls.append((query, rows))
+        return [query] * rows
+
+    assert search('드론  택시', 2) == search('드론 택시', rows=2) # 공백 차이, 기본값/키워드 인자는 같은 키
+    assert search('드론 택시') == ['드론 택시'] * 10
+    assert calls == [('드론  택시', 2), ('드론 택시', 10)]
+    assert search.__cache_key__('드론 택시', 2) == build_key('test_search', '드론 택시', 2)
+    assert set(cache_tiers.stats()) == {'test_search'}
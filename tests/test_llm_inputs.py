@@ -0,0 +1,41 @@
+# tests/test_llm_inputs.py
+
+import config
+import cache_keys
+from llm_inputs import build_excerpt, prepare_llm_inputs, verdict_key_for_hit
+from resources import registry
+
+USER_IDEA = "사진을 찍으면 식물 병해를 진단하고 방제 방법을 알려주는 앱"
+
+
+class FakeModel:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+
+def _hit(source: str, text: str = "스마트폰 카메라 영상으로 작물 잎의 병해를 판별하는 시스템") -> dict:
+    return {'text': text, 'source': source, 'link': 'https://example.com/1'}
+
+
+def test_single_and_batch_paths_share_cache_entry(cache_tiers):
+    @registry.memoize('llm_verdict', key=cache_keys.llm_verdict_key)
+    def verify_cached(user_idea, search_text_excerpt, source_type_mapped, model_llm, prompt_ver=config.PROMPT_VERSION):
+        return ('Yes', 'single')
+
+    model = FakeModel('models/gemini-2.0-flash')
+    for hit in (_hit('Google Search'), _hit('KIPRIS Patent'), {'text': '출처 없는 결과'}):
+        excerpt, source_type = prepare_llm_inputs(hit)
+        assert verify_cached.__cache_key__(USER_IDEA, excerpt, source_type, model) == verdict_key_for_hit(USER_IDEA, hit, model)
+        verify_cached(USER_IDEA, excerpt, source_type, model) # 단건 경로가 저장한 항목을
+        assert cache_tiers.get('llm_verdict', verdict_key_for_hit(USER_IDEA, hit, model)) == ('Yes', 'single') # 일괄 경로가 조회
+
+def test_key_separates_source_model_and_ignores_text_past_excerpt():
+    model = FakeModel('models/gemini-2.0-flash')
+    web, patent = _hit('Google Search'), _hit('KIPRIS Patent')
+    assert verdict_key_for_hit(USER_IDEA, web, model) != verdict_key_for_hit(USER_IDEA, patent, model)
+    assert verdict_key_for_hit(USER_IDEA, web, model) != verdict_key_for_hit(USER_IDEA, web, FakeModel('models/gemini-1.5-pro'))
+
+    long_text = "가" * (config.MAX_EXCERPT + 10)
+    assert build_excerpt(long_text) == build_excerpt(long_text + " 뒷부분")
+    assert verdict_key_for_hit(USER_IDEA, _hit('Google Search', long_text), model) == \
+        verdict_key_for_hit(USER_IDEA, _hit('Google Search', long_text + " 뒷부분"), model)
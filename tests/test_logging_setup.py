@@ -0,0 +1,83 @@
+# tests/test_logging_setup.py
+
+import logging
+import os
+import queue
+import subprocess
+import sys
+import time
+import pytest
+import config
+from logging_setup import NonBlockingQueueHandler
+
+
+def test_prepare_fixes_message_at_call_time():
+    log_queue: queue.Queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue)
+    hits = ['a']
+    record = logging.LogRecord('t', logging.INFO, __file__, 1, "hits=%s", (hits,), None)
+    handler.handle(record)
+    hits.append('b') # 리스너가 포맷하기 전에 인자가 바뀌어도 메시지는 그대로여야 함
+    queued = log_queue.get_nowait()
+    assert queued.getMessage() == "hits=['a']"
+    assert queued.args is None
+
+def test_prepare_keeps_exc_info():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord('t', logging.ERROR, __file__, 1, "실패: %d", (3,), sys.exc_info())
+    prepared = handler.prepare(record)
+    assert prepared.getMessage() == "실패: 3"
+    assert prepared.exc_info is not None and prepared.exc_info[0] is ValueError
+    assert "ValueError: boom" in logging.Formatter().format(prepared)
+
+def test_full_queue_drops_warning_after_timeout(monkeypatch):
+    monkeypatch.setattr(config, 'LOG_QUEUE_PUT_TIMEOUT_S', 0.05)
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(logging.LogRecord('t', logging.INFO, __file__, 1, "first", None, None))
+    started = time.monotonic()
+    handler.handle(logging.LogRecord('t', logging.WARNING, __file__, 1, "no room", None, None)) # 읽는 쪽이 없어도 반환
+    handler.handle(logging.LogRecord('t', logging.INFO, __file__, 1, "no room", None, None))
+    assert time.monotonic() - started < 1.0
+    assert handler.dropped == 2
+
+
+FORK_SCRIPT = """
+import logging, os, sys, time
+import config
+config.LOG_ASYNC_ENABLED = True
+config.LOG_QUEUE_SIZE = 5
+config.LOG_QUEUE_PUT_TIMEOUT_S = 5.0
+config.LOG_LEVEL = 'INFO'
+config.LOG_MODULE_LEVELS = {}
+from logging_setup import setup_logging, shutdown_logging
+setup_logging(sys.argv[1])
+logging.warning("parent before fork")
+pid = os.fork()
+if pid == 0:
+    for i in range(20): # 큐 크기보다 많이: 리스너가 없으면 6번째 레코드에서 막힘
+        logging.warning("child record %d", i)
+    shutdown_logging()
+    os._exit(0)
+deadline = time.monotonic() + 15
+while time.monotonic() < deadline:
+    done, status = os.waitpid(pid, os.WNOHANG)
+    if done:
+        sys.exit(os.waitstatus_to_exitcode(status))
+    time.sleep(0.05)
+os.kill(pid, 9)
+sys.exit("child hung while logging")
+"""
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork 미지원 플랫폼")
+def test_forked_child_gets_its_own_listener(tmp_path):
+    log_file = tmp_path / "fork.log"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", FORK_SCRIPT, str(log_file)], env=env, cwd=str(tmp_path),
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    text = log_file.read_text(encoding='utf-8')
+    assert text.count("parent before fork") == 1
+    assert all(f"child record {i}" in text for i in range(20))
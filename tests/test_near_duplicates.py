@@ -0,0 +1,70 @@
+# tests/test_near_duplicates.py
+
+import random
+import pytest
+import near_duplicates
+from near_duplicates import band_keys, cluster_near_duplicates, collapse_near_duplicates, shingles, simhash
+
+IDEA = "드론을 이용한 도심 택시 호출 서비스로, 스마트폰 앱에서 목적지를 입력하면 가장 가까운 드론이 배정됩니다."
+OTHER = "고양이 자동 급식기는 정해진 시간에 사료를 공급하고, 카메라로 반려동물의 식사량을 기록하는 사물인터넷 장치입니다."
+
+
+@pytest.fixture
+def fixed_fingerprints(monkeypatch):
+    """텍스트 자체를 64비트 SimHash 값으로 쓰도록 바꿔 밴드/해밍 거리 동작만 검사"""
+    monkeypatch.setattr(near_duplicates, 'simhash', lambda text, shingle_size: int(text))
+
+
+def test_shingles_ignore_case_punctuation_and_spacing():
+    assert shingles("  AI, 드론!  ", 3) == shingles("ai 드론", 3)
+    assert shingles("ab", 3) == ["ab"]
+    assert shingles("!!!", 3) == []
+
+def test_simhash_is_stable_for_normalized_variants():
+    assert simhash(IDEA, 3) == simhash("  " + IDEA.upper() + "!!", 3)
+    assert simhash("", 3) == 0
+    assert bin(simhash(IDEA, 3) ^ simhash(OTHER, 3)).count("1") > 6
+
+def test_band_keys_cover_all_bits_in_distinct_tables():
+    keys = band_keys((1 << 64) - 1, 7)
+    assert len(keys) == 7
+    assert len({key >> 64 for key in keys}) == 7 # 밴드 번호가 상위 비트에 붙어 테이블이 겹치지 않음
+    assert sum((key & ((1 << 64) - 1)).bit_length() for key in keys) == 64
+
+def test_cluster_respects_max_hamming(fixed_fingerprints):
+    base = 0b1011 << 40
+    within = base ^ 0b111111 # 해밍 거리 6
+    beyond = base ^ (0b1111111 << 20) # 해밍 거리 7 (within과는 13)
+    assert cluster_near_duplicates([str(base), str(within), str(beyond)], 6, 3) == [0, 0, 2]
+
+def test_cluster_finds_every_pair_within_distance(fixed_fingerprints):
+    rng = random.Random(7)
+    fingerprints = []
+    for _ in range(20):
+        base = rng.getrandbits(64)
+        fingerprints.append(base)
+        for _ in range(2):
+            flipped = base
+            for bit in rng.sample(range(64), rng.randint(0, 4)):
+                flipped ^= 1 << bit
+            fingerprints.append(flipped)
+    groups = cluster_near_duplicates([str(f) for f in fingerprints], 4, 3)
+    for a in range(len(fingerprints)):
+        for b in range(a + 1, len(fingerprints)):
+            if bin(fingerprints[a] ^ fingerprints[b]).count("1") <= 4:
+                assert groups[a] == groups[b]
+
+def test_cluster_representative_is_first_member(fixed_fingerprints):
+    # 0-1, 1-2가 각각 가까워 세 항목이 한 묶음 (대표는 가장 앞 순위)
+    assert cluster_near_duplicates(["3", "0", "1", str(0b111 << 61)], 1, 3) == [0, 0, 0, 3]
+
+def test_collapse_keeps_first_hit_and_counts_members():
+    items = [{'text': IDEA, 'rank': 1}, {'text': OTHER, 'rank': 2}, {'text': IDEA.upper() + "!", 'rank': 3}]
+    collapsed = collapse_near_duplicates(items, 6, 3)
+    assert [(item['rank'], item['cluster_size']) for item in collapsed] == [(1, 2), (2, 1)]
+    assert 'cluster_size' not in items[0] # 입력 딕셔너리는 수정하지 않음
+
+def test_collapse_sums_existing_cluster_sizes():
+    items = [{'text': IDEA, 'cluster_size': 3}, {'text': IDEA, 'cluster_size': 2}]
+    assert [item['cluster_size'] for item in collapse_near_duplicates(items, 6, 3)] == [5]
+    assert collapse_near_duplicates([{'text': OTHER}], 6, 3) == [{'text': OTHER, 'cluster_size': 1}]
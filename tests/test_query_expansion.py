@@ -0,0 +1,36 @@
+# tests/test_query_expansion.py
+
+import config
+import rate_limiter
+from circuit_breaker import CircuitOpenError, REASON_CIRCUIT_OPEN
+from query_expansion import SubQuery, expand_queries, romanize_hangul, run_sub_queries
+from rate_limiter import RateLimitExceeded, REASON_RATE_LIMITED
+
+
+def _found(query: str) -> list:
+    return [{'text': f"{query} 결과", 'link': f"https://example.com/{query}"}]
+
+def _throttled(query: str) -> list:
+    raise RateLimitExceeded('kipris', REASON_RATE_LIMITED)
+
+def _circuit_open(query: str) -> list:
+    raise CircuitOpenError('google')
+
+
+def test_skipped_sub_queries_record_degradations_in_caller_scope():
+    sub_queries = [SubQuery('google', '스마트 화분', 'original'), SubQuery('kipris', '스마트 화분', 'original')]
+    with rate_limiter.analysis_scope() as scope:
+        outputs = run_sub_queries(sub_queries, {'google': _found, 'kipris': _throttled})
+        assert outputs == [_found('스마트 화분'), []]
+        assert ('kipris', rate_limiter.DEGRADE_DECISIONS['kipris'], REASON_RATE_LIMITED) in scope.degradations
+
+        run_sub_queries(sub_queries[:1], {'google': _circuit_open})
+        assert ('google', rate_limiter.DEGRADE_DECISIONS['google'], REASON_CIRCUIT_OPEN) in rate_limiter.current_degradations()
+
+def test_romanized_variant_is_transliteration_and_can_be_disabled(monkeypatch):
+    assert romanize_hangul("화분 센서") == "hwabun senseo"
+    monkeypatch.setattr(config, 'QUERY_EXPANSION_ROMANIZATION_ENABLED', True)
+    kinds = [query.kind for query in expand_queries("물을 자동으로 주는 화분", "화분 센서")]
+    assert 'romanized' in kinds
+    monkeypatch.setattr(config, 'QUERY_EXPANSION_ROMANIZATION_ENABLED', False)
+    assert 'romanized' not in [query.kind for query in expand_queries("물을 자동으로 주는 화분", "화분 센서")]
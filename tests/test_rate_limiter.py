@@ -0,0 +1,77 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import concurrent.futures
+import threading
+import diskcache
+import pytest
+import http_client
+import rate_limiter
+from rate_limiter import ApiRateLimiter, RateLimitExceeded, REASON_QUOTA_EXHAUSTED, REASON_RATE_LIMITED
+
+
+@pytest.fixture
+def store(tmp_path):
+    cache = diskcache.Cache(str(tmp_path / "rate_limits"))
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def limiter(store, monkeypatch):
+    """초당 20개, 버스트 1, 일일 할당량 없음. 모듈 acquire/acquire_async가 쓰는 'test' API로 등록"""
+    api_limiter = ApiRateLimiter('test', rate_per_s=20.0, burst=1, daily_quota=0, store=store)
+    monkeypatch.setitem(rate_limiter._limiters, 'test', api_limiter)
+    return api_limiter
+
+
+def test_token_bucket_burst_then_rate_limited(store):
+    api_limiter = ApiRateLimiter('slow', rate_per_s=0.01, burst=2, daily_quota=0, store=store)
+    api_limiter.acquire('request-a', max_wait_s=0.1)
+    api_limiter.acquire('request-a', max_wait_s=0.1)
+    with pytest.raises(RateLimitExceeded) as raised:
+        api_limiter.acquire('request-a', max_wait_s=0.1) # 다음 토큰까지 100초
+    assert raised.value.reason == REASON_RATE_LIMITED
+
+def test_daily_quota_is_shared_through_store(store):
+    first = ApiRateLimiter('quota', rate_per_s=100.0, burst=10, daily_quota=2, store=store)
+    second = ApiRateLimiter('quota', rate_per_s=100.0, burst=10, daily_quota=2, store=store) # 다른 프로세스
+    first.acquire('a', max_wait_s=0.1)
+    second.acquire('b', max_wait_s=0.1)
+    assert first.quota_exhausted()
+    with pytest.raises(RateLimitExceeded) as raised:
+        first.acquire('a', max_wait_s=0.1)
+    assert raised.value.reason == REASON_QUOTA_EXHAUSTED
+
+def test_exceeded_budget_is_recorded_in_analysis_scope(limiter):
+    with rate_limiter.analysis_scope() as scope:
+        rate_limiter.acquire('test', max_wait_s=0.0)
+        with pytest.raises(RateLimitExceeded):
+            rate_limiter.acquire('test', max_wait_s=0.0)
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(rate_limiter.acquire_async('test', max_wait_s=0.0))
+    assert scope.degradations == [('test', rate_limiter.DEGRADE_DECISIONS.get('test', "skipped"), REASON_RATE_LIMITED)]
+
+def test_acquire_async_waits_for_refill_without_threads(limiter):
+    async def take_three() -> None:
+        for _ in range(3):
+            await rate_limiter.acquire_async('test', max_wait_s=1.0)
+    asyncio.run(take_three()) # 버스트 1 이후 토큰 2개는 asyncio.sleep으로 대기
+
+def test_no_deadlock_when_callers_occupy_the_default_executor(limiter):
+    """run_blocking_concurrently로 기본 스레드 풀을 채운 호출자들이 run_sync로 토큰 대기 코루틴을 기다려도 끝나야 함"""
+    loop = http_client.get_loop()
+    small_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    loop.call_soon_threadsafe(loop.set_default_executor, small_executor)
+
+    def blocking_call() -> str:
+        return http_client.run_sync(rate_limiter.acquire_async('test', max_wait_s=5.0)) or 'ok'
+
+    outcome: list = []
+    runner = threading.Thread(target=lambda: outcome.append(http_client.run_blocking_concurrently([(blocking_call, ())] * 4)))
+    try:
+        runner.start()
+        runner.join(timeout=10)
+        assert not runner.is_alive(), "기본 스레드 풀 고갈로 교착"
+        assert outcome == [['ok'] * 4]
+    finally:
+        loop.call_soon_threadsafe(loop.set_default_executor, concurrent.futures.ThreadPoolExecutor())
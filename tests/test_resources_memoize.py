@@ -0,0 +1,47 @@
+# tests/test_resources_memoize.py
+
+import http_client
+import resources
+from resources import ResourceRegistry
+
+
+def test_skip_memoize_store_keeps_partial_result_out_of_cache(cache_tiers):
+    registry = ResourceRegistry()
+    calls: list = []
+
+    async def fetch_pages(complete: bool) -> list:
+        if not complete:
+            registry.skip_memoize_store() # 루프의 코루틴에서 표시해도 호출한 memoize 함수에 적용
+        return ['page-1'] if not complete else ['page-1', 'page-2']
+
+    @registry.memoize('test_search')
+    def search(query: str, complete: bool) -> list:
+        calls.append(query)
+        return http_client.run_sync(fetch_pages(complete))
+
+    assert search('드론', False) == ['page-1']
+    assert search('드론', False) == ['page-1']
+    assert len(calls) == 2 # 부분 결과는 저장되지 않아 다시 호출
+    assert search('택시', True) == search('택시', True)
+    assert len(calls) == 3
+
+def test_skip_propagates_to_outer_memoized_call(cache_tiers):
+    registry = ResourceRegistry()
+    outer_calls: list = []
+
+    @registry.memoize('test_inner')
+    def inner(query: str) -> str:
+        registry.skip_memoize_store()
+        return query
+
+    @registry.memoize('test_outer')
+    def outer(query: str) -> str:
+        outer_calls.append(query)
+        return inner(query) + "!"
+
+    outer('a')
+    outer('a')
+    assert outer_calls == ['a', 'a']
+
+def test_skip_outside_memoize_is_a_no_op():
+    resources.registry.skip_memoize_store() # 예외 없이 무시
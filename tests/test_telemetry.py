@@ -0,0 +1,77 @@
+# tests/test_telemetry.py
+
+import diskcache
+import pytest
+import config
+import telemetry
+from telemetry import MetricsRegistry
+
+
+def counter_snapshot(value: float, outcome: str = 'ok'):
+    registry = MetricsRegistry()
+    registry.counter('musesonar_analyses_total', "analyze_idea 실행 수", ('outcome',)).inc(value, outcome=outcome)
+    return registry.snapshot()
+
+def sample_value(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"{series} 없음:\n{text}")
+
+
+@pytest.fixture
+def metrics_store(tmp_path, monkeypatch):
+    """임시 스냅샷 저장소 + 빈 지표 레지스트리 (현재 프로세스 값은 테스트에서 직접 기록)"""
+    monkeypatch.setattr(config, 'METRICS_ENABLED', True)
+    monkeypatch.setattr(telemetry, '_publish_state', telemetry._PublishState())
+    registry = MetricsRegistry()
+    monkeypatch.setattr(telemetry, 'metrics', registry)
+    store = diskcache.Cache(str(tmp_path / "metrics"))
+    telemetry._publish_state.store = store
+    yield registry
+    store.close()
+
+
+def test_merge_adds_counters_and_histogram_rows():
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry, value in ((first, 0.2), (second, 3.0)):
+        registry.counter('c', "c", ('k',)).inc(k='a')
+        registry.histogram('h', "h", ('k',), buckets=(1.0, 5.0)).observe(value, k='a')
+    second.counter('c', "c", ('k',)).inc(2, k='b')
+    merged = MetricsRegistry.merge([first.snapshot(), second.snapshot()])
+    assert merged['c']['values'] == {('a',): 2.0, ('b',): 2.0}
+    assert merged['h']['values'][('a',)] == [1.0, 1.0, 3.2, 2.0] # 구간별 개수, 합계, 관측 수
+    text = MetricsRegistry.render(merged)
+    assert 'h_bucket{k="a",le="1"} 1' in text and 'h_bucket{k="a",le="5"} 2' in text
+    assert 'h_count{k="a"} 2' in text
+
+def test_render_includes_other_processes_and_publishes_own(metrics_store, monkeypatch):
+    monkeypatch.setattr(telemetry, '_process_alive', lambda pid: True)
+    store = telemetry._get_store()
+    store.set(f"proc:{10**7 + 1}:other", counter_snapshot(5))
+    metrics_store.counter('musesonar_analyses_total', "analyze_idea 실행 수", ('outcome',)).inc(2, outcome='ok')
+    text = telemetry.render_prometheus()
+    assert sample_value(text, 'musesonar_analyses_total{outcome="ok"}') == 7
+    assert store.get(telemetry._publish_state.key) is not None # 다른 웹 프로세스의 응답에도 포함되도록 기록
+
+def test_dead_process_counters_are_kept_in_retired_total(metrics_store, monkeypatch):
+    dead_pid = 10**7 + 2
+    monkeypatch.setattr(telemetry, '_process_alive', lambda pid: pid != dead_pid)
+    store = telemetry._get_store()
+    store.set(f"proc:{dead_pid}:gone", counter_snapshot(4))
+    store.set(f"proc:{10**7 + 3}:live", counter_snapshot(1))
+    first = sample_value(telemetry.render_prometheus(), 'musesonar_analyses_total{outcome="ok"}')
+    second = sample_value(telemetry.render_prometheus(), 'musesonar_analyses_total{outcome="ok"}')
+    assert first == second == 5 # 종료된 프로세스 값이 사라지거나 두 번 더해지지 않음
+    assert store.get(f"proc:{dead_pid}:gone") is None
+    assert store.get(telemetry.RETIRED_KEY)['musesonar_analyses_total']['values'] == {('ok',): 4.0}
+
+def test_request_timings_publishes_at_most_once_per_interval(metrics_store, monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_PUBLISH_INTERVAL_S', 3600.0)
+    published: list = []
+    monkeypatch.setattr(telemetry, 'publish', lambda: published.append(1) or setattr(telemetry._publish_state, 'last_publish', 1e12))
+    for _ in range(3):
+        with telemetry.request_timings():
+            with telemetry.request_timings(): # 중첩 범위는 바깥 범위 종료 시에만
+                pass
+    assert published == [1]